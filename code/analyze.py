@@ -0,0 +1,226 @@
+"""
+Size and token budget analysis for built skills.
+Reports bytes, lines and approximate tokens per file and per loading level,
+so oversized skills can be caught before they are packed and uploaded.
+"""
+import codecs
+import re
+from pathlib import Path
+from typing import BinaryIO, Dict, List, NamedTuple, Optional, Tuple
+
+from .plugins.io.fs import walk_files
+from .plugins.io.ignore import IgnoreRules
+
+# Progressive disclosure levels, in loading order
+LEVEL_METADATA = "metadata"      # SKILL.md frontmatter, always in the system prompt
+LEVEL_INSTRUCTIONS = "SKILL.md"  # SKILL.md body, loaded when the skill triggers
+LEVEL_RESOURCES = "references"   # Everything else, read only when needed
+LEVELS = (LEVEL_METADATA, LEVEL_INSTRUCTIONS, LEVEL_RESOURCES)
+
+# Budgets from Anthropic's skill authoring guidance
+METADATA_TOKEN_BUDGET = 100
+INSTRUCTIONS_TOKEN_BUDGET = 5000
+INSTRUCTIONS_LINE_LIMIT = 500
+
+CHUNK_SIZE = 1 << 20
+
+# An opening "---" not closed within this many lines (or CHUNK_SIZE bytes)
+# is not frontmatter; the lines are measured as part of the body instead
+FRONTMATTER_MAX_LINES = 100
+
+# Rough BPE approximation: short letter runs, groups of up to 3 digits, and
+# every other non-space character (punctuation, CJK) count as one token each
+_TOKEN_PATTERN = re.compile(r"[A-Za-z]{1,8}|\d{1,3}|[^\sA-Za-z\d]")
+
+
+class FileStats(NamedTuple):
+    """Size of one file, or of the frontmatter or body of SKILL.md."""
+    path: str
+    level: str
+    bytes: int
+    lines: int
+    tokens: int
+    binary: bool = False
+
+
+class LevelTotals(NamedTuple):
+    """Summed size of all files at one loading level."""
+    files: int
+    bytes: int
+    lines: int
+    tokens: int
+
+
+class SkillAnalysis(NamedTuple):
+    """Outcome of analyzing one skill directory."""
+    skill_dir: str
+    files: List[FileStats]
+    totals: Dict[str, LevelTotals]
+    warnings: List[str]
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the number of model tokens in text."""
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+def analyze_skill(skill_dir: str, jobs: int = 1,
+                  ignore: Optional[IgnoreRules] = None) -> SkillAnalysis:
+    """
+    Measure every file that pack_skill would ship.
+    Files are streamed in chunks, so memory use does not grow with file size.
+    With jobs > 1, reference files are measured in a process pool.
+    """
+    skill_path = Path(skill_dir)
+    if not skill_path.is_dir():
+        raise FileNotFoundError(f"Skill directory not found: {skill_dir}")
+    if ignore is None:
+        ignore = IgnoreRules.for_directory(skill_path)
+
+    files: List[FileStats] = []
+    resources: List[Tuple[str, str]] = []
+    for entry, relpath in sorted(walk_files(skill_path, ignore), key=lambda item: item[1]):
+        if relpath == "SKILL.md":
+            files.extend(_analyze_skill_md(entry.path))
+        else:
+            resources.append((entry.path, relpath))
+
+    if jobs > 1 and len(resources) > 1:
+        # multiprocessing is slow to import, so only parallel runs pay for it
+        from concurrent.futures import ProcessPoolExecutor
+
+        chunksize = max(1, len(resources) // (jobs * 8))
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            files.extend(executor.map(_analyze_resource, resources, chunksize=chunksize))
+    else:
+        files.extend(_analyze_resource(task) for task in resources)
+
+    totals = {}
+    for level in LEVELS:
+        members = [f for f in files if f.level == level]
+        totals[level] = LevelTotals(
+            files=len({f.path for f in members}),
+            bytes=sum(f.bytes for f in members),
+            lines=sum(f.lines for f in members),
+            tokens=sum(f.tokens for f in members),
+        )
+    return SkillAnalysis(str(skill_dir), files, totals, _budget_warnings(files, totals))
+
+
+def _budget_warnings(files: List[FileStats], totals: Dict[str, LevelTotals]) -> List[str]:
+    warnings = []
+    if not any(f.path == "SKILL.md" for f in files):
+        warnings.append("SKILL.md not found")
+    metadata = totals[LEVEL_METADATA]
+    if metadata.tokens > METADATA_TOKEN_BUDGET:
+        warnings.append(
+            f"Frontmatter is ~{metadata.tokens} tokens (budget: {METADATA_TOKEN_BUDGET}). "
+            "It is loaded for every conversation; shorten the description."
+        )
+    instructions = totals[LEVEL_INSTRUCTIONS]
+    if instructions.tokens > INSTRUCTIONS_TOKEN_BUDGET:
+        warnings.append(
+            f"SKILL.md body is ~{instructions.tokens} tokens (budget: {INSTRUCTIONS_TOKEN_BUDGET}). "
+            "Move detail into reference files."
+        )
+    skill_md_lines = metadata.lines + instructions.lines
+    if skill_md_lines > INSTRUCTIONS_LINE_LIMIT:
+        warnings.append(
+            f"SKILL.md is {skill_md_lines} lines (recommended: under {INSTRUCTIONS_LINE_LIMIT}). "
+            "Consider using progressive disclosure to split content into reference files."
+        )
+    return warnings
+
+
+def _analyze_skill_md(path: str) -> List[FileStats]:
+    """Measure the frontmatter and the body of SKILL.md separately."""
+    with open(path, 'rb') as f:
+        header = []
+        first = f.readline(CHUNK_SIZE)
+        body_start = first
+        if first.rstrip(b"\r\n") == b"---":
+            header.append(first)
+            size = len(first)
+            while len(header) < FRONTMATTER_MAX_LINES and size < CHUNK_SIZE:
+                line = f.readline(CHUNK_SIZE - size)
+                if not line:
+                    break
+                header.append(line)
+                size += len(line)
+                if line.rstrip(b"\r\n") == b"---":
+                    body_start = b""
+                    break
+            if body_start:
+                # Unterminated or oversized: not frontmatter after all
+                body_start = b"".join(header)
+                header = []
+        frontmatter = b"".join(header)
+        metadata = FileStats(
+            "SKILL.md", LEVEL_METADATA, len(frontmatter), frontmatter.count(b"\n"),
+            estimate_tokens(frontmatter.decode('utf-8', errors='replace'))
+        )
+        body = _measure(f, "SKILL.md", LEVEL_INSTRUCTIONS, body_start)
+    return [metadata, body] if header else [body]
+
+
+def _analyze_resource(task: Tuple[str, str]) -> FileStats:
+    path, relpath = task
+    with open(path, 'rb') as f:
+        return _measure(f, relpath, LEVEL_RESOURCES)
+
+
+def _measure(f: BinaryIO, relpath: str, level: str, pending: bytes = b"") -> FileStats:
+    """
+    Stream the rest of a file, counting bytes, lines and tokens chunk by chunk.
+    Files with a NUL byte in their first chunk are treated as binary and
+    only their bytes are counted.
+    """
+    size = lines = tokens = 0
+    binary = None
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    carry = ""
+    last = b""
+    while True:
+        chunk = pending or f.read(CHUNK_SIZE)
+        pending = b""
+        if not chunk:
+            break
+        if binary is None:
+            binary = b"\0" in chunk
+        size += len(chunk)
+        last = chunk
+        if binary:
+            continue
+        lines += chunk.count(b"\n")
+        text = carry + decoder.decode(chunk)
+        # Keep a trailing partial word for the next chunk
+        cut = max(text.rfind(" "), text.rfind("\n"))
+        if cut == -1:
+            if len(text) < CHUNK_SIZE:
+                carry = text
+                continue
+            # No whitespace for a whole chunk: split anyway to bound memory
+            cut = len(text)
+        tokens += estimate_tokens(text[:cut])
+        carry = text[cut:]
+    if not binary:
+        tokens += estimate_tokens(carry + decoder.decode(b"", final=True))
+        if last and not last.endswith(b"\n"):
+            lines += 1
+    return FileStats(relpath, level, size, lines, tokens, bool(binary))
+
+
+def format_report(analysis: SkillAnalysis) -> List[str]:
+    """Human-readable per-file and per-level report lines."""
+    lines = [f"{'level':<11} {'bytes':>12} {'lines':>9} {'~tokens':>10}  path"]
+    for f in analysis.files:
+        tokens = "binary" if f.binary else f"{f.tokens:,}"
+        lines.append(f"{f.level:<11} {f.bytes:>12,} {f.lines:>9,} {tokens:>10}  {f.path}")
+    lines.append("")
+    for level in LEVELS:
+        t = analysis.totals[level]
+        lines.append(
+            f"{level:<11} {t.bytes:>12,} {t.lines:>9,} {t.tokens:>10,}  "
+            f"total ({t.files} file{'s' if t.files != 1 else ''})"
+        )
+    return lines
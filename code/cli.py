@@ -4,34 +4,162 @@ Skills Builder CLI
 Minimal command-line interface for creating, validating, and packaging Claude Skills.
 """
 import argparse
+import glob
+import json
+import os
 import sys
-from pathlib import Path
+import time
 
-# Import our modules with relative imports
-from .scaffold import scaffold_skill
-from .validate import validate_spec
-from .pack import pack_skill
+# Command modules are imported inside the branch that runs them: hooks call
+# this entry point constantly, and most calls need only one of them.
 
 
 def main():
     parser = argparse.ArgumentParser(
         description="Skills Builder: Create domain-agnostic Claude Skills"
     )
+    parser.add_argument(
+        "--no-daemon", action="store_true",
+        help="Run in this process even if a skills-builder daemon is serving"
+    )
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
     # NEW command
     new_parser = subparsers.add_parser("new", help="Create a new skill from spec")
-    new_parser.add_argument("--spec", required=True, help="Path to skill.spec.json")
+    new_source = new_parser.add_mutually_exclusive_group(required=True)
+    new_source.add_argument("--spec", help="Path to skill.spec.json")
+    new_source.add_argument(
+        "--specs-glob",
+        help="Glob of spec files to build in one batch (e.g. 'specs/**/skill.spec.json')"
+    )
     new_parser.add_argument("--out", default="dist/", help="Output directory")
+    new_parser.add_argument(
+        "--jobs", type=int, default=None,
+        help="Worker processes for --specs-glob (default: CPU count)"
+    )
+    new_parser.add_argument(
+        "--force", action="store_true",
+        help="Rebuild even if the .skillbuild.json manifest says the skill is up to date"
+    )
+    new_parser.add_argument(
+        "--templates", action="append", metavar="DIR",
+        help="Template override directory, searched before the built-in templates (repeatable)"
+    )
 
     # VALIDATE command
-    validate_parser = subparsers.add_parser("validate", help="Validate a skill spec")
-    validate_parser.add_argument("--spec", required=True, help="Path to skill.spec.json")
+    validate_parser = subparsers.add_parser("validate", help="Validate skill specs")
+    validate_parser.add_argument(
+        "paths", nargs="*", metavar="SPEC",
+        help="Spec files or globs (e.g. 'specs/**/skill.spec.json')"
+    )
+    validate_parser.add_argument(
+        "--spec", action="append", default=[], help="Path to skill.spec.json (repeatable)"
+    )
+    validate_parser.add_argument(
+        "--format", choices=["text", "jsonl"], default="text",
+        help="Output format: human-readable text or one JSON object per spec"
+    )
+    validate_parser.add_argument(
+        "--jobs", type=int, default=None, help="Worker processes (default: CPU count)"
+    )
+    validate_parser.add_argument(
+        "--rule", action="append", default=[], metavar="NAME",
+        help="Enable a validator rule from a plugin, 'all', or '-NAME' to disable one (repeatable)"
+    )
+    validate_parser.add_argument(
+        "--list-rules", action="store_true", help="List the known validator rules and exit"
+    )
+    validate_parser.add_argument(
+        "--timings", action="store_true", help="Print wall time per validator rule to stderr"
+    )
+
+    # ANALYZE command
+    analyze_parser = subparsers.add_parser(
+        "analyze", help="Report sizes and approximate tokens of a built skill"
+    )
+    analyze_parser.add_argument("--dir", required=True, help="Skill directory to analyze")
+    analyze_parser.add_argument(
+        "--jobs", type=int, default=1,
+        help="Worker processes for measuring reference files (default: 1)"
+    )
+    analyze_parser.add_argument(
+        "--format", choices=["text", "json"], default="text",
+        help="Output format: human-readable table or one JSON object"
+    )
+    analyze_parser.add_argument(
+        "--strict", action="store_true", help="Exit with status 1 if any budget is exceeded"
+    )
 
     # PACK command
     pack_parser = subparsers.add_parser("pack", help="Package a skill into .zip")
     pack_parser.add_argument("--dir", required=True, help="Skill directory to pack")
-    pack_parser.add_argument("--out", required=True, help="Output .zip file path")
+    pack_parser.add_argument("--out", required=True, help="Output .zip file path, or - to stream to stdout")
+    pack_parser.add_argument(
+        "--jobs", type=int, default=1, help="Threads used to compress files in parallel (default: 1)"
+    )
+    pack_parser.add_argument(
+        "--level", type=int, default=None, choices=range(0, 10), metavar="0-9",
+        help="DEFLATE level; 0 stores everything (default: 6)"
+    )
+    pack_parser.add_argument(
+        "--rule", action="append", default=[], metavar="EXT=LEVEL",
+        help="Per-extension level, e.g. '.csv=9' or '.bin=0' to store (repeatable)"
+    )
+    pack_parser.add_argument(
+        "--report", action="store_true",
+        help="Print bytes and time saved by each compression decision"
+    )
+    pack_parser.add_argument(
+        "--deterministic", action="store_true",
+        help="Reproducible output: fixed timestamps and normalized permissions; enables the pack cache"
+    )
+    pack_parser.add_argument(
+        "--cache-dir", default=None,
+        help="Pack cache location (default: $SKILLS_PACK_CACHE or ~/.cache/skills-builder/packs)"
+    )
+    pack_parser.add_argument(
+        "--update", action="store_true",
+        help="Reuse unchanged members of an existing --out archive instead of recompressing them"
+    )
+    pack_parser.add_argument(
+        "--no-cache", action="store_true", help="Do not read or write the pack cache"
+    )
+
+    # WATCH command
+    watch_parser = subparsers.add_parser(
+        "watch", help="Rebuild skills whenever their spec or a template changes"
+    )
+    watch_parser.add_argument(
+        "--spec-dir", required=True, help="Directory searched recursively for skill.spec.json files"
+    )
+    watch_parser.add_argument("--out", default="dist/", help="Output directory")
+    watch_parser.add_argument(
+        "--templates", action="append", metavar="DIR",
+        help="Template override directory, searched before the built-in templates (repeatable)"
+    )
+    watch_parser.add_argument(
+        "--jobs", type=int, default=None,
+        help="Threads used to rebuild skills affected by one change (default: CPU count)"
+    )
+    watch_parser.add_argument(
+        "--pack", action="store_true", help="Also package each rebuilt skill into OUT/<name>.zip"
+    )
+    watch_parser.add_argument(
+        "--debounce", type=float, default=0.2,
+        help="Seconds to wait for a burst of changes to settle (default: 0.2)"
+    )
+    watch_parser.add_argument(
+        "--poll", action="store_true", help="Poll for changes instead of using inotify"
+    )
+
+    # SERVE command
+    serve_parser = subparsers.add_parser(
+        "serve", help="Keep a warm process serving new/validate/pack on a Unix socket"
+    )
+    serve_parser.add_argument(
+        "--socket", default=None,
+        help="Socket path (default: $SKILLS_BUILDER_SOCKET or a per-user runtime socket)"
+    )
 
     args = parser.parse_args()
 
@@ -40,31 +168,239 @@ def main():
         sys.exit(1)
 
     try:
-        if args.command == "new":
+        if args.command == "new" and args.specs_glob:
+            from .scaffold import ScaffoldResult, scaffold_many
+
+            spec_paths = sorted(glob.glob(args.specs_glob, recursive=True))
+            if not spec_paths:
+                print(f"✗ No spec files match: {args.specs_glob}", file=sys.stderr)
+                sys.exit(1)
+            print(f"Creating {len(spec_paths)} skills from {args.specs_glob}...")
+            remote = _daemon_call(args, "new", {
+                "specs": spec_paths, "out": args.out, "jobs": args.jobs,
+                "force": args.force, "templates": args.templates,
+            })
+            if remote is not None:
+                results = [ScaffoldResult(*r) for r in remote["results"]]
+                elapsed = remote["elapsed"]
+            else:
+                start = time.perf_counter()
+                results = scaffold_many(spec_paths, args.out, args.jobs, args.force, args.templates)
+                elapsed = time.perf_counter() - start
+            failed = 0
+            for result in results:
+                if result.error:
+                    failed += 1
+                    print(f"✗ {result.spec_path}: {result.error}")
+                else:
+                    print(f"✓ {result.spec_path} -> {result.skill_dir}")
+            built = len(results) - failed
+            rate = len(results) / elapsed if elapsed > 0 else float("inf")
+            print(
+                f"\nBuilt {built}/{len(results)} skills in {elapsed:.2f}s "
+                f"({rate:.1f} specs/s)"
+            )
+            if failed:
+                sys.exit(1)
+
+        elif args.command == "new":
+            from .scaffold import get_loader, scaffold_skill
+
             print(f"Creating new skill from {args.spec}...")
-            skill_path = scaffold_skill(args.spec, args.out)
+            remote = _daemon_call(args, "new", {
+                "spec": args.spec, "out": args.out, "force": args.force, "templates": args.templates,
+            })
+            if remote is not None:
+                skill_path = remote["skill_dir"]
+            else:
+                skill_path = scaffold_skill(args.spec, args.out, get_loader(args.templates), args.force)
             print(f"✓ Skill created at: {skill_path}")
 
         elif args.command == "validate":
-            print(f"Validating spec: {args.spec}...")
-            errors = validate_spec(args.spec)
-            if errors:
-                print("✗ Validation failed:")
-                for error in errors:
-                    print(f"  - {error}")
+            from .plugins.validators.custom import ValidatorTiming, summarize_timings
+            from .plugins.validators.discovery import available_rules, enabled_rules
+
+            rules = enabled_rules(args.rule)
+            if args.list_rules:
+                for rule in available_rules().values():
+                    mark = "*" if rule.name in rules else " "
+                    print(f"{mark} {rule.name:<24} {rule.origin:<28} {rule.target}")
+                return
+            spec_paths = _expand_paths(args.spec + args.paths)
+            if not spec_paths:
+                validate_parser.error("at least one spec path is required")
+            remote = _daemon_call(args, "validate", {
+                "specs": spec_paths, "jobs": args.jobs, "rules": rules,
+            })
+            from .validate import ValidationResult, validate_many, print_best_practices
+
+            if remote is not None:
+                results = [ValidationResult(r["spec"], r["errors"], r["warnings"],
+                                            [ValidatorTiming(*t) for t in r["timings"]])
+                           for r in remote["results"]]
+            else:
+                results = validate_many(spec_paths, args.jobs, rules)
+            for result in results:
+                if args.format == "jsonl":
+                    print(json.dumps({
+                        "spec": result.spec_path,
+                        "valid": result.valid,
+                        "errors": result.errors,
+                        "warnings": result.warnings,
+                    }))
+                    continue
+                print(f"Validating spec: {result.spec_path}...")
+                if result.errors:
+                    print("✗ Validation failed:")
+                    for error in result.errors:
+                        print(f"  - {error}")
+                else:
+                    print_best_practices(result.warnings)
+                    print("✓ Spec is valid!")
+            if args.timings:
+                print("\nValidator timings:", file=sys.stderr)
+                for line in summarize_timings([t for r in results for t in r.timings]):
+                    print(f"  {line}", file=sys.stderr)
+            if any(not result.valid for result in results):
                 sys.exit(1)
+
+        elif args.command == "analyze":
+            from .analyze import analyze_skill, format_report
+
+            analysis = analyze_skill(args.dir, args.jobs)
+            if args.format == "json":
+                print(json.dumps({
+                    "skill_dir": analysis.skill_dir,
+                    "files": [f._asdict() for f in analysis.files],
+                    "totals": {level: t._asdict() for level, t in analysis.totals.items()},
+                    "warnings": analysis.warnings,
+                }))
             else:
-                print("✓ Spec is valid!")
+                for line in format_report(analysis):
+                    print(line)
+                for warning in analysis.warnings:
+                    print(f"⚠️  {warning}")
+            if args.strict and analysis.warnings:
+                sys.exit(1)
 
         elif args.command == "pack":
-            print(f"Packing skill from {args.dir}...")
-            zip_path = pack_skill(args.dir, args.out)
-            print(f"✓ Skill packaged: {zip_path}")
+            from .pack import pack_skill, pack_skill_stream
+            from .plugins.io.compression import CompressionPolicy, DEFAULT_LEVEL, summarize_stats
+            from .plugins.io.pack_cache import PackCache
+
+            # With --out -, the archive goes to stdout and messages to stderr
+            streaming = args.out == "-"
+            log = sys.stderr if streaming else sys.stdout
+            print(f"Packing skill from {args.dir}...", file=log)
+            level = DEFAULT_LEVEL if args.level is None else args.level
+            policy = CompressionPolicy(level, _parse_rules(args.rule))
+            stats = []
+            report = None
+            if streaming:
+                if args.update:
+                    raise ValueError("--update needs an output file, not --out -")
+                size = pack_skill_stream(args.dir, sys.stdout.buffer, policy, stats,
+                                         args.deterministic)
+                sys.stdout.buffer.flush()
+                print(f"✓ Skill packaged to stdout ({size:,} bytes)", file=log)
+            else:
+                remote = _daemon_call(args, "pack", {
+                    "dir": args.dir, "out": args.out, "jobs": args.jobs,
+                    "level": policy.level, "rules": policy.rules,
+                    "deterministic": args.deterministic, "cache_dir": args.cache_dir,
+                    "no_cache": args.no_cache, "update": args.update,
+                })
+                if remote is not None:
+                    zip_path = remote["zip_path"]
+                    report = remote["report"]
+                else:
+                    cache = None
+                    if args.deterministic and not args.no_cache:
+                        cache = PackCache(args.cache_dir)
+                    zip_path = pack_skill(args.dir, args.out, args.jobs, policy, stats,
+                                          args.deterministic, cache, args.update)
+                print(f"✓ Skill packaged: {zip_path}", file=log)
+            if report is None:
+                report = summarize_stats(stats) if stats else []
+            if args.report and not report:
+                print("\nNo members compressed (archive reused from the pack cache)", file=log)
+            elif args.report:
+                print("\nCompression report:", file=log)
+                for line in report:
+                    print(f"  {line}", file=log)
+
+        elif args.command == "watch":
+            from .watch import SkillWatcher
+
+            watcher = SkillWatcher(args.spec_dir, args.out, args.templates, args.jobs, args.pack)
+            print(f"Watching {args.spec_dir} and templates (Ctrl-C to stop)...")
+            try:
+                for results in watcher.batches(args.debounce, args.poll):
+                    for result in results:
+                        elapsed = f"({result.seconds * 1000:.0f} ms)"
+                        if result.errors:
+                            print(f"✗ {result.spec_path} {elapsed}")
+                            for error in result.errors:
+                                print(f"  - {error}")
+                            continue
+                        target = result.zip_path or result.skill_dir
+                        print(f"✓ {result.spec_path} -> {target} {elapsed}")
+                        for warning in result.warnings:
+                            print(f"  {warning}")
+                    print(f"[{time.strftime('%H:%M:%S')}] Rebuilt {len(results)} skill(s); watching...")
+            except KeyboardInterrupt:
+                print("\nStopped watching")
+
+        elif args.command == "serve":
+            from .daemon import serve
+
+            serve(args.socket)
 
     except Exception as e:
         print(f"✗ Error: {e}", file=sys.stderr)
         sys.exit(1)
 
 
+def _daemon_call(args, method, params):
+    """
+    Run a command in the skills-builder daemon if one is serving.
+    Returns the result, or None to run the command in this process.
+    """
+    if args.no_daemon:
+        return None
+    from .daemon import call
+
+    response = call(method, dict(params, cwd=os.getcwd()))
+    if response is None:
+        return None
+    if "elapsed_ms" in response:
+        print(f"(served by daemon in {response['elapsed_ms']:.1f} ms)", file=sys.stderr)
+    if "error" in response:
+        raise RuntimeError(response["error"]["message"])
+    return response["result"]
+
+
+def _expand_paths(patterns):
+    """Expand globs, keeping literal paths that match nothing so they report as missing."""
+    paths = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            paths.extend(sorted(glob.glob(pattern, recursive=True)))
+        else:
+            paths.append(pattern)
+    return paths
+
+
+def _parse_rules(rules):
+    """Parse '.ext=LEVEL' options into an extension -> level mapping."""
+    parsed = {}
+    for rule in rules:
+        ext, sep, level = rule.partition("=")
+        if not sep or not level.isdigit() or int(level) > 9:
+            raise ValueError(f"Invalid --rule '{rule}' (expected EXT=LEVEL, LEVEL 0-9)")
+        parsed[ext if ext.startswith(".") else f".{ext}"] = int(level)
+    return parsed
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,276 @@
+"""
+Resident skills-builder process serving new/validate/pack over a Unix socket.
+
+The daemon keeps templates, the compiled spec validator and imported
+modules warm between calls, so editor and hook integrations avoid paying
+interpreter startup on every save. The protocol is JSON-RPC 2.0 with one
+newline-terminated request and response per connection.
+"""
+import json
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+
+from . import __version__
+
+# Socket path override for both the daemon and the client
+SOCKET_ENV_VAR = "SKILLS_BUILDER_SOCKET"
+
+# Client environment applied to each request, so a command behaves the same
+# with or without a daemon (names as in loader, pack_cache and discovery)
+FORWARDED_ENV = (
+    "SKILLS_TEMPLATES_DIR", "SKILLS_PACK_CACHE", "SKILLS_VALIDATORS", "SKILLS_VALIDATORS_DIR",
+    "XDG_CACHE_HOME", "XDG_CONFIG_HOME",
+)
+
+# Seconds a client waits to connect, and then for the response
+CLIENT_TIMEOUT = 300.0
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+COMMAND_FAILED = -32000
+VERSION_MISMATCH = -32001
+NO_RESPONSE = -32002
+
+MAX_REQUEST_BYTES = 16 << 20
+
+# Seconds the daemon waits for a client to send its request or read the
+# response; clients are served one at a time, so a stalled one blocks the rest
+CONNECTION_TIMEOUT = 5.0
+
+
+def default_socket_path() -> str:
+    """$SKILLS_BUILDER_SOCKET, else a per-user socket in $XDG_RUNTIME_DIR or $TMPDIR (/tmp)."""
+    override = os.environ.get(SOCKET_ENV_VAR)
+    if override:
+        return override
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "skills-builder.sock")
+    return os.path.join(os.environ.get("TMPDIR") or "/tmp", f"skills-builder-{os.getuid()}.sock")
+
+
+def call(method: str, params: Dict[str, Any], socket_path: Optional[str] = None,
+         timeout: float = CLIENT_TIMEOUT) -> Optional[Dict[str, Any]]:
+    """
+    Send one request to a running daemon and return the JSON-RPC response,
+    or None if no compatible daemon is listening (the caller then runs the
+    command in-process). Once connected, the daemon may already be running
+    the command, so a timeout or lost connection is a NO_RESPONSE error
+    rather than None.
+    """
+    socket_path = socket_path or default_socket_path()
+    # Every CLI call comes through here: without a daemon, skip importing socket
+    if not os.path.exists(socket_path):
+        return None
+    import socket
+
+    env = {name: os.environ.get(name) for name in FORWARDED_ENV}
+    request = {"jsonrpc": "2.0", "id": 1, "method": method,
+               "params": dict(params, builder=__version__, env=env)}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            # A stale socket file, or a daemon too busy to accept
+            return None
+        try:
+            sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as f:
+                line = f.readline(MAX_REQUEST_BYTES)
+        except socket.timeout:
+            return _error(1, NO_RESPONSE, f"No response from the daemon within {timeout:g}s; "
+                                          "it may still be running the command")
+        except OSError as e:
+            return _error(1, NO_RESPONSE, f"Lost connection to the daemon: {e}")
+    try:
+        response = json.loads(line)
+    except ValueError:
+        return _error(1, NO_RESPONSE, "The daemon closed the connection without a valid response")
+    error = response.get("error")
+    if error and error.get("code") == VERSION_MISMATCH:
+        return None
+    return response
+
+
+# Methods
+
+def _new(params: Dict[str, Any]) -> Dict[str, Any]:
+    from .scaffold import get_loader, scaffold_many, scaffold_skill
+
+    if "specs" in params:
+        start = time.perf_counter()
+        # jobs=None fans out over every CPU, as when run in-process
+        results = scaffold_many(params["specs"], params["out"], params.get("jobs"),
+                                params.get("force", False), params.get("templates"))
+        return {
+            "results": [[r.spec_path, r.skill_dir and str(r.skill_dir), r.error] for r in results],
+            "elapsed": time.perf_counter() - start,
+        }
+    skill_dir = scaffold_skill(params["spec"], params["out"], get_loader(params.get("templates")),
+                               params.get("force", False))
+    return {"skill_dir": str(skill_dir)}
+
+
+def _validate(params: Dict[str, Any]) -> Dict[str, Any]:
+    from .plugins.validators.discovery import refresh
+    from .validate import validate_many
+
+    # Pick up plugin files added or edited since the last request
+    refresh()
+    # Warm in-process validation beats a process pool for the usual handful of specs
+    results = validate_many(params["specs"], params.get("jobs") or 1, params.get("rules"))
+    return {"results": [
+        {"spec": r.spec_path, "errors": r.errors, "warnings": r.warnings,
+         "timings": [list(t) for t in r.timings]}
+        for r in results
+    ]}
+
+
+def _pack(params: Dict[str, Any]) -> Dict[str, Any]:
+    from .pack import pack_skill
+    from .plugins.io.compression import CompressionPolicy, summarize_stats
+    from .plugins.io.pack_cache import PackCache
+
+    policy = CompressionPolicy(params["level"], params.get("rules"))
+    stats = []
+    cache = None
+    if params.get("deterministic") and not params.get("no_cache"):
+        cache = PackCache(params.get("cache_dir"))
+    zip_path = pack_skill(params["dir"], params["out"], params.get("jobs", 1), policy, stats,
+                          params.get("deterministic", False), cache, params.get("update", False))
+    return {"zip_path": str(zip_path), "report": summarize_stats(stats) if stats else []}
+
+
+def _ping(params: Dict[str, Any]) -> Dict[str, Any]:
+    return {"builder": __version__, "pid": os.getpid()}
+
+
+METHODS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    "new": _new,
+    "validate": _validate,
+    "pack": _pack,
+    "ping": _ping,
+}
+
+
+def warm_up() -> None:
+    """Import every command module and compile the templates and spec validator."""
+    from .scaffold import _init_worker
+    from .validate import spec_validator
+    from . import pack  # noqa: F401
+
+    _init_worker(())
+    spec_validator()
+
+
+def handle(request: Any) -> Dict[str, Any]:
+    """Dispatch one decoded JSON-RPC request and build its response."""
+    request_id = request.get("id") if isinstance(request, dict) else None
+    if not isinstance(request, dict) or not isinstance(request.get("params", {}), dict):
+        return _error(request_id, INVALID_REQUEST, "Invalid request")
+    method = METHODS.get(request.get("method"))
+    if method is None:
+        return _error(request_id, METHOD_NOT_FOUND, f"Unknown method: {request.get('method')}")
+    params = dict(request.get("params", {}))
+    if params.pop("builder", __version__) != __version__:
+        return _error(request_id, VERSION_MISMATCH, f"Daemon runs skills-builder {__version__}")
+
+    # Requests are served one at a time, so following the client's cwd and
+    # environment is safe
+    start = time.perf_counter()
+    try:
+        os.chdir(params.pop("cwd", os.getcwd()))
+        _apply_env(params.pop("env", {}))
+        result = method(params)
+    except Exception as e:
+        response = _error(request_id, COMMAND_FAILED, str(e))
+    else:
+        response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+    response["elapsed_ms"] = (time.perf_counter() - start) * 1000
+    return response
+
+
+def _apply_env(env: Dict[str, Optional[str]]) -> None:
+    """Set or unset the forwarded variables as the client had them."""
+    for name in FORWARDED_ENV:
+        value = env.get(name)
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+
+
+def _error(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+def _serve_connection(conn) -> None:
+    """Answer the one request sent on an accepted connection."""
+    with conn, conn.makefile("rb") as rfile:
+        line = rfile.readline(MAX_REQUEST_BYTES)
+        if not line:
+            return
+        request = None
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            response = _error(None, PARSE_ERROR, f"Parse error: {e}")
+        else:
+            response = handle(request)
+        conn.sendall(json.dumps(response).encode("utf-8") + b"\n")
+    method = str(request.get("method")) if isinstance(request, dict) else "?"
+    status = "error" if "error" in response else "ok"
+    print(f"{method:<8} {status:<5} {response.get('elapsed_ms', 0):8.1f} ms", flush=True)
+
+
+def serve(socket_path: Optional[str] = None) -> None:
+    """
+    Listen on socket_path until interrupted. A stale socket file left by a
+    dead daemon is replaced; a live one is an error.
+    """
+    import signal
+    import socket
+    import sys
+
+    socket_path = socket_path or default_socket_path()
+    if os.path.exists(socket_path):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            if probe.connect_ex(socket_path) == 0:
+                raise RuntimeError(f"A daemon is already listening on {socket_path}")
+        os.unlink(socket_path)
+
+    start = time.perf_counter()
+    warm_up()
+    print(f"Warmed up in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    # Only the owner may connect: the daemon writes files on the client's behalf
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o077)
+    try:
+        server.bind(socket_path)
+    finally:
+        os.umask(old_umask)
+    server.listen(16)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"✓ Serving on {socket_path} (pid {os.getpid()})", flush=True)
+    try:
+        while True:
+            conn, _ = server.accept()
+            conn.settimeout(CONNECTION_TIMEOUT)
+            try:
+                _serve_connection(conn)
+            except OSError:
+                # The client went away or stalled; keep serving others
+                continue
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        try:
+            os.unlink(socket_path)
+        except FileNotFoundError:
+            pass
@@ -1,17 +1,63 @@
 """
 Package a skill directory into a .zip file for upload to Claude.
 """
+import hashlib
+import os
+import time
 import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
+from .plugins.io.archive import (
+    ArchiveEntry, ZipMember, ZipWriter, compress_file, deterministic_info, dos_date_time,
+    file_crc, iter_raw_data, member_info, read_chunks, read_entries,
+)
+from .plugins.io.compression import (
+    CompressionDecision, CompressionPolicy, MemberStats, UNCHANGED_REASON,
+)
+from .plugins.io.fs import walk_files
+from .plugins.io.ignore import IgnoreRules
+from .plugins.io.pack_cache import PackCache, tree_hash
 
-def pack_skill(skill_dir: str, output_path: str) -> Path:
+# Bump when the archive layout changes so stale cache entries are not reused
+PACK_FORMAT_VERSION = 1
+
+
+def pack_skill(skill_dir: str, output_path: str, jobs: int = 1,
+               policy: Optional[CompressionPolicy] = None,
+               stats: Optional[List[MemberStats]] = None, deterministic: bool = False,
+               cache: Optional[PackCache] = None, update: bool = False,
+               ignore: Optional[IgnoreRules] = None) -> Path:
     """
     Create a .zip archive of a skill directory.
     Returns the path to the created .zip file.
     
     The ZIP file will have files at the root level (not in a subdirectory)
     as required by Claude's skill upload format.
+    
+    With jobs > 1, members are compressed concurrently in worker threads
+    (zlib releases the GIL) and appended to the archive in order; otherwise
+    each file is compressed straight into the archive.
+    
+    policy decides per file between ZIP_STORED and a DEFLATE level (default:
+    CompressionPolicy()). If stats is given, a MemberStats is appended to it
+    for every member.
+    
+    Entries are always sorted by name. With deterministic, timestamps and
+    permissions are normalized too, so identical content gives identical
+    bytes. A cache (deterministic mode only) is looked up by a Merkle hash
+    of the directory and the policy; on a hit the cached archive is
+    hard-linked (or copied) to output_path without compressing anything.
+    
+    With update, an existing archive at output_path is reused: members whose
+    size, timestamp, permissions, CRC and compression method still match the
+    source file are copied over as raw compressed bytes. Only new or modified
+    files are compressed, and deleted files are dropped.
+    
+    Files matching ignore are left out (default: VCS and build directories
+    plus the rules in the skill's .skillignore).
     """
     skill_path = Path(skill_dir)
     output_file = Path(output_path)
@@ -22,13 +68,205 @@ def pack_skill(skill_dir: str, output_path: str) -> Path:
     # Create parent directory if needed
     output_file.parent.mkdir(parents=True, exist_ok=True)
     
-    # Create zip archive with files at root level
-    with zipfile.ZipFile(output_file, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for file_path in skill_path.rglob('*'):
-            if file_path.is_file():
-                # Add file with path relative to the skill directory itself
-                # This puts files at the root of the ZIP, not in a subdirectory
-                arcname = file_path.relative_to(skill_path)
-                zipf.write(file_path, arcname)
+    files = _collect_files(skill_path, ignore)
+    
+    if policy is None:
+        policy = CompressionPolicy()
+    
+    key = None
+    if deterministic and cache is not None:
+        key = _cache_key(files, policy, jobs)
+        if cache.fetch(key, output_file):
+            return output_file
     
+    previous = None
+    if update and output_file.is_file():
+        try:
+            previous = _PreviousArchive(output_file, read_entries(output_file))
+        except zipfile.BadZipFile:
+            previous = None
+    
+    # Write to a temporary file: output_file may be a hard link into the cache,
+    # and with update it is read while the new archive is written
+    tmp_file = output_file.with_name(f".{output_file.name}.{os.getpid()}.tmp")
+    try:
+        # Create zip archive with files at root level
+        with open(tmp_file, 'wb') as fp:
+            writer = ZipWriter(fp)
+            if jobs <= 1:
+                # Compressed straight into the archive, one chunk at a time
+                for file_path, arcname in files:
+                    member_stats = _write_member(writer, file_path, arcname, policy,
+                                                 deterministic, previous)
+                    if stats is not None:
+                        stats.append(member_stats)
+            else:
+                members = _compress_members(files, jobs, policy, deterministic, previous)
+                for member, data, member_stats in members:
+                    writer.write_compressed(member, data)
+                    if stats is not None:
+                        stats.append(member_stats)
+            writer.close()
+        os.replace(tmp_file, output_file)
+    finally:
+        if tmp_file.exists():
+            tmp_file.unlink()
+    
+    if key is not None:
+        cache.store(key, output_file)
     return output_file
+
+
+def pack_skill_stream(skill_dir: str, fileobj: BinaryIO,
+                      policy: Optional[CompressionPolicy] = None,
+                      stats: Optional[List[MemberStats]] = None, deterministic: bool = False,
+                      ignore: Optional[IgnoreRules] = None) -> int:
+    """
+    Write a .zip archive of a skill directory to a file object, which need
+    not be seekable (a pipe or sys.stdout.buffer). Returns the bytes written.
+    
+    Each member is read, compressed and written chunk by chunk, with its CRC
+    and sizes in a data descriptor after the data, so memory use is bounded
+    per member regardless of file size. Members are written in name order;
+    policy, stats, deterministic and ignore work as in pack_skill.
+    """
+    skill_path = Path(skill_dir)
+    if not skill_path.exists():
+        raise FileNotFoundError(f"Skill directory not found: {skill_dir}")
+    
+    if policy is None:
+        policy = CompressionPolicy()
+    info = deterministic_info if deterministic else member_info
+    
+    writer = ZipWriter(fileobj)
+    for file_path, arcname in _collect_files(skill_path, ignore):
+        start = time.perf_counter()
+        decision = policy.choose(file_path)
+        date_time, external_attr = info(file_path)
+        member = writer.write_stream(
+            arcname, date_time, external_attr, decision.method, decision.level,
+            read_chunks(file_path), size_hint=file_path.stat().st_size
+        )
+        if stats is not None:
+            seconds = time.perf_counter() - start
+            stats.append(MemberStats(arcname, decision, member.file_size,
+                                     member.compress_size, seconds))
+    writer.close()
+    return writer.offset
+
+
+def _collect_files(skill_path: Path, ignore: Optional[IgnoreRules]) -> List[Tuple[Path, str]]:
+    """Files to pack as (path, arcname) pairs, sorted by arcname."""
+    if ignore is None:
+        ignore = IgnoreRules.for_directory(skill_path)
+    
+    # Paths are relative to the skill directory itself, which puts files at
+    # the root of the ZIP, not in a subdirectory
+    files = [(Path(entry.path), arcname) for entry, arcname in walk_files(skill_path, ignore)]
+    files.sort(key=lambda item: item[1])
+    return files
+
+
+def _cache_key(files: List[Tuple[Path, str]], policy: CompressionPolicy, jobs: int) -> str:
+    """Hash of everything that determines a deterministic archive's bytes."""
+    parts = [f"pack-v{PACK_FORMAT_VERSION}", tree_hash(files, jobs), policy.fingerprint()]
+    return hashlib.sha256("\n".join(parts).encode('utf-8')).hexdigest()
+
+
+CompressedMember = Tuple[ZipMember, Iterable[bytes], MemberStats]
+
+
+class _PreviousArchive(NamedTuple):
+    """An earlier archive whose unchanged members can be copied raw."""
+    path: Path
+    entries: Dict[str, ArchiveEntry]
+
+
+def _compress_members(files: List[Tuple[Path, str]], jobs: int, policy: CompressionPolicy,
+                      deterministic: bool = False,
+                      previous: Optional[_PreviousArchive] = None) -> Iterator[CompressedMember]:
+    """
+    Compress files in jobs worker threads, yielding results in input order.
+    At most 2 * jobs compressed members are pending at once; each is held in
+    memory up to SPOOL_THRESHOLD bytes and spooled to a temporary file beyond.
+    """
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        pending = deque()
+        for file_path, arcname in files:
+            pending.append(executor.submit(
+                _compress_member, file_path, arcname, policy, deterministic, previous
+            ))
+            if len(pending) >= 2 * jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _compress_member(file_path: Path, arcname: str, policy: CompressionPolicy,
+                     deterministic: bool = False,
+                     previous: Optional[_PreviousArchive] = None) -> CompressedMember:
+    """
+    Choose a compression method for one file and compress it, or reuse the
+    previous archive's member if the file is unchanged.
+    """
+    start = time.perf_counter()
+    decision = policy.choose(file_path)
+    reused = _reusable_entry(file_path, arcname, decision, deterministic, previous)
+    if reused is not None:
+        return reused + (_reused_stats(reused[0], decision, start),)
+    
+    member, data = compress_file(file_path, arcname, decision.method, decision.level,
+                                 deterministic)
+    seconds = time.perf_counter() - start
+    stats = MemberStats(arcname, decision, member.file_size, member.compress_size, seconds)
+    return member, data, stats
+
+
+def _write_member(writer: ZipWriter, file_path: Path, arcname: str, policy: CompressionPolicy,
+                  deterministic: bool = False,
+                  previous: Optional[_PreviousArchive] = None) -> MemberStats:
+    """Like _compress_member, but writes the member to the archive as it is compressed."""
+    start = time.perf_counter()
+    decision = policy.choose(file_path)
+    reused = _reusable_entry(file_path, arcname, decision, deterministic, previous)
+    if reused is not None:
+        writer.write_compressed(*reused)
+        return _reused_stats(reused[0], decision, start)
+    
+    info = deterministic_info if deterministic else member_info
+    date_time, external_attr = info(file_path)
+    member = writer.write_file(file_path, arcname, date_time, external_attr,
+                               decision.method, decision.level)
+    seconds = time.perf_counter() - start
+    return MemberStats(arcname, decision, member.file_size, member.compress_size, seconds)
+
+
+def _reusable_entry(file_path: Path, arcname: str, decision: CompressionDecision,
+                    deterministic: bool,
+                    previous: Optional[_PreviousArchive]) -> Optional[Tuple[ZipMember, Iterator[bytes]]]:
+    """The previous archive's member and its raw data, if the file is unchanged."""
+    entry = previous.entries.get(arcname) if previous is not None else None
+    if entry is None or not _is_unchanged(file_path, entry.member, decision, deterministic):
+        return None
+    return entry.member, iter_raw_data(previous.path, entry)
+
+
+def _reused_stats(member: ZipMember, decision: CompressionDecision, start: float) -> MemberStats:
+    reused = CompressionDecision(member.method, decision.level, UNCHANGED_REASON)
+    seconds = time.perf_counter() - start
+    return MemberStats(member.name, reused, member.file_size, member.compress_size, seconds)
+
+
+def _is_unchanged(file_path: Path, member: ZipMember, decision: CompressionDecision,
+                  deterministic: bool) -> bool:
+    """Whether a previous member still matches the file and the chosen compression method."""
+    info = deterministic_info if deterministic else member_info
+    date_time, external_attr = info(file_path)
+    # Compared as stored: DOS time only has 2-second resolution
+    return (
+        member.method == decision.method
+        and dos_date_time(member.date_time) == dos_date_time(date_time)
+        and member.external_attr == external_attr
+        and member.file_size == file_path.stat().st_size
+        and member.crc == file_crc(file_path)
+    )
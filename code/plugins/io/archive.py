@@ -0,0 +1,381 @@
+"""
+Low-level ZIP archive writing.
+Members are compressed independently of the archive (so they can be
+compressed in parallel) and then appended with their precomputed CRC and
+sizes, compressed while they are written and followed by a data
+descriptor, or compressed straight into a seekable file whose local
+header is patched afterwards. Only the last needs a seekable file object;
+the others only append, so they can write to pipes and other
+non-seekable streams.
+"""
+import os
+import stat
+import struct
+import time
+import zipfile
+import zlib
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, NamedTuple, Tuple
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+CHUNK_SIZE = 1 << 20
+
+# Compressed members larger than this are spooled to a temporary file
+SPOOL_THRESHOLD = 4 << 20
+
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+_CENTRAL_HEADER = struct.Struct("<4s6H3L5H2L")
+_END_RECORD = struct.Struct("<4s4H2LH")
+_ZIP64_END_RECORD = struct.Struct("<4sQ2H2L4Q")
+_ZIP64_LOCATOR = struct.Struct("<4sLQL")
+_DATA_DESCRIPTOR = struct.Struct("<4s3L")
+_ZIP64_DATA_DESCRIPTOR = struct.Struct("<4sL2Q")
+
+# Sizes, offsets and counts from these limits on need ZIP64 records
+_ZIP32_LIMIT = 0xFFFFFFFF
+_COUNT_LIMIT = 0xFFFF
+_ZIP64_MARKER = 0xFFFFFFFF
+_COUNT_MARKER = 0xFFFF
+_FLAG_ENCRYPTED = 0x1
+_FLAG_DATA_DESCRIPTOR = 0x8
+_FLAG_UTF8 = 0x800
+_MADE_BY_UNIX = 3 << 8
+
+# Earliest timestamp a ZIP entry can hold; used for reproducible archives
+EPOCH_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+class ZipMember(NamedTuple):
+    """Metadata of one archive member."""
+    name: str
+    date_time: Tuple[int, int, int, int, int, int]
+    external_attr: int
+    method: int
+    crc: int
+    file_size: int
+    compress_size: int
+
+
+class ArchiveEntry(NamedTuple):
+    """A member of an existing archive and where its local header starts."""
+    member: ZipMember
+    header_offset: int
+
+
+class _CentralEntry(NamedTuple):
+    member: ZipMember
+    flags: int
+    offset: int
+
+
+def member_info(path: Path) -> Tuple[Tuple[int, ...], int]:
+    """Return (date_time, external_attr) for a file, as zipfile would record them."""
+    st = os.stat(path)
+    date_time = time.localtime(st.st_mtime)[:6]
+    if date_time[0] < 1980:
+        date_time = EPOCH_DATE_TIME
+    return date_time, (st.st_mode & 0xFFFF) << 16
+
+
+def deterministic_info(path: Path) -> Tuple[Tuple[int, ...], int]:
+    """
+    Return (date_time, external_attr) independent of mtime and umask:
+    the ZIP epoch and a regular file mode of 0644, or 0755 if executable.
+    """
+    mode = 0o755 if os.stat(path).st_mode & stat.S_IXUSR else 0o644
+    return EPOCH_DATE_TIME, (stat.S_IFREG | mode) << 16
+
+
+def compress_file(path: Path, arcname: str, method: int = ZIP_DEFLATED,
+                  level: int = zlib.Z_DEFAULT_COMPRESSION,
+                  deterministic: bool = False) -> Tuple[ZipMember, Iterator[bytes]]:
+    """
+    Read and compress one file in chunks.
+    Returns the member metadata and an iterator over the compressed data,
+    which is held in memory up to SPOOL_THRESHOLD bytes and spooled to a
+    temporary file beyond that.
+    With deterministic, the timestamp and permissions are normalized.
+    """
+    # Only parallel packing spools members; keep tempfile out of CLI startup
+    import tempfile
+
+    date_time, external_attr = deterministic_info(path) if deterministic else member_info(path)
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_THRESHOLD)
+    try:
+        crc, file_size, compress_size = _compress_chunks(read_chunks(path), method, level,
+                                                          spool.write)
+    except BaseException:
+        spool.close()
+        raise
+    member = ZipMember(arcname, date_time, external_attr, method, crc, file_size, compress_size)
+    return member, _drain(spool)
+
+
+def _drain(spool: BinaryIO) -> Iterator[bytes]:
+    """Yield a spooled member's data in chunks, then discard the spool."""
+    try:
+        spool.seek(0)
+        for chunk in iter(lambda: spool.read(CHUNK_SIZE), b''):
+            yield chunk
+    finally:
+        spool.close()
+
+
+def _compress_chunks(chunks: Iterable[bytes], method: int, level: int,
+                     write: Callable[[bytes], object]) -> Tuple[int, int, int]:
+    """Compress chunks with method, passing the output to write. Returns (crc, file_size, compress_size)."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15) if method == ZIP_DEFLATED else None
+    crc = 0
+    file_size = 0
+    compress_size = 0
+    for chunk in chunks:
+        crc = zlib.crc32(chunk, crc)
+        file_size += len(chunk)
+        if compressor is not None:
+            chunk = compressor.compress(chunk)
+        if chunk:
+            write(chunk)
+            compress_size += len(chunk)
+    if compressor is not None:
+        chunk = compressor.flush()
+        write(chunk)
+        compress_size += len(chunk)
+    return crc, file_size, compress_size
+
+
+def read_entries(path: Path) -> Dict[str, ArchiveEntry]:
+    """
+    Read the central directory of an existing archive.
+    Only unencrypted STORED or DEFLATED file members are returned, since
+    only those can be copied into a new archive as raw bytes.
+    """
+    entries = {}
+    with zipfile.ZipFile(path) as zf:
+        for info in zf.infolist():
+            if (info.is_dir() or info.flag_bits & _FLAG_ENCRYPTED
+                    or info.compress_type not in (ZIP_STORED, ZIP_DEFLATED)):
+                continue
+            member = ZipMember(info.filename, info.date_time, info.external_attr,
+                               info.compress_type, info.CRC, info.file_size, info.compress_size)
+            entries[info.filename] = ArchiveEntry(member, info.header_offset)
+    return entries
+
+
+def iter_raw_data(path: Path, entry: ArchiveEntry) -> Iterator[bytes]:
+    """Yield a member's compressed bytes from an archive, in chunks, without decompressing."""
+    with open(path, 'rb') as f:
+        f.seek(entry.header_offset)
+        header = f.read(_LOCAL_HEADER.size)
+        if len(header) != _LOCAL_HEADER.size or header[:4] != b"PK\x03\x04":
+            raise ValueError(f"Bad local header for {entry.member.name} in {path}")
+        name_len, extra_len = struct.unpack("<2H", header[-4:])
+        f.seek(name_len + extra_len, os.SEEK_CUR)
+        remaining = entry.member.compress_size
+        while remaining:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                raise ValueError(f"Truncated data for {entry.member.name} in {path}")
+            remaining -= len(chunk)
+            yield chunk
+
+
+def read_chunks(path: Path) -> Iterator[bytes]:
+    """Yield a file's content in CHUNK_SIZE pieces."""
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            yield chunk
+
+
+def file_crc(path: Path) -> int:
+    """CRC-32 of a file's content, as stored in ZIP headers."""
+    crc = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+class ZipWriter:
+    """Append-only ZIP writer for members whose data is already compressed."""
+
+    def __init__(self, fp: BinaryIO):
+        self.fp = fp
+        self.offset = 0
+        self._entries: List[_CentralEntry] = []
+
+    def write_compressed(self, member: ZipMember, data: Iterable[bytes]) -> None:
+        """Write a local header followed by the member's compressed data."""
+        name = member.name.encode('utf-8')
+        flags = _FLAG_UTF8 if not member.name.isascii() else 0
+        zip64 = member.file_size >= _ZIP32_LIMIT or member.compress_size >= _ZIP32_LIMIT
+        extra = b""
+        file_size, compress_size = member.file_size, member.compress_size
+        if zip64:
+            extra = struct.pack("<2H2Q", 0x0001, 16, file_size, compress_size)
+            file_size = compress_size = _ZIP64_MARKER
+        dos_time, dos_date = dos_date_time(member.date_time)
+
+        entry = _CentralEntry(member, flags, self.offset)
+        self._write(_LOCAL_HEADER.pack(
+            b"PK\x03\x04", 45 if zip64 else 20, flags, member.method, dos_time, dos_date,
+            member.crc, compress_size, file_size, len(name), len(extra)
+        ))
+        self._write(name)
+        self._write(extra)
+        for chunk in data:
+            self._write(chunk)
+        self._entries.append(entry)
+
+    def write_stream(self, name: str, date_time: Tuple[int, ...], external_attr: int,
+                     method: int, level: int, chunks: Iterable[bytes],
+                     size_hint: int = 0) -> ZipMember:
+        """
+        Compress and write a member whose CRC and sizes are not known up
+        front, followed by a data descriptor. Only one input chunk and its
+        compressed output are held in memory. size_hint (e.g. from stat)
+        decides whether ZIP64 sizes are reserved; it must not be far below
+        the real size of a member near 4 GiB.
+        """
+        encoded = name.encode('utf-8')
+        flags = _FLAG_DATA_DESCRIPTOR | (_FLAG_UTF8 if not name.isascii() else 0)
+        # DEFLATE can expand incompressible data slightly
+        zip64 = size_hint + (size_hint >> 10) + 1024 >= _ZIP32_LIMIT
+        extra = b""
+        placeholder = 0
+        if zip64:
+            extra = struct.pack("<2H2Q", 0x0001, 16, 0, 0)
+            placeholder = _ZIP64_MARKER
+        dos_time, dos_date = dos_date_time(date_time)
+
+        offset = self.offset
+        self._write(_LOCAL_HEADER.pack(
+            b"PK\x03\x04", 45 if zip64 else 20, flags, method, dos_time, dos_date,
+            0, placeholder, placeholder, len(encoded), len(extra)
+        ))
+        self._write(encoded)
+        self._write(extra)
+
+        crc, file_size, compress_size = _compress_chunks(chunks, method, level, self._write)
+
+        if zip64:
+            self._write(_ZIP64_DATA_DESCRIPTOR.pack(b"PK\x07\x08", crc, compress_size, file_size))
+        elif file_size >= _ZIP32_LIMIT or compress_size >= _ZIP32_LIMIT:
+            raise ValueError(f"{name} grew past 4 GiB while being written; size_hint was {size_hint}")
+        else:
+            self._write(_DATA_DESCRIPTOR.pack(b"PK\x07\x08", crc, compress_size, file_size))
+
+        member = ZipMember(name, tuple(date_time), external_attr, method, crc, file_size, compress_size)
+        self._entries.append(_CentralEntry(member, flags, offset))
+        return member
+
+    def write_file(self, path: Path, arcname: str, date_time: Tuple[int, ...],
+                   external_attr: int, method: int, level: int) -> ZipMember:
+        """
+        Compress a file straight into the archive, then seek back and fill
+        in the local header's CRC and sizes. Only one chunk is held in
+        memory. The file object must be seekable; the result is the same
+        as write_compressed for members below 4 GiB.
+        """
+        size_hint = os.stat(path).st_size
+        encoded = arcname.encode('utf-8')
+        flags = _FLAG_UTF8 if not arcname.isascii() else 0
+        # DEFLATE can expand incompressible data slightly
+        zip64 = size_hint + (size_hint >> 10) + 1024 >= _ZIP32_LIMIT
+        extra = struct.pack("<2H2Q", 0x0001, 16, 0, 0) if zip64 else b""
+        dos_time, dos_date = dos_date_time(date_time)
+
+        offset = self.offset
+        header_pos = self.fp.tell()
+        self._write(_LOCAL_HEADER.pack(
+            b"PK\x03\x04", 45 if zip64 else 20, flags, method, dos_time, dos_date,
+            0, 0, 0, len(encoded), len(extra)
+        ))
+        self._write(encoded)
+        self._write(extra)
+        crc, file_size, compress_size = _compress_chunks(read_chunks(path), method, level,
+                                                         self._write)
+        if not zip64 and (file_size >= _ZIP32_LIMIT or compress_size >= _ZIP32_LIMIT):
+            raise ValueError(f"{arcname} grew past 4 GiB while being written")
+
+        end_pos = self.fp.tell()
+        # CRC-32, compressed size and size follow the version, flags, method, time and date
+        self.fp.seek(header_pos + 14)
+        if zip64:
+            self.fp.write(struct.pack("<3L", crc, _ZIP64_MARKER, _ZIP64_MARKER))
+            self.fp.seek(header_pos + _LOCAL_HEADER.size + len(encoded) + 4)
+            self.fp.write(struct.pack("<2Q", file_size, compress_size))
+        else:
+            self.fp.write(struct.pack("<3L", crc, compress_size, file_size))
+        self.fp.seek(end_pos)
+
+        member = ZipMember(arcname, tuple(date_time), external_attr, method, crc, file_size,
+                           compress_size)
+        self._entries.append(_CentralEntry(member, flags, offset))
+        return member
+
+    def close(self) -> None:
+        """Write the central directory and end-of-archive records."""
+        cd_offset = self.offset
+        for entry in self._entries:
+            self._write_central_header(entry)
+        cd_size = self.offset - cd_offset
+        count = len(self._entries)
+
+        if count >= _COUNT_LIMIT or cd_offset >= _ZIP32_LIMIT or cd_size >= _ZIP32_LIMIT:
+            zip64_end_offset = self.offset
+            self._write(_ZIP64_END_RECORD.pack(
+                b"PK\x06\x06", _ZIP64_END_RECORD.size - 12, 45, 45, 0, 0,
+                count, count, cd_size, cd_offset
+            ))
+            self._write(_ZIP64_LOCATOR.pack(b"PK\x06\x07", 0, zip64_end_offset, 1))
+            if count >= _COUNT_LIMIT:
+                count = _COUNT_MARKER
+            if cd_offset >= _ZIP32_LIMIT:
+                cd_offset = _ZIP64_MARKER
+            if cd_size >= _ZIP32_LIMIT:
+                cd_size = _ZIP64_MARKER
+
+        self._write(_END_RECORD.pack(b"PK\x05\x06", 0, 0, count, count, cd_size, cd_offset, 0))
+        self.fp.flush()
+
+    def _write_central_header(self, entry: _CentralEntry) -> None:
+        member = entry.member
+        name = member.name.encode('utf-8')
+        file_size, compress_size, offset = member.file_size, member.compress_size, entry.offset
+        zip64_fields = []
+        if file_size >= _ZIP32_LIMIT:
+            zip64_fields.append(file_size)
+            file_size = _ZIP64_MARKER
+        if compress_size >= _ZIP32_LIMIT:
+            zip64_fields.append(compress_size)
+            compress_size = _ZIP64_MARKER
+        if offset >= _ZIP32_LIMIT:
+            zip64_fields.append(offset)
+            offset = _ZIP64_MARKER
+        extra = b""
+        if zip64_fields:
+            extra = struct.pack(f"<2H{len(zip64_fields)}Q", 0x0001, 8 * len(zip64_fields), *zip64_fields)
+        version = 45 if zip64_fields else 20
+        dos_time, dos_date = dos_date_time(member.date_time)
+
+        self._write(_CENTRAL_HEADER.pack(
+            b"PK\x01\x02", _MADE_BY_UNIX | version, version, entry.flags, member.method,
+            dos_time, dos_date, member.crc, compress_size, file_size,
+            len(name), len(extra), 0, 0, 0, member.external_attr, offset
+        ))
+        self._write(name)
+        self._write(extra)
+
+    def _write(self, data: bytes) -> None:
+        self.fp.write(data)
+        self.offset += len(data)
+
+
+def dos_date_time(date_time: Tuple[int, ...]) -> Tuple[int, int]:
+    """(time, date) as stored in ZIP headers; seconds are truncated to an even number."""
+    year, month, day, hour, minute, second = date_time
+    dos_date = (year - 1980) << 9 | month << 5 | day
+    dos_time = hour << 11 | minute << 5 | second // 2
+    return dos_time, dos_date
@@ -0,0 +1,149 @@
+"""
+Per-member compression policy for skill archives.
+Chooses ZIP_STORED or a DEFLATE level for each file from its extension or,
+failing that, from a trial compression of its first 64 KiB.
+"""
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+from .archive import ZIP_DEFLATED, ZIP_STORED
+
+SAMPLE_SIZE = 64 * 1024
+DEFAULT_LEVEL = 6
+
+# Deflated bytes needed before their timing is trusted as a cost estimate
+MIN_COST_BYTES = 64 * 1024
+
+# Reason recorded for members copied unchanged from a previous archive
+UNCHANGED_REASON = "unchanged"
+
+# Formats that are already compressed; deflating them wastes CPU
+STORED_EXTENSIONS = {
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".heic",
+    ".pdf", ".zip", ".gz", ".tgz", ".bz2", ".xz", ".zst", ".7z", ".rar",
+    ".docx", ".xlsx", ".pptx", ".odt", ".ods", ".epub", ".jar", ".whl",
+    ".mp3", ".mp4", ".m4a", ".mov", ".ogg", ".webm", ".woff", ".woff2",
+}
+
+# Text formats that always compress well; no need to sample them
+DEFLATED_EXTENSIONS = {
+    ".md", ".txt", ".csv", ".tsv", ".json", ".jsonl", ".yaml", ".yml",
+    ".xml", ".html", ".htm", ".css", ".js", ".ts", ".py", ".sh", ".sql",
+    ".tmpl", ".svg", ".ini", ".toml", ".rst",
+}
+
+
+class CompressionDecision(NamedTuple):
+    """How one member is stored and why."""
+    method: int
+    level: int
+    reason: str
+    # Seconds spent deflating the sample per input byte, if a sample was taken
+    sample_cost: Optional[float] = None
+
+
+class MemberStats(NamedTuple):
+    """Outcome of compressing one member."""
+    name: str
+    decision: CompressionDecision
+    file_size: int
+    compress_size: int
+    seconds: float
+
+
+class CompressionPolicy:
+    """
+    Decide how to compress each archive member.
+
+    rules maps lowercase extensions (".csv") to a DEFLATE level, where 0 means
+    ZIP_STORED; they take precedence over the built-in extension lists.
+    Files with other extensions are sampled: if deflating the first 64 KiB
+    saves less than min_saving of its size, the file is stored.
+    """
+
+    def __init__(self, level: int = DEFAULT_LEVEL, rules: Optional[Dict[str, int]] = None,
+                 min_saving: float = 0.05):
+        self.level = level
+        self.rules = {ext.lower(): lvl for ext, lvl in (rules or {}).items()}
+        self.min_saving = min_saving
+
+    def fingerprint(self) -> str:
+        """Stable description of the policy, for cache keys."""
+        rules = ",".join(f"{ext}={lvl}" for ext, lvl in sorted(self.rules.items()))
+        return f"level={self.level};rules={rules};min_saving={self.min_saving}"
+
+    def choose(self, path: Path) -> CompressionDecision:
+        """Pick the compression method and level for a file."""
+        suffix = path.suffix.lower()
+        if suffix in self.rules:
+            return self._decision(self.rules[suffix], f"rule {suffix}")
+        if self.level == 0:
+            return self._decision(0, "level 0")
+        if suffix in STORED_EXTENSIONS:
+            return self._decision(0, "compressed format")
+        if suffix in DEFLATED_EXTENSIONS:
+            return self._decision(self.level, "text format")
+
+        with open(path, 'rb') as f:
+            sample = f.read(SAMPLE_SIZE)
+        if not sample:
+            return self._decision(0, "empty")
+        start = time.perf_counter()
+        compressed = zlib.compress(sample, self.level)
+        cost = (time.perf_counter() - start) / len(sample)
+        if len(compressed) > len(sample) * (1 - self.min_saving):
+            return self._decision(0, "incompressible sample", cost)
+        return self._decision(self.level, "compressible sample", cost)
+
+    @staticmethod
+    def _decision(level: int, reason: str, cost: Optional[float] = None) -> CompressionDecision:
+        if level == 0:
+            return CompressionDecision(ZIP_STORED, 0, reason, cost)
+        return CompressionDecision(ZIP_DEFLATED, level, reason, cost)
+
+
+def summarize_stats(stats: List[MemberStats]) -> List[str]:
+    """
+    Summarize compression decisions, one line per reason.
+    Time saved by storing is estimated from the DEFLATE cost per byte of
+    the members deflated in the same run if they add up to MIN_COST_BYTES,
+    else from the samples taken; without either it is left out.
+    """
+    deflated = [s for s in stats
+                if s.decision.method == ZIP_DEFLATED and s.decision.reason != UNCHANGED_REASON]
+    deflated_bytes = sum(s.file_size for s in deflated)
+    deflated_seconds = sum(s.seconds for s in deflated)
+    sample_costs = [s.decision.sample_cost for s in stats if s.decision.sample_cost is not None]
+    if deflated_bytes >= MIN_COST_BYTES:
+        cost_per_byte = deflated_seconds / deflated_bytes
+    elif sample_costs:
+        cost_per_byte = sum(sample_costs) / len(sample_costs)
+    else:
+        cost_per_byte = None
+
+    groups: Dict[tuple, List[MemberStats]] = {}
+    for s in stats:
+        if s.decision.reason == UNCHANGED_REASON:
+            method = "copied"
+        elif s.decision.method == ZIP_STORED:
+            method = "stored"
+        else:
+            method = f"deflate-{s.decision.level}"
+        groups.setdefault((method, s.decision.reason), []).append(s)
+
+    lines = []
+    for (method, reason), members in sorted(groups.items()):
+        size = sum(m.file_size for m in members)
+        compressed = sum(m.compress_size for m in members)
+        seconds = sum(m.seconds for m in members)
+        line = (
+            f"{method:<10} {reason:<22} {len(members):>6} files  "
+            f"{size:>12,} -> {compressed:>12,} bytes  (saved {size - compressed:,} bytes, "
+            f"{seconds:.2f}s)"
+        )
+        if method == "stored" and cost_per_byte is not None:
+            line += f"  ~{size * cost_per_byte:.2f}s of DEFLATE avoided"
+        lines.append(line)
+    return lines
@@ -1,8 +1,11 @@
 """
 File system operations with safety checks.
 """
-from pathlib import Path
-from typing import List
+import os
+from pathlib import Path, PurePosixPath
+from typing import Iterator, List, Optional, Tuple
+
+from .ignore import IgnoreRules
 
 
 def safe_path(base_dir: Path, target: str) -> Path:
@@ -18,6 +21,33 @@ def safe_path(base_dir: Path, target: str) -> Path:
     return full_path
 
 
-def list_files(directory: Path, pattern: str = "*") -> List[Path]:
-    """List all files matching pattern in directory."""
-    return [f for f in directory.rglob(pattern) if f.is_file()]
+def walk_files(directory: Path, ignore: Optional[IgnoreRules] = None) -> Iterator[Tuple[os.DirEntry, str]]:
+    """
+    Yield (entry, relative posix path) for every file under directory.
+    
+    Uses os.scandir, so file types come from the directory listing instead
+    of a stat() per entry. Ignored directories are pruned before they are
+    read. Like Path.rglob, symlinks to files are included but symlinked
+    directories are not descended into.
+    """
+    stack = [(str(directory), "")]
+    while stack:
+        path, prefix = stack.pop()
+        with os.scandir(path) as entries:
+            for entry in entries:
+                relpath = prefix + entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if ignore is None or not ignore.match(relpath, is_dir=True):
+                        stack.append((entry.path, relpath + "/"))
+                elif entry.is_file():
+                    if ignore is None or not ignore.match(relpath):
+                        yield entry, relpath
+
+
+def list_files(directory: Path, pattern: str = "*",
+               ignore: Optional[IgnoreRules] = None) -> List[Path]:
+    """List all files matching pattern in directory, skipping ignored paths."""
+    return [
+        Path(entry.path) for entry, relpath in walk_files(directory, ignore)
+        if PurePosixPath(relpath).match(pattern)
+    ]
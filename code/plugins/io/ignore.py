@@ -0,0 +1,157 @@
+"""
+.skillignore support: gitignore-style exclusion rules for packing.
+All rules are compiled into one regex per entry kind, so matching a path
+costs a single regex call regardless of the number of rules.
+"""
+import re
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+IGNORE_FILE_NAME = ".skillignore"
+
+# Always excluded unless re-included with a "!" rule in .skillignore
+DEFAULT_IGNORE_PATTERNS = [
+    ".git/",
+    ".hg/",
+    ".svn/",
+    "__pycache__/",
+    "node_modules/",
+    ".skillbuild/",
+    ".skillbuild.json",
+    IGNORE_FILE_NAME,
+    ".DS_Store",
+]
+
+
+class _Rule(NamedTuple):
+    regex: str
+    negated: bool
+    dir_only: bool
+
+
+class IgnoreRules:
+    """
+    Compiled gitignore-syntax rules.
+
+    Supports comments, "!" negation, trailing "/" for directories only,
+    anchoring with a leading or inner "/", and the "*", "?", "[...]" and
+    "**" wildcards. As in git, the last matching rule wins, and a file
+    inside an ignored directory cannot be re-included.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: List[str] = list(patterns)
+        rules = [rule for rule in (_parse_line(line) for line in self.patterns) if rule]
+        self._file_matcher = _combine([r for r in rules if not r.dir_only])
+        self._dir_matcher = _combine(rules)
+
+    @classmethod
+    def for_directory(cls, directory: Path,
+                      defaults: Optional[Iterable[str]] = None) -> "IgnoreRules":
+        """Default rules followed by the directory's .skillignore, if any."""
+        patterns = list(DEFAULT_IGNORE_PATTERNS if defaults is None else defaults)
+        ignore_file = Path(directory) / IGNORE_FILE_NAME
+        if ignore_file.is_file():
+            with open(ignore_file, 'r', encoding='utf-8') as f:
+                patterns.extend(f.read().splitlines())
+        return cls(patterns)
+
+    def match(self, relpath: str, is_dir: bool = False) -> bool:
+        """Whether a path relative to the root (posix separators) is ignored."""
+        matcher = self._dir_matcher if is_dir else self._file_matcher
+        if matcher is None:
+            return False
+        pattern, negations = matcher
+        m = pattern.fullmatch(relpath)
+        return m is not None and not negations[m.lastindex - 1]
+
+
+def _combine(rules: List[_Rule]) -> Optional[Tuple["re.Pattern", List[bool]]]:
+    """
+    Join rules into one alternation, last rule first: fullmatch then returns
+    the last matching rule, whose group index says whether it negates.
+    """
+    if not rules:
+        return None
+    ordered = rules[::-1]
+    pattern = re.compile("|".join(f"({rule.regex})" for rule in ordered), re.DOTALL)
+    return pattern, [rule.negated for rule in ordered]
+
+
+def _parse_line(line: str) -> Optional[_Rule]:
+    line = line.rstrip("\n")
+    # Trailing spaces are ignored unless escaped
+    stripped = line.rstrip(" ")
+    if stripped.endswith("\\") and len(stripped) < len(line):
+        stripped += " "
+    line = stripped
+    if not line or line.startswith("#"):
+        return None
+
+    negated = line.startswith("!")
+    if negated:
+        line = line[1:]
+    elif line.startswith("\\"):
+        line = line[1:]
+
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+
+    anchored = "/" in line
+    line = line.lstrip("/")
+    body = _translate(line)
+    if not anchored:
+        body = "(?:.*/)?" + body
+    return _Rule(body, negated, dir_only)
+
+
+def _translate(pattern: str) -> str:
+    """Translate one gitignore pattern (no leading/trailing slash) to a regex."""
+    parts = pattern.split("/")
+    out = []
+    for i, part in enumerate(parts):
+        last = i == len(parts) - 1
+        if part == "**":
+            if last:
+                # "a/**" matches everything inside a
+                out.append(".+")
+            else:
+                # "**/" matches zero or more directories
+                out.append("(?:[^/]+/)*")
+            continue
+        out.append(_translate_segment(part))
+        if not last:
+            out.append("/")
+    return "".join(out)
+
+
+def _translate_segment(segment: str) -> str:
+    out = []
+    i, n = 0, len(segment)
+    while i < n:
+        c = segment[i]
+        i += 1
+        if c == "*":
+            while i < n and segment[i] == "*":
+                i += 1
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "\\" and i < n:
+            out.append(re.escape(segment[i]))
+            i += 1
+        elif c == "[":
+            end = segment.find("]", i + 1 if i < n and segment[i] in "!^" else i)
+            if end == -1:
+                out.append(re.escape(c))
+                continue
+            body = segment[i:end]
+            i = end + 1
+            if body[:1] in ("!", "^"):
+                body = "^" + body[1:]
+            out.append("[" + body.replace("\\", "\\\\") + "]")
+        else:
+            out.append(re.escape(c))
+    return "".join(out)
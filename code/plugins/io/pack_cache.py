@@ -0,0 +1,103 @@
+"""
+Content-addressed cache of packed skill archives.
+Archives are keyed by a Merkle hash of the skill directory plus the packing
+options, so packing an unchanged directory reuses the cached archive.
+"""
+import hashlib
+import os
+import shutil
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Overrides the default cache location
+CACHE_ENV_VAR = "SKILLS_PACK_CACHE"
+
+
+def default_cache_dir() -> Path:
+    """Return $SKILLS_PACK_CACHE, or the user cache dir (XDG_CACHE_HOME or ~/.cache)."""
+    env_dir = os.getenv(CACHE_ENV_VAR)
+    if env_dir:
+        return Path(env_dir).expanduser()
+    cache_home = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "skills-builder" / "packs"
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def tree_hash(files: List[Tuple[Path, str]], jobs: int = 1) -> str:
+    """
+    Merkle hash of the files to pack, given as (path, arcname) pairs.
+    Each directory hashes its sorted children (name, kind, executable bit
+    and content or subtree hash), so the result depends only on content and
+    layout, not on mtimes or walk order.
+    """
+    paths = [path for path, _ in files]
+    if jobs > 1:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            digests = list(executor.map(file_digest, paths))
+    else:
+        digests = [file_digest(path) for path in paths]
+
+    root: Dict[str, object] = {}
+    for (path, arcname), digest in zip(files, digests):
+        *parents, name = arcname.split("/")
+        node = root
+        for part in parents:
+            node = node.setdefault(part, {})
+        executable = bool(os.stat(path).st_mode & stat.S_IXUSR)
+        node[name] = f"{'x' if executable else '-'}{digest}"
+    return _hash_node(root)
+
+
+def _hash_node(node: Dict[str, object]) -> str:
+    lines = []
+    for name in sorted(node):
+        child = node[name]
+        if isinstance(child, dict):
+            lines.append(f"D {name} {_hash_node(child)}")
+        else:
+            lines.append(f"F {name} {child}")
+    return hashlib.sha256("\n".join(lines).encode('utf-8')).hexdigest()
+
+
+class PackCache:
+    """Archives stored as <cache_dir>/<key[:2]>/<key>.zip."""
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+
+    def path_for(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.zip"
+
+    def fetch(self, key: str, output_file: Path) -> bool:
+        """Place the cached archive at output_file (hard link, else copy). False on a miss."""
+        cached = self.path_for(key)
+        if not cached.exists():
+            return False
+        _link_or_copy(cached, output_file)
+        return True
+
+    def store(self, key: str, archive: Path) -> None:
+        """Add a freshly packed archive to the cache."""
+        cached = self.path_for(key)
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        _link_or_copy(archive, cached)
+
+
+def _link_or_copy(source: Path, target: Path) -> None:
+    """Atomically make target a hard link to (or, across devices, a copy of) source."""
+    tmp_target = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    try:
+        os.link(source, tmp_target)
+    except OSError:
+        shutil.copyfile(source, tmp_target)
+    os.replace(tmp_target, target)
@@ -0,0 +1,185 @@
+"""
+File change notification for watch mode.
+Uses Linux inotify through ctypes when available and falls back to
+polling directory snapshots elsewhere. Both report changed file paths in
+debounced batches.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# inotify event bits (from <sys/inotify.h>)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+               | IN_DELETE | IN_DELETE_SELF)
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Seconds without new events before a batch is reported
+DEFAULT_DEBOUNCE = 0.2
+
+# Seconds between snapshots in polling mode
+DEFAULT_POLL_INTERVAL = 0.5
+
+
+class InotifyWatcher:
+    """
+    Recursive inotify watch on a set of directories. Directories created
+    later are watched as they appear. Raises OSError if inotify is not
+    available.
+    """
+
+    def __init__(self, roots: Iterable[Path]):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._fd = fd
+        self._dirs: Dict[int, Path] = {}
+        self.overflowed = False
+        for root in roots:
+            self._watch_tree(Path(root))
+
+    def fileno(self) -> int:
+        return self._fd
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until events are pending or timeout expires."""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        return bool(readable)
+
+    def read(self) -> Set[Path]:
+        """Drain pending events and return the paths they concern."""
+        changed: Set[Path] = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    self.overflowed = True
+                    continue
+                directory = self._dirs.get(wd)
+                if mask & IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    continue
+                if directory is None or not name:
+                    continue
+                path = directory / os.fsdecode(name)
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        # Files written before the watch was added get no events
+                        self._watch_tree(path)
+                        changed.update(p for p in path.rglob("*") if p.is_file())
+                    continue
+                changed.add(path)
+
+    def _watch_tree(self, root: Path) -> None:
+        for directory, _, _ in os.walk(root):
+            wd = self._add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+            if wd >= 0:
+                self._dirs[wd] = Path(directory)
+
+
+class PollingWatcher:
+    """Snapshot (mtime, size) of every file under the roots and diff on each poll."""
+
+    def __init__(self, roots: Iterable[Path], interval: float = DEFAULT_POLL_INTERVAL):
+        self.roots = [Path(r) for r in roots]
+        self.interval = interval
+        self.overflowed = False
+        self._snapshot = self._scan()
+        self._pending: Set[Path] = set()
+
+    def close(self) -> None:
+        pass
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snapshot = self._scan()
+            if snapshot != self._snapshot:
+                self._pending.update(
+                    path for path in snapshot.keys() | self._snapshot.keys()
+                    if snapshot.get(path) != self._snapshot.get(path)
+                )
+                self._snapshot = snapshot
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            delay = self.interval
+            if deadline is not None:
+                delay = min(delay, max(0.0, deadline - time.monotonic()))
+            time.sleep(delay)
+
+    def read(self) -> Set[Path]:
+        changed, self._pending = self._pending, set()
+        return changed
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        snapshot = {}
+        for root in self.roots:
+            for directory, _, filenames in os.walk(root):
+                for name in filenames:
+                    path = Path(directory) / name
+                    try:
+                        st = path.stat()
+                    except OSError:
+                        continue
+                    snapshot[path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+
+def open_watcher(roots: Iterable[Path], poll: bool = False):
+    """An InotifyWatcher, or a PollingWatcher if poll is set or inotify is unavailable."""
+    roots = list(roots)
+    if not poll:
+        try:
+            return InotifyWatcher(roots)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(roots)
+
+
+def next_batch(watcher, debounce: float = DEFAULT_DEBOUNCE) -> List[Path]:
+    """
+    Block until something changes, then keep collecting until no event
+    has arrived for debounce seconds. Returns the changed paths, sorted.
+    """
+    watcher.wait()
+    changed = watcher.read()
+    while watcher.wait(debounce):
+        changed |= watcher.read()
+    return sorted(changed)
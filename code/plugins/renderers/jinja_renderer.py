@@ -1,113 +1,372 @@
 """
 Minimal Jinja2-like template renderer (no external dependencies).
-Supports basic variable substitution and simple loops.
+Supports variable substitution, loops, conditionals and whitespace control.
+
+Templates are tokenized in a single pass and parsed with an explicit block
+stack into a node tree, which is cached by content hash. Rendering walks the
+tree once, so cost grows linearly with template size regardless of nesting.
 """
+import hashlib
+import operator
 import re
-from typing import Dict, Any
+from collections import ChainMap, OrderedDict
+from typing import Dict, Any, Callable, Iterator, List, Optional, TextIO, Tuple
+
+# Maximum number of compiled templates kept in memory
+CACHE_SIZE = 128
+
+# {{ expr }} / {% statement %} with optional '-' whitespace-control markers
+_TAG_PATTERN = re.compile(
+    r'\{\{(-?)(.*?)(-?)\}\}|\{%(-?)(.*?)(-?)%\}',
+    re.DOTALL
+)
+_FOR_PATTERN = re.compile(r'for\s+(\w+)\s+in\s+(.+)', re.DOTALL)
+_EXPR_TOKEN_PATTERN = re.compile(
+    r"\s*(?:(\d+)|'([^']*)'|\"([^\"]*)\"|(==|!=|<=|>=|[<>()|.])|([A-Za-z_]\w*))"
+)
+
+# Node kinds
+_TEXT = 0    # (_TEXT, text)
+_OUTPUT = 1  # (_OUTPUT, expression)
+_FOR = 2     # (_FOR, target name, iterable expression, body nodes)
+_IF = 3      # (_IF, [(condition or None for else, body nodes), ...])
+
+Node = Tuple[Any, ...]
+Expression = Callable[[Dict[str, Any]], Any]
+
+_COMPARISONS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '>': operator.gt,
+    '<=': operator.le,
+    '>=': operator.ge,
+}
+
+_FILTERS = {
+    'length': lambda value: len(value) if hasattr(value, '__len__') else 0,
+    'lower': lambda value: str(value).lower() if value is not None else '',
+    'upper': lambda value: str(value).upper() if value is not None else '',
+    'trim': lambda value: str(value).strip() if value is not None else '',
+}
+
+_LITERALS = {
+    'true': True, 'True': True,
+    'false': False, 'False': False,
+    'none': None, 'None': None,
+}
+
+_cache: "OrderedDict[str, CompiledTemplate]" = OrderedDict()
+
+
+class TemplateSyntaxError(ValueError):
+    """Raised when a template cannot be parsed."""
+
+
+class CompiledTemplate:
+    """A template parsed into a node tree that renders in a single pass."""
+
+    def __init__(self, nodes: List[Node]):
+        self.nodes = nodes
+
+    def render(self, context: Dict[str, Any]) -> str:
+        """Render the compiled template with the given context."""
+        return ''.join(_iterate(self.nodes, context))
+
+    def render_iter(self, context: Dict[str, Any]) -> Iterator[str]:
+        """Yield rendered output fragments in order."""
+        return _iterate(self.nodes, context)
+
+    def render_to(self, fp: TextIO, context: Dict[str, Any]) -> None:
+        """Write rendered output to an open text file, fragment by fragment."""
+        write = fp.write
+        for fragment in _iterate(self.nodes, context):
+            write(fragment)
+
+
+def compile_template(template: str) -> CompiledTemplate:
+    """
+    Return the compiled form of a template.
+    Compiled templates are kept in a bounded LRU cache keyed by content hash.
+    """
+    key = hashlib.sha1(template.encode('utf-8')).hexdigest()
+    compiled = _cache.get(key)
+    if compiled is not None:
+        _cache.move_to_end(key)
+        return compiled
+
+    compiled = CompiledTemplate(_compile(template))
+    _cache[key] = compiled
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return compiled
 
 
 def render(template: str, context: Dict[str, Any]) -> str:
     """
     Render a template with the given context.
     Supports:
-    - {{ variable }}
-    - {% for item in items %}...{% endfor %}
-    - {{ item.property }}
+    - {{ variable }}, {{ item.property }}, {{ items|length }}
+    - {% for item in items %}...{% endfor %} (nestable, with loop.index)
+    - {% if cond %}...{% elif cond %}...{% else %}...{% endif %}
+    - {%- ... -%} / {{- ... -}} whitespace control
     """
-    output = template
-    
-    # Handle for loops first
-    output = _render_loops(output, context)
-    
-    # Handle variable substitution
-    output = _render_variables(output, context)
-    
-    return output
-
-
-def _render_variables(text: str, context: Dict[str, Any]) -> str:
-    """Replace {{ variable }} with values from context."""
-    def replace_var(match):
-        var_name = match.group(1).strip()
-        parts = var_name.split('.')
-        
-        value = context
-        for part in parts:
-            if isinstance(value, dict):
-                value = value.get(part, '')
-            else:
-                return ''
-        
-        return str(value) if value is not None else ''
-    
-    return re.sub(r'\{\{\s*([^}]+)\s*\}\}', replace_var, text)
-
-
-def _render_loops(text: str, context: Dict[str, Any]) -> str:
-    """Handle {% for item in items %}...{% endfor %}"""
-    pattern = r'\{%\s*for\s+(\w+)\s+in\s+(\w+(?:\.\w+)*)\s*-%?\}\s*(.*?)\s*\{%\s*endfor\s*%\}'
-    
-    def replace_loop(match):
-        item_name = match.group(1)
-        list_name = match.group(2)
-        loop_body = match.group(3)
-        
-        # Get the list from context
-        parts = list_name.split('.')
-        items = context
-        for part in parts:
-            if isinstance(items, dict):
-                items = items.get(part, [])
-            else:
-                items = []
-        
-        if not isinstance(items, list):
-            return ''
-        
-        # Render each iteration
-        result = []
-        for i, item in enumerate(items):
-            loop_context = context.copy()
-            loop_context[item_name] = item
-            loop_context['loop'] = {'index': i + 1, 'index0': i}
-            
-            iteration = loop_body
-            # Replace loop variables
-            iteration = re.sub(
-                r'\{\{\s*' + item_name + r'(?:\.(\w+))?\s*\}\}',
-                lambda m: str(item.get(m.group(1)) if m.group(1) and isinstance(item, dict) else item),
-                iteration
-            )
-            iteration = re.sub(
-                r'\{\{\s*loop\.(\w+)\s*\}\}',
-                lambda m: str(loop_context['loop'].get(m.group(1), '')),
-                iteration
-            )
-            result.append(iteration)
-        
-        return ''.join(result)
-    
-    return re.sub(pattern, replace_loop, text, flags=re.DOTALL)
-
-
-def _render_conditionals(text: str, context: Dict[str, Any]) -> str:
-    """Handle {% if condition %}...{% endif %} (basic support)."""
-    pattern = r'\{%\s*if\s+(\w+(?:\.\w+)*)\s*%\}(.*?)\{%\s*endif\s*%\}'
-    
-    def replace_if(match):
-        condition = match.group(1)
-        content = match.group(2)
-        
-        # Get condition value
-        parts = condition.split('.')
-        value = context
-        for part in parts:
-            if isinstance(value, dict):
-                value = value.get(part)
-            else:
-                value = None
-        
-        # Return content if truthy
-        return content if value else ''
-    
-    return re.sub(pattern, replace_if, text, flags=re.DOTALL)
+    return compile_template(template).render(context)
+
+
+def render_iter(template: str, context: Dict[str, Any]) -> Iterator[str]:
+    """Render a template lazily, yielding output fragments."""
+    return compile_template(template).render_iter(context)
+
+
+def render_to(fp: TextIO, template: str, context: Dict[str, Any]) -> None:
+    """Render a template directly into an open text file."""
+    compile_template(template).render_to(fp, context)
+
+
+def _compile(template: str) -> List[Node]:
+    """Tokenize and parse template text into a node tree."""
+    root: List[Node] = []
+    # Each frame is [tag, node, body currently receiving children]
+    stack: List[list] = [['root', None, root]]
+    pos = 0
+    strip_next = False
+
+    for match in _TAG_PATTERN.finditer(template):
+        text = template[pos:match.start()]
+        if strip_next:
+            text = text.lstrip()
+        if match.group(1) or match.group(4):
+            text = text.rstrip()
+        if text:
+            stack[-1][2].append((_TEXT, text))
+        pos = match.end()
+        strip_next = bool(match.group(3) or match.group(6))
+
+        if match.group(5) is None:
+            stack[-1][2].append((_OUTPUT, _compile_expr(match.group(2).strip())))
+            continue
+
+        statement = match.group(5).strip()
+        keyword = statement.split(None, 1)[0] if statement else ''
+        frame = stack[-1]
+
+        if keyword == 'for':
+            for_match = _FOR_PATTERN.fullmatch(statement)
+            if not for_match:
+                raise TemplateSyntaxError(f"Invalid for statement: {{% {statement} %}}")
+            body: List[Node] = []
+            node = (_FOR, for_match.group(1), _compile_expr(for_match.group(2).strip()), body)
+            frame[2].append(node)
+            stack.append(['for', node, body])
+        elif keyword == 'if':
+            body = []
+            node = (_IF, [(_compile_expr(statement[2:].strip()), body)])
+            frame[2].append(node)
+            stack.append(['if', node, body])
+        elif keyword in ('elif', 'else'):
+            if frame[0] != 'if':
+                raise TemplateSyntaxError(f"Unexpected {{% {keyword} %}} outside of if block")
+            condition = _compile_expr(statement[4:].strip()) if keyword == 'elif' else None
+            body = []
+            frame[1][1].append((condition, body))
+            frame[2] = body
+            if keyword == 'else':
+                frame[0] = 'else'
+        elif keyword in ('endfor', 'endif'):
+            expected = ('for',) if keyword == 'endfor' else ('if', 'else')
+            if frame[0] not in expected:
+                raise TemplateSyntaxError(f"Unexpected {{% {keyword} %}}")
+            stack.pop()
+        else:
+            raise TemplateSyntaxError(f"Unknown tag: {{% {statement} %}}")
+
+    if len(stack) > 1:
+        raise TemplateSyntaxError(f"Unclosed {{% {stack[-1][0]} %}} block")
+
+    text = template[pos:]
+    if strip_next:
+        text = text.lstrip()
+    if text:
+        root.append((_TEXT, text))
+    return root
+
+
+def _iterate(nodes: List[Node], scope: Dict[str, Any]) -> Iterator[str]:
+    """Yield the rendered output of nodes."""
+    for node in nodes:
+        kind = node[0]
+        if kind == _TEXT:
+            yield node[1]
+        elif kind == _OUTPUT:
+            value = node[1](scope)
+            if value is not None:
+                yield str(value)
+        elif kind == _FOR:
+            items = node[2](scope)
+            if not isinstance(items, (list, tuple)):
+                continue
+            target, body = node[1], node[3]
+            loop_scope = ChainMap({}, scope)
+            length = len(items)
+            for i, item in enumerate(items):
+                loop_scope[target] = item
+                loop_scope['loop'] = {
+                    'index': i + 1,
+                    'index0': i,
+                    'first': i == 0,
+                    'last': i == length - 1,
+                    'length': length,
+                }
+                yield from _iterate(body, loop_scope)
+        else:
+            for condition, body in node[1]:
+                if condition is None or condition(scope):
+                    yield from _iterate(body, scope)
+                    break
+
+
+def _compile_expr(source: str) -> Expression:
+    """Compile an expression into a function of the render scope."""
+    tokens = []
+    pos = 0
+    source = source.rstrip()
+    while pos < len(source):
+        match = _EXPR_TOKEN_PATTERN.match(source, pos)
+        if not match or match.end() == pos:
+            raise TemplateSyntaxError(f"Invalid expression: {source}")
+        pos = match.end()
+        number, single, double, op, name = match.groups()
+        if number is not None:
+            tokens.append(('literal', int(number)))
+        elif single is not None or double is not None:
+            tokens.append(('literal', single if single is not None else double))
+        elif op is not None:
+            tokens.append(('op', op))
+        else:
+            tokens.append(('name', name))
+
+    parser = _ExprParser(tokens, source)
+    expression = parser.parse_or()
+    if parser.pos != len(tokens):
+        raise TemplateSyntaxError(f"Invalid expression: {source}")
+    return expression
+
+
+class _ExprParser:
+    """Recursive-descent parser for the small expression language."""
+
+    def __init__(self, tokens: List[Tuple[str, Any]], source: str):
+        self.tokens = tokens
+        self.source = source
+        self.pos = 0
+
+    def _peek(self) -> Optional[Tuple[str, Any]]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _accept(self, kind: str, value: Any) -> bool:
+        token = self._peek()
+        if token == (kind, value):
+            self.pos += 1
+            return True
+        return False
+
+    def _next(self) -> Tuple[str, Any]:
+        token = self._peek()
+        if token is None:
+            raise TemplateSyntaxError(f"Unexpected end of expression: {self.source}")
+        self.pos += 1
+        return token
+
+    def parse_or(self) -> Expression:
+        left = self.parse_and()
+        while self._accept('name', 'or'):
+            right = self.parse_and()
+            left = (lambda a, b: lambda scope: a(scope) or b(scope))(left, right)
+        return left
+
+    def parse_and(self) -> Expression:
+        left = self.parse_not()
+        while self._accept('name', 'and'):
+            right = self.parse_not()
+            left = (lambda a, b: lambda scope: a(scope) and b(scope))(left, right)
+        return left
+
+    def parse_not(self) -> Expression:
+        if self._accept('name', 'not'):
+            operand = self.parse_not()
+            return lambda scope: not operand(scope)
+        return self.parse_comparison()
+
+    def parse_comparison(self) -> Expression:
+        left = self.parse_filtered()
+        token = self._peek()
+        if token is None:
+            return left
+
+        if token[0] == 'op' and token[1] in _COMPARISONS:
+            self.pos += 1
+            compare = _COMPARISONS[token[1]]
+        elif token == ('name', 'in'):
+            self.pos += 1
+            compare = lambda a, b: a in b
+        elif token == ('name', 'not') and self.tokens[self.pos + 1:self.pos + 2] == [('name', 'in')]:
+            self.pos += 2
+            compare = lambda a, b: a not in b
+        else:
+            return left
+
+        right = self.parse_filtered()
+
+        def comparison(scope):
+            try:
+                return compare(left(scope), right(scope))
+            except TypeError:
+                return False
+        return comparison
+
+    def parse_filtered(self) -> Expression:
+        value = self.parse_primary()
+        while self._accept('op', '|'):
+            kind, name = self._next()
+            if kind != 'name' or name not in _FILTERS:
+                raise TemplateSyntaxError(f"Unknown filter '{name}' in: {self.source}")
+            value = (lambda f, v: lambda scope: f(v(scope)))(_FILTERS[name], value)
+        return value
+
+    def parse_primary(self) -> Expression:
+        kind, value = self._next()
+        if kind == 'literal':
+            return lambda scope: value
+        if (kind, value) == ('op', '('):
+            inner = self.parse_or()
+            if not self._accept('op', ')'):
+                raise TemplateSyntaxError(f"Missing ')' in: {self.source}")
+            return inner
+        if kind != 'name':
+            raise TemplateSyntaxError(f"Unexpected '{value}' in: {self.source}")
+        if value in _LITERALS:
+            constant = _LITERALS[value]
+            return lambda scope: constant
+
+        parts = [value]
+        while self._accept('op', '.'):
+            kind, attr = self._next()
+            if kind != 'name':
+                raise TemplateSyntaxError(f"Invalid attribute '{attr}' in: {self.source}")
+            parts.append(attr)
+        return _lookup(parts)
+
+
+def _lookup(parts: List[str]) -> Expression:
+    """Build a dotted-name lookup; missing values resolve to None."""
+    head, rest = parts[0], parts[1:]
+
+    def lookup(scope):
+        value = scope.get(head)
+        for part in rest:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(part)
+        return value
+    return lookup
@@ -0,0 +1,117 @@
+"""
+Template loader with an in-process cache.
+Resolves templates from a search path (user override dirs first) and keeps
+each template's source, hash and compiled form in memory.
+"""
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from .jinja_renderer import CompiledTemplate, compile_template
+
+# Built-in templates shipped with skills-builder
+DEFAULT_TEMPLATES_DIR = Path(__file__).resolve().parent.parent.parent.parent / "templates"
+
+# os.pathsep-separated list of user template dirs that override the defaults
+TEMPLATES_ENV_VAR = "SKILLS_TEMPLATES_DIR"
+
+
+class _Entry(NamedTuple):
+    path: Path
+    mtime_ns: int
+    size: int
+    source: str
+    digest: str
+    compiled: CompiledTemplate
+    checked_at: float
+
+
+class TemplateLoader:
+    """
+    Load and cache templates by name.
+
+    A cached template is revalidated with a stat() of the search path at most
+    once every check_interval seconds; lookups in between do no I/O. A change
+    in mtime or size, or a new override appearing earlier in the search
+    path, causes a reload.
+    """
+
+    def __init__(self, search_path: Sequence[Union[str, Path]],
+                 check_interval: float = 1.0):
+        self.search_path: List[Path] = [Path(p) for p in search_path]
+        self.check_interval = check_interval
+        self._entries: Dict[str, _Entry] = {}
+
+    def get_template(self, name: str) -> CompiledTemplate:
+        """Return the compiled template."""
+        return self._load(name).compiled
+
+    def get_source(self, name: str) -> str:
+        """Return the template source text."""
+        return self._load(name).source
+
+    def get_digest(self, name: str) -> str:
+        """Return the SHA-256 of the template source."""
+        return self._load(name).digest
+
+    def resolve(self, name: str) -> Path:
+        """Return the file the template is loaded from."""
+        return self._load(name).path
+
+    def clear(self) -> None:
+        """Drop all cached templates."""
+        self._entries.clear()
+
+    def invalidate(self, name: str) -> None:
+        """Drop one cached template so the next lookup re-reads it."""
+        self._entries.pop(name, None)
+
+    def _load(self, name: str) -> _Entry:
+        entry = self._entries.get(name)
+        now = time.monotonic()
+        if entry is not None and now - entry.checked_at < self.check_interval:
+            return entry
+
+        path, stat = self._find(name)
+        if (entry is not None and entry.path == path
+                and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size):
+            entry = entry._replace(checked_at=now)
+        else:
+            with open(path, 'r') as f:
+                source = f.read()
+            entry = _Entry(
+                path=path,
+                mtime_ns=stat.st_mtime_ns,
+                size=stat.st_size,
+                source=source,
+                digest=hashlib.sha256(source.encode('utf-8')).hexdigest(),
+                compiled=compile_template(source),
+                checked_at=now,
+            )
+        self._entries[name] = entry
+        return entry
+
+    def _find(self, name: str) -> Tuple[Path, os.stat_result]:
+        for directory in self.search_path:
+            path = directory / name
+            try:
+                return path, path.stat()
+            except OSError:
+                continue
+        searched = ", ".join(str(d) for d in self.search_path)
+        raise FileNotFoundError(f"Template not found: {name} (searched: {searched})")
+
+
+def default_search_path(extra_dirs: Optional[Sequence[Union[str, Path]]] = None) -> List[Path]:
+    """
+    Build the template search path: explicit dirs, then $SKILLS_TEMPLATES_DIR,
+    then the built-in templates.
+    """
+    search_path = [Path(d).expanduser() for d in (extra_dirs or [])]
+    env_dirs = os.getenv(TEMPLATES_ENV_VAR)
+    if env_dirs:
+        search_path.extend(Path(d).expanduser() for d in env_dirs.split(os.pathsep) if d)
+    search_path.append(DEFAULT_TEMPLATES_DIR)
+    return search_path
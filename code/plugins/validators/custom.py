@@ -1,31 +1,253 @@
 """
 Custom validator registry (empty by default).
 Users can add domain-specific validators here.
+
+Registered validators run concurrently, each against its own deadline:
+thread-safe ones on pooled daemon threads, the rest in pooled worker
+processes that are killed if they overrun.
 """
-from typing import Dict, List, Any, Callable
+import queue
+import threading
+import time
+from typing import Any, Callable, Collection, Dict, List, NamedTuple, Optional, Tuple
+
+# Cost classes: expensive validators are started first and get a longer default timeout
+COST_CHEAP = "cheap"
+COST_EXPENSIVE = "expensive"
+DEFAULT_TIMEOUTS = {COST_CHEAP: 5.0, COST_EXPENSIVE: 60.0}
+
+# Idle workers kept for reuse, per kind
+MAX_IDLE_WORKERS = 8
+
+Validator = Callable[[Dict[str, Any]], List[str]]
+
+
+class RegisteredValidator(NamedTuple):
+    """A validator and how it is scheduled."""
+    func: Validator
+    cost: str
+    timeout: float
+    thread_safe: bool
+
+
+class ValidatorTiming(NamedTuple):
+    """Wall time of one validator run; status is "ok", "failed" or "timeout"."""
+    name: str
+    cost: str
+    seconds: float
+    status: str
+
 
 # Registry of custom validators
-CUSTOM_VALIDATORS: Dict[str, Callable] = {}
+CUSTOM_VALIDATORS: Dict[str, RegisteredValidator] = {}
 
 
-def register_validator(name: str, func: Callable[[Dict[str, Any]], List[str]]):
+def register_validator(name: str, func: Validator, cost: str = COST_CHEAP,
+                       timeout: Optional[float] = None, thread_safe: bool = True):
     """
     Register a custom validator function.
-    
+
     Args:
         name: Validator name
         func: Function that takes a spec dict and returns list of error messages
+        cost: COST_CHEAP or COST_EXPENSIVE (e.g. reads reference files)
+        timeout: Seconds before the validator is abandoned and reported as an
+            error (default: DEFAULT_TIMEOUTS[cost])
+        thread_safe: False to run it in a separate process, which is also the
+            only way a runaway validator is actually stopped. func must then
+            be a module-level function so it can be pickled.
     """
-    CUSTOM_VALIDATORS[name] = func
+    if cost not in DEFAULT_TIMEOUTS:
+        raise ValueError(f"Unknown validator cost class: {cost}")
+    if timeout is None:
+        timeout = DEFAULT_TIMEOUTS[cost]
+    CUSTOM_VALIDATORS[name] = RegisteredValidator(func, cost, timeout, thread_safe)
 
 
-def run_custom_validators(spec: Dict[str, Any]) -> List[str]:
-    """Run all registered custom validators on a spec."""
-    errors = []
-    for name, validator in CUSTOM_VALIDATORS.items():
+def run_custom_validators(spec: Dict[str, Any],
+                          timings: Optional[List[ValidatorTiming]] = None,
+                          validators: Optional[Dict[str, RegisteredValidator]] = None,
+                          advisory: Collection[str] = (),
+                          warnings: Optional[List[str]] = None) -> List[str]:
+    """
+    Run validators (default: all registered custom validators) on a spec.
+    Errors are returned in registration order. Messages from the validators
+    named in advisory, failures included, are appended to warnings instead
+    (dropped if it is None). If timings is given, a ValidatorTiming is
+    appended to it for every validator.
+    """
+    if validators is None:
+        validators = CUSTOM_VALIDATORS
+    if not validators:
+        return []
+    start = time.perf_counter()
+    running = {}
+    # Longest first, so cheap validators finish while expensive ones run
+    for name, validator in sorted(validators.items(),
+                                  key=lambda item: item[1].cost != COST_EXPENSIVE):
+        pool = _thread_pool if validator.thread_safe else _process_pool
+        worker = pool.acquire()
         try:
-            validator_errors = validator(spec)
-            errors.extend(validator_errors)
+            worker.submit(validator.func, spec)
         except Exception as e:
-            errors.append(f"Custom validator '{name}' failed: {e}")
+            pool.release(worker)
+            running[name] = (None, ("error", f"{type(e).__name__}: {e}", 0.0))
+        else:
+            running[name] = (worker, None)
+
+    errors = []
+    for name, validator in validators.items():
+        if name not in running:
+            continue
+        worker, outcome = running[name]
+        if worker is not None:
+            pool = _thread_pool if validator.thread_safe else _process_pool
+            remaining = start + validator.timeout - time.perf_counter()
+            try:
+                outcome = worker.result(max(0.0, remaining))
+            except TimeoutError:
+                pool.discard(worker)
+                outcome = ("timeout", None, validator.timeout)
+            except (EOFError, OSError) as e:
+                pool.discard(worker)
+                outcome = ("error", f"worker process died ({str(e) or type(e).__name__})",
+                           time.perf_counter() - start)
+            else:
+                pool.release(worker)
+        status, value, seconds = outcome
+        messages = errors
+        if name in advisory:
+            messages = warnings if warnings is not None else []
+        if status == "ok":
+            messages.extend(value)
+        elif status == "timeout":
+            messages.append(f"Custom validator '{name}' timed out after {validator.timeout:g}s")
+        else:
+            messages.append(f"Custom validator '{name}' failed: {value}")
+        if timings is not None:
+            timings.append(ValidatorTiming(name, validator.cost, seconds,
+                                           "failed" if status == "error" else status))
     return errors
+
+
+def summarize_timings(timings: List[ValidatorTiming]) -> List[str]:
+    """Total wall time per validator across runs, slowest first."""
+    totals: Dict[str, List[Any]] = {}
+    for t in timings:
+        total = totals.setdefault(t.name, [t.cost, 0, 0.0, 0])
+        total[1] += 1
+        total[2] += t.seconds
+        total[3] += t.status != "ok"
+    lines = []
+    for name, (cost, runs, seconds, problems) in sorted(totals.items(), key=lambda item: -item[1][2]):
+        line = f"{name:<24} {cost:<9} {runs:>5} runs  {seconds * 1000:10.1f} ms"
+        if problems:
+            line += f"  ({problems} failed or timed out)"
+        lines.append(line)
+    return lines
+
+
+def _call(func: Validator, spec: Dict[str, Any]) -> Tuple[str, Any, float]:
+    start = time.perf_counter()
+    try:
+        result = ("ok", list(func(spec)))
+    except Exception as e:
+        result = ("error", str(e))
+    return result + (time.perf_counter() - start,)
+
+
+class _ThreadWorker:
+    """A daemon thread running one validator at a time. A hung thread is abandoned."""
+
+    def __init__(self):
+        self._tasks: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._done = threading.Event()
+        self._outcome = None
+        threading.Thread(target=self._loop, name="custom-validator", daemon=True).start()
+
+    def submit(self, func: Validator, spec: Dict[str, Any]) -> None:
+        self._done.clear()
+        self._tasks.put((func, spec))
+
+    def result(self, timeout: float) -> Tuple[str, Any, float]:
+        if not self._done.wait(timeout):
+            raise TimeoutError
+        return self._outcome
+
+    def close(self) -> None:
+        self._tasks.put(None)
+
+    def _loop(self) -> None:
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                return
+            self._outcome = _call(*task)
+            self._done.set()
+
+
+class _ProcessWorker:
+    """A child process running one validator at a time. A hung process is killed."""
+
+    def __init__(self):
+        import multiprocessing
+
+        self._conn, child = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(target=_process_loop, args=(child,), daemon=True)
+        self._process.start()
+        child.close()
+
+    def submit(self, func: Validator, spec: Dict[str, Any]) -> None:
+        self._conn.send((func, spec))
+
+    def result(self, timeout: float) -> Tuple[str, Any, float]:
+        if not self._conn.poll(timeout):
+            raise TimeoutError
+        return self._conn.recv()
+
+    def close(self) -> None:
+        self._process.kill()
+        self._process.join()
+        self._conn.close()
+
+
+def _process_loop(conn) -> None:
+    while True:
+        try:
+            func, spec = conn.recv()
+        except EOFError:
+            return
+        except Exception as e:
+            # e.g. the validator cannot be unpickled here; the worker stays usable
+            conn.send(("error", f"{type(e).__name__}: {e}", 0.0))
+            continue
+        conn.send(_call(func, spec))
+
+
+class _WorkerPool:
+    """Idle workers of one kind, reused across runs."""
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._idle: List[Any] = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._factory()
+
+    def release(self, worker) -> None:
+        with self._lock:
+            if len(self._idle) < MAX_IDLE_WORKERS:
+                self._idle.append(worker)
+                return
+        worker.close()
+
+    def discard(self, worker) -> None:
+        worker.close()
+
+
+_thread_pool = _WorkerPool(_ThreadWorker)
+_process_pool = _WorkerPool(_ProcessWorker)
@@ -0,0 +1,321 @@
+"""
+Validator plugin discovery.
+
+Validator rules come from three places:
+- the built-in rules in structure.py and outputs.py, enabled by default
+  (their names are reserved). They give advice, so their messages are
+  reported as warnings rather than errors;
+- the "skills_builder.validators" entry point group of installed
+  distributions, where each entry point name is a rule and its value a
+  "module:function" validator;
+- *.py files in the plugin directory ($SKILLS_VALIDATORS_DIR, or
+  ~/.config/skills-builder/validators). Every top-level validate_<rule>
+  function defines a rule, overriding an entry point of the same name.
+
+Finding rules imports nothing. The entry point scan and the plugin file
+parse are kept in an index under the user cache directory. The index is
+reused while the sys.path directories and the plugin files keep their
+mtimes. A rule's module is imported only when the rule is enabled.
+
+A validator can set cost, timeout and thread_safe attributes on itself;
+these are passed to register_validator. Plugin file validators are sent to
+worker processes by path, so a worker imports the file itself.
+
+Rules and validators are kept for the life of the process. refresh()
+drops them once the plugin files or installed distributions change; a
+long-running process (the daemon) calls it before every request.
+"""
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .custom import COST_CHEAP, DEFAULT_TIMEOUTS, CUSTOM_VALIDATORS, RegisteredValidator
+
+ENTRY_POINT_GROUP = "skills_builder.validators"
+
+# Directory of *.py validator plugins
+PLUGIN_DIR_ENV_VAR = "SKILLS_VALIDATORS_DIR"
+
+# Comma-separated rules to enable ("all" for every rule, "-name" to disable one)
+RULES_ENV_VAR = "SKILLS_VALIDATORS"
+
+INDEX_VERSION = 1
+
+# Function name prefix marking a rule in a plugin file
+RULE_PREFIX = "validate_"
+
+BUILTIN_RULES = {
+    "structure": ".structure:validate_structure",
+    "triggers": ".structure:validate_triggers",
+    "outputs": ".outputs:validate_outputs",
+}
+
+# Rules whose messages are warnings, not errors
+ADVISORY_RULES = frozenset(BUILTIN_RULES)
+
+
+class RuleSource(NamedTuple):
+    """Where a rule's validator lives, without importing it."""
+    name: str
+    target: str          # "module:function", "path/to/file.py:function", or relative to this package
+    origin: str          # "builtin", "entry point <dist>" or "plugin dir"
+
+
+# Validators already imported in this process, by rule name
+_loaded: Dict[str, RegisteredValidator] = {}
+_index: Optional[Dict[str, RuleSource]] = None
+_index_fingerprint: Optional[str] = None
+
+# Plugin file modules imported in this process, by path: (version, module)
+_plugin_modules: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+
+
+class PluginFunction:
+    """
+    A validate_<rule> function in a plugin file. Pickled as its path and
+    name, so a worker process imports the file itself instead of looking
+    the module up by a name only its parent has registered.
+    """
+
+    def __init__(self, path: str, attr: str, version: Tuple[int, int]):
+        self.path = path
+        self.attr = attr
+        # (mtime, size) of the file when the parent loaded it
+        self.version = version
+        self._func = None
+
+    def __call__(self, spec: Dict[str, Any]) -> List[str]:
+        if self._func is None:
+            self._func = _resolve(_plugin_module(self.path, self.version), self.attr)
+        return self._func(spec)
+
+    def __getstate__(self):
+        return self.path, self.attr, self.version
+
+    def __setstate__(self, state):
+        self.path, self.attr, self.version = state
+        self._func = None
+
+
+def default_plugin_dir() -> Path:
+    """Return $SKILLS_VALIDATORS_DIR, or the user config dir (XDG_CONFIG_HOME or ~/.config)."""
+    env_dir = os.getenv(PLUGIN_DIR_ENV_VAR)
+    if env_dir:
+        return Path(env_dir).expanduser()
+    config_home = os.getenv("XDG_CONFIG_HOME") or Path.home() / ".config"
+    return Path(config_home) / "skills-builder" / "validators"
+
+
+def index_path() -> Path:
+    """Index file for this interpreter, in the user cache dir."""
+    import hashlib
+
+    cache_home = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    prefix = hashlib.sha256(sys.prefix.encode("utf-8")).hexdigest()[:16]
+    return Path(cache_home) / "skills-builder" / f"validators-{prefix}.json"
+
+
+def refresh() -> None:
+    """
+    Forget the rule index and the loaded plugin validators if the plugin
+    directory, its files or the installed distributions changed since the
+    index was built. Built-in validators are kept.
+    """
+    global _index, _index_fingerprint
+    if _index is None or _fingerprint(default_plugin_dir()) == _index_fingerprint:
+        return
+    _index = _index_fingerprint = None
+    for rule in [rule for rule in _loaded if rule not in BUILTIN_RULES]:
+        del _loaded[rule]
+
+
+def available_rules() -> Dict[str, RuleSource]:
+    """Every known rule, from the persisted index when it is still valid."""
+    global _index, _index_fingerprint
+    if _index is not None:
+        return _index
+    plugin_dir = default_plugin_dir()
+    fingerprint = _fingerprint(plugin_dir)
+    path = index_path()
+    rules = _read_index(path, fingerprint)
+    if rules is None:
+        rules = dict(_scan_entry_points())
+        rules.update(_scan_plugin_dir(plugin_dir))
+        _write_index(path, fingerprint, rules)
+    index = {name: RuleSource(name, BUILTIN_RULES[name], "builtin") for name in BUILTIN_RULES}
+    index.update((name, rule) for name, rule in rules.items() if name not in BUILTIN_RULES)
+    _index = index
+    _index_fingerprint = fingerprint
+    return index
+
+
+def enabled_rules(requested: Iterable[str] = ()) -> List[str]:
+    """
+    Rules to run: the built-ins, then $SKILLS_VALIDATORS, then requested.
+    "all" enables every known rule and "-name" disables one. Raises
+    ValueError for an unknown rule.
+    """
+    env_rules = [r.strip() for r in os.getenv(RULES_ENV_VAR, "").split(",") if r.strip()]
+    rules = list(BUILTIN_RULES)
+    for rule in env_rules + list(requested):
+        if rule == "all":
+            rules.extend(name for name in available_rules() if name not in rules)
+        elif rule.startswith("-"):
+            if rule[1:] in rules:
+                rules.remove(rule[1:])
+        elif rule not in rules:
+            if rule not in BUILTIN_RULES and rule not in available_rules():
+                raise ValueError(f"Unknown validator rule: {rule}")
+            rules.append(rule)
+    return rules
+
+
+def load_validators(rules: Iterable[str]) -> Dict[str, RegisteredValidator]:
+    """
+    Validators for the given rules followed by those registered in-process
+    with register_validator. Built-in rules are resolved without reading
+    the index; a rule's module is imported the first time it is needed.
+    """
+    validators: Dict[str, RegisteredValidator] = {}
+    for rule in rules:
+        if rule not in _loaded:
+            if rule in BUILTIN_RULES:
+                source = RuleSource(rule, BUILTIN_RULES[rule], "builtin")
+            else:
+                source = available_rules().get(rule)
+                if source is None:
+                    raise ValueError(f"Unknown validator rule: {rule}")
+            _loaded[rule] = _load(source)
+        validators[rule] = _loaded[rule]
+    validators.update(CUSTOM_VALIDATORS)
+    return validators
+
+
+def _load(source: RuleSource) -> RegisteredValidator:
+    import importlib
+
+    location, _, attr = source.target.rpartition(":")
+    if location.endswith(".py"):
+        version = _file_version(location)
+        func = _resolve(_plugin_module(location, version), attr)
+        validator = PluginFunction(location, attr, version)
+    else:
+        func = validator = _resolve(importlib.import_module(location, __package__), attr)
+    cost = getattr(func, "cost", COST_CHEAP)
+    timeout = getattr(func, "timeout", None)
+    if timeout is None:
+        timeout = DEFAULT_TIMEOUTS[cost]
+    return RegisteredValidator(validator, cost, timeout, getattr(func, "thread_safe", True))
+
+
+def _resolve(module: Any, attr: str) -> Any:
+    func = module
+    for part in attr.split("."):
+        func = getattr(func, part)
+    return func
+
+
+def _file_version(path: str) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def _plugin_module(path: str, version: Tuple[int, int]) -> Any:
+    """Import a plugin file, again if it changed since this process last did."""
+    import importlib.util
+
+    cached = _plugin_modules.get(path)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    module_name = f"skills_builder_validator_{Path(path).stem}"
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    # Registered while it runs, for code that looks itself up (e.g. dataclasses)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    _plugin_modules[path] = (version, module)
+    return module
+
+
+def _fingerprint(plugin_dir: Path) -> str:
+    """Changes when a distribution is installed or removed, or a plugin file changes."""
+    # Only hashed when the index is consulted; validate with built-in rules never is
+    import hashlib
+
+    state = [sys.version, INDEX_VERSION, str(plugin_dir)]
+    for entry in sys.path:
+        try:
+            state.append((entry, os.stat(entry or ".").st_mtime_ns))
+        except OSError:
+            state.append((entry, None))
+    try:
+        with os.scandir(plugin_dir) as it:
+            for entry in sorted(it, key=lambda e: e.name):
+                if entry.name.endswith(".py"):
+                    st = entry.stat()
+                    state.append((entry.path, st.st_mtime_ns, st.st_size))
+    except OSError:
+        pass
+    return hashlib.sha256(json.dumps(state).encode("utf-8")).hexdigest()
+
+
+def _read_index(path: Path, fingerprint: str) -> Optional[Dict[str, RuleSource]]:
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("fingerprint") != fingerprint:
+        return None
+    return {name: RuleSource(name, *fields) for name, fields in data["rules"].items()}
+
+
+def _write_index(path: Path, fingerprint: str, rules: Dict[str, RuleSource]) -> None:
+    data = {
+        "version": INDEX_VERSION,
+        "fingerprint": fingerprint,
+        "rules": {name: [r.target, r.origin] for name, r in sorted(rules.items())},
+    }
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+    except OSError:
+        # A read-only cache only costs a rescan next time
+        pass
+
+
+def _scan_entry_points() -> Dict[str, RuleSource]:
+    from importlib.metadata import entry_points
+
+    rules = {}
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        dist = getattr(ep, "dist", None)
+        origin = f"entry point {dist.name}" if dist is not None else "entry point"
+        rules[ep.name] = RuleSource(ep.name, ep.value, origin)
+    return rules
+
+
+def _scan_plugin_dir(plugin_dir: Path) -> Dict[str, RuleSource]:
+    """Find validate_<rule> functions in plugin files by parsing, not importing, them."""
+    import ast
+
+    rules = {}
+    try:
+        paths = sorted(p for p in plugin_dir.iterdir() if p.suffix == ".py")
+    except OSError:
+        return rules
+    for path in paths:
+        try:
+            tree = ast.parse(path.read_bytes(), str(path))
+        except (OSError, SyntaxError, ValueError):
+            continue
+        for node in tree.body:
+            if isinstance(node, ast.FunctionDef) and node.name.startswith(RULE_PREFIX):
+                name = node.name[len(RULE_PREFIX):]
+                rules[name] = RuleSource(name, f"{path.resolve()}:{node.name}", "plugin dir")
+    return rules
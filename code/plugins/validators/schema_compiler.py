@@ -0,0 +1,282 @@
+"""
+Compile a JSON Schema into a specialized validation closure.
+
+The schema is walked once at compile time; the resulting closure checks a
+document in a single traversal. Supported keywords: type, required,
+properties, items, enum, pattern, minLength, maxLength, minItems and
+uniqueItems, plus these extensions:
+
+- default: a missing property is validated as if it held its default value
+- uniqueItemProperty: objects in an array must have distinct values for
+  this key
+- errorMessage: per-keyword message templates (ajv-errors style). For
+  "required" it maps property names to messages; None suppresses the
+  missing-property error, leaving it to the checks on the default value.
+
+Message templates may use {label}, {field}, {index}, {limit}, {length},
+{value}, {property} and {type}.
+"""
+import re
+from typing import Any, Callable, Dict, List, Tuple
+
+Path = Tuple[Any, ...]
+Check = Callable[[Any, Path, List[str]], None]
+
+_TYPE_CHECKS = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "boolean": lambda v: isinstance(v, bool),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "null": lambda v: v is None,
+}
+
+_TYPE_NOUNS = {
+    "object": "an object",
+    "array": "an array",
+    "string": "a string",
+    "boolean": "a boolean",
+    "integer": "an integer",
+    "number": "a number",
+    "null": "null",
+}
+
+DEFAULT_MESSAGES = {
+    "type": "{label} must be {type}",
+    "required": "Missing required field: {field}",
+    "minLength": "{label} must be at least {limit} characters (currently {length})",
+    "emptyString": "{label} cannot be empty",
+    "maxLength": "{label} must be {limit} characters or less (currently {length})",
+    "minItems": "{label} must have at least {limit} items",
+    "minItem": "{label} must have at least 1 item",
+    "enum": "{label} must be one of: {limit}",
+    "pattern": "{label} must match pattern {limit}",
+    "uniqueItems": "{label} must not contain duplicate items",
+    "uniqueItemProperty": "{label} items must have unique '{limit}' values",
+}
+
+
+def compile_schema(schema: Dict[str, Any]) -> Callable[[Any], List[str]]:
+    """
+    Compile schema into a function that returns the list of error messages
+    for a document (empty if valid).
+    """
+    root = _compile_node(schema)
+
+    def validate(document: Any) -> List[str]:
+        errors: List[str] = []
+        root(document, (), errors)
+        return errors
+    return validate
+
+
+def format_path(path: Path) -> str:
+    """Render a path like ('output_contract', 'sections', 0) as output_contract.sections[0]."""
+    parts = []
+    for key in path:
+        if isinstance(key, int):
+            parts.append(f"[{key}]")
+        else:
+            parts.append(f".{key}" if parts else str(key))
+    return "".join(parts)
+
+
+def _format(template: str, path: Path, **values: Any) -> str:
+    field = format_path(path)
+    if not path:
+        label = "Spec"
+    elif len(path) == 1 and isinstance(path[0], str):
+        label = f"Field '{path[0]}'"
+    else:
+        label = field
+    index = next((key for key in reversed(path) if isinstance(key, int)), "")
+    return template.format(label=label, field=field, index=index, **values)
+
+
+def _compile_node(schema: Dict[str, Any]) -> Check:
+    messages = schema.get("errorMessage", {})
+    checks: List[Check] = []
+
+    type_check = None
+    type_names = schema.get("type")
+    if type_names is not None:
+        if isinstance(type_names, str):
+            type_names = [type_names]
+        predicates = [_TYPE_CHECKS[name] for name in type_names]
+        type_check = predicates[0] if len(predicates) == 1 else (
+            lambda v: any(p(v) for p in predicates)
+        )
+        type_message = messages.get("type", DEFAULT_MESSAGES["type"])
+        type_noun = " or ".join(_TYPE_NOUNS[name] for name in type_names)
+
+    if "enum" in schema:
+        checks.append(_compile_enum(schema["enum"], messages))
+
+    # Objects
+    if "required" in schema:
+        checks.append(_compile_required(schema["required"], messages))
+    if "properties" in schema:
+        checks.append(_compile_properties(schema["properties"]))
+
+    # Strings
+    if "minLength" in schema:
+        checks.append(_compile_min_length(schema["minLength"], messages))
+    if "maxLength" in schema:
+        checks.append(_compile_max_length(schema["maxLength"], messages))
+    if "pattern" in schema:
+        checks.append(_compile_pattern(schema["pattern"], messages))
+
+    # Arrays
+    if "minItems" in schema:
+        checks.append(_compile_min_items(schema["minItems"], messages))
+    if schema.get("uniqueItems"):
+        checks.append(_compile_unique_items(messages))
+    if "uniqueItemProperty" in schema:
+        checks.append(_compile_unique_property(schema["uniqueItemProperty"], messages))
+    if "items" in schema:
+        checks.append(_compile_items(schema["items"]))
+
+    if type_check is None:
+        if len(checks) == 1:
+            return checks[0]
+
+        def check(value, path, errors):
+            for c in checks:
+                c(value, path, errors)
+        return check
+
+    def check_typed(value, path, errors):
+        if not type_check(value):
+            errors.append(_format(type_message, path, type=type_noun))
+            return
+        for c in checks:
+            c(value, path, errors)
+    return check_typed
+
+
+def _compile_required(required: List[str], messages: Dict[str, Any]) -> Check:
+    overrides = messages.get("required", {})
+    entries = [
+        (name, overrides.get(name, DEFAULT_MESSAGES["required"]))
+        for name in required
+    ]
+    entries = [(name, message) for name, message in entries if message is not None]
+
+    def check(value, path, errors):
+        if not isinstance(value, dict):
+            return
+        for name, message in entries:
+            if name not in value:
+                errors.append(_format(message, path + (name,), property=name))
+    return check
+
+
+def _compile_properties(properties: Dict[str, Any]) -> Check:
+    entries = [
+        (name, _compile_node(sub), "default" in sub, sub.get("default"))
+        for name, sub in properties.items()
+    ]
+
+    def check(value, path, errors):
+        if not isinstance(value, dict):
+            return
+        for name, sub_check, has_default, default in entries:
+            if name in value:
+                sub_check(value[name], path + (name,), errors)
+            elif has_default:
+                sub_check(default, path + (name,), errors)
+    return check
+
+
+def _compile_min_length(limit: int, messages: Dict[str, Any]) -> Check:
+    default = DEFAULT_MESSAGES["emptyString" if limit == 1 else "minLength"]
+    message = messages.get("minLength", default)
+
+    def check(value, path, errors):
+        if isinstance(value, str) and len(value) < limit:
+            errors.append(_format(message, path, limit=limit, length=len(value)))
+    return check
+
+
+def _compile_max_length(limit: int, messages: Dict[str, Any]) -> Check:
+    message = messages.get("maxLength", DEFAULT_MESSAGES["maxLength"])
+
+    def check(value, path, errors):
+        if isinstance(value, str) and len(value) > limit:
+            errors.append(_format(message, path, limit=limit, length=len(value)))
+    return check
+
+
+def _compile_pattern(pattern: str, messages: Dict[str, Any]) -> Check:
+    search = re.compile(pattern).search
+    message = messages.get("pattern", DEFAULT_MESSAGES["pattern"])
+
+    def check(value, path, errors):
+        if isinstance(value, str) and not search(value):
+            errors.append(_format(message, path, limit=pattern, value=value))
+    return check
+
+
+def _compile_enum(choices: List[Any], messages: Dict[str, Any]) -> Check:
+    message = messages.get("enum", DEFAULT_MESSAGES["enum"])
+    listed = ", ".join(repr(c) for c in choices)
+
+    def check(value, path, errors):
+        if value not in choices:
+            errors.append(_format(message, path, limit=listed, value=value))
+    return check
+
+
+def _compile_min_items(limit: int, messages: Dict[str, Any]) -> Check:
+    default = DEFAULT_MESSAGES["minItem" if limit == 1 else "minItems"]
+    message = messages.get("minItems", default)
+
+    def check(value, path, errors):
+        if isinstance(value, list) and len(value) < limit:
+            errors.append(_format(message, path, limit=limit, length=len(value)))
+    return check
+
+
+def _compile_unique_items(messages: Dict[str, Any]) -> Check:
+    message = messages.get("uniqueItems", DEFAULT_MESSAGES["uniqueItems"])
+
+    def check(value, path, errors):
+        if isinstance(value, list) and _has_duplicates(value):
+            errors.append(_format(message, path))
+    return check
+
+
+def _compile_unique_property(key: str, messages: Dict[str, Any]) -> Check:
+    message = messages.get("uniqueItemProperty", DEFAULT_MESSAGES["uniqueItemProperty"])
+
+    def check(value, path, errors):
+        if not isinstance(value, list):
+            return
+        keys = [item.get(key) for item in value if isinstance(item, dict)]
+        if _has_duplicates(keys):
+            errors.append(_format(message, path, limit=key))
+    return check
+
+
+def _compile_items(schema: Dict[str, Any]) -> Check:
+    item_check = _compile_node(schema)
+
+    def check(value, path, errors):
+        if not isinstance(value, list):
+            return
+        for i, item in enumerate(value):
+            item_check(item, path + (i,), errors)
+    return check
+
+
+def _has_duplicates(values: List[Any]) -> bool:
+    try:
+        return len(values) != len(set(values))
+    except TypeError:
+        seen: List[Any] = []
+        for value in values:
+            if value in seen:
+                return True
+            seen.append(value)
+        return False
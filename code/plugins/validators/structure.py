@@ -15,10 +15,10 @@ def validate_structure(spec: Dict[str, Any]) -> List[str]:
     if len(name) > 100:
         errors.append("Name should be 100 characters or less")
     
-    # Check purpose brevity
-    purpose = spec.get("purpose", "")
-    if len(purpose) > 500:
-        errors.append("Purpose should be 500 characters or less (keep it concise)")
+    # Check description brevity
+    description = spec.get("description", "")
+    if len(description) > 500:
+        errors.append("Description should be 500 characters or less (keep it concise)")
     
     return errors
 
@@ -1,61 +1,219 @@
 """
 Scaffold a new skill from a spec file.
 """
+import hashlib
 import json
+import os
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List, NamedTuple, Optional, Sequence, Tuple
 
-from .plugins.renderers.jinja_renderer import render
+from . import __version__
+from .plugins.renderers.loader import TemplateLoader, default_search_path
 
+TEMPLATE_NAMES = ("skill_md.tmpl", "output_contract.tmpl", "code_stub.tmpl", "README.tmpl")
 
-def scaffold_skill(spec_path: str, output_dir: str) -> Path:
+# Build manifest written into every generated skill directory
+MANIFEST_NAME = ".skillbuild.json"
+MANIFEST_VERSION = 1
+
+# One loader per template search path, shared by every call in this process
+_loaders: Dict[Tuple[str, ...], TemplateLoader] = {}
+
+
+class ScaffoldResult(NamedTuple):
+    """Outcome of scaffolding one spec in a batch."""
+    spec_path: str
+    skill_dir: Optional[Path]
+    error: Optional[str]
+
+
+def get_loader(template_dirs: Optional[Sequence[str]] = None) -> TemplateLoader:
+    """
+    Return the process-wide TemplateLoader for the given override dirs
+    (searched before $SKILLS_TEMPLATES_DIR and the built-in templates).
+    """
+    search_path = default_search_path(template_dirs)
+    key = tuple(str(p) for p in search_path)
+    loader = _loaders.get(key)
+    if loader is None:
+        loader = _loaders[key] = TemplateLoader(search_path)
+    return loader
+
+
+def scaffold_skill(spec_path: str, output_dir: str,
+                   loader: Optional[TemplateLoader] = None,
+                   force: bool = False) -> Path:
     """
     Create a new skill folder from a spec file.
     Returns the path to the created skill directory.
+
+    Templates come from loader (default: get_loader()), which caches them
+    across calls.
+
+    A manifest of spec, template and output hashes is kept in the skill
+    directory. When the inputs are unchanged and the outputs are intact,
+    nothing is rendered; otherwise only files whose bytes changed are
+    rewritten. force=True ignores the manifest and rebuilds.
     """
     # Load spec
-    with open(spec_path, 'r') as f:
-        spec = json.load(f)
+    with open(spec_path, 'rb') as f:
+        spec_bytes = f.read()
+    spec = json.loads(spec_bytes)
     
     skill_name = spec["name"].lower().replace(" ", "-")
     skill_dir = Path(output_dir) / skill_name
     skill_dir.mkdir(parents=True, exist_ok=True)
     
-    # Load templates - go up from code/ to skills-builder/ then to templates/
-    templates_dir = Path(__file__).parent.parent / "templates"
+    if loader is None:
+        loader = get_loader()
     
-    # 1. Render skill.md
-    with open(templates_dir / "skill_md.tmpl", 'r') as f:
-        skill_template = f.read()
+    inputs = {
+        "builder": __version__,
+        "spec": _sha256(spec_bytes),
+        "templates": {
+            name: loader.get_digest(name) for name in TEMPLATE_NAMES
+        },
+    }
+    manifest_path = skill_dir / MANIFEST_NAME
+    manifest = _read_manifest(manifest_path)
+    if not force and manifest and _is_up_to_date(skill_dir, manifest, inputs):
+        return skill_dir
     
-    skill_md = render(skill_template, spec)
-    (skill_dir / "SKILL.md").write_text(skill_md)  # CRITICAL: Must be uppercase SKILL.md for Claude
+    outputs = {}
+    
+    # 1. Render skill.md
+    # CRITICAL: Must be uppercase SKILL.md for Claude
+    outputs["SKILL.md"] = _write_if_changed(
+        skill_dir / "SKILL.md", loader.get_template("skill_md.tmpl").render_iter(spec)
+    )
     
     # 2. Create templates directory and render output contract
     templates_output_dir = skill_dir / "templates"
     templates_output_dir.mkdir(exist_ok=True)
     
-    with open(templates_dir / "output_contract.tmpl", 'r') as f:
-        output_template = f.read()
-    
-    output_contract = render(output_template, spec["output_contract"])
-    (templates_output_dir / "output_doc.tmpl").write_text(output_contract)
+    outputs["templates/output_doc.tmpl"] = _write_if_changed(
+        templates_output_dir / "output_doc.tmpl",
+        loader.get_template("output_contract.tmpl").render_iter(spec["output_contract"])
+    )
     
     # 3. Optional: code helper
     if spec.get("code_helper", {}).get("enabled"):
         code_dir = skill_dir / "code"
         code_dir.mkdir(exist_ok=True)
         
-        with open(templates_dir / "code_stub.tmpl", 'r') as f:
-            code_template = f.read()
-        
-        (code_dir / "helper.py").write_text(code_template)
+        outputs["code/helper.py"] = _write_if_changed(
+            code_dir / "helper.py", [loader.get_source("code_stub.tmpl")]
+        )
     
     # 4. Create README
-    with open(templates_dir / "README.tmpl", 'r') as f:
-        readme_template = f.read()
+    outputs["README.md"] = _write_if_changed(
+        skill_dir / "README.md", loader.get_template("README.tmpl").render_iter(spec)
+    )
     
-    readme = render(readme_template, spec)
-    (skill_dir / "README.md").write_text(readme)
+    new_manifest = dict(inputs, version=MANIFEST_VERSION, outputs=outputs)
+    if new_manifest != manifest:
+        with open(manifest_path, 'w') as f:
+            json.dump(new_manifest, f, indent=2, sort_keys=True)
+            f.write("\n")
     
     return skill_dir
+
+
+def scaffold_many(spec_paths: List[str], output_dir: str,
+                  jobs: Optional[int] = None, force: bool = False,
+                  template_dirs: Optional[Sequence[str]] = None) -> List[ScaffoldResult]:
+    """
+    Scaffold many specs, fanning out over a process pool.
+    Returns one ScaffoldResult per spec, in input order. A failing spec is
+    reported in its result and does not abort the batch.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    template_dirs = tuple(template_dirs or ())
+    tasks = [(str(p), output_dir, force, template_dirs) for p in spec_paths]
+    if jobs == 1 or len(tasks) <= 1:
+        return [_scaffold_worker(task) for task in tasks]
+
+    # multiprocessing is slow to import, so only batches pay for it
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = max(1, len(tasks) // (jobs * 8))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(template_dirs,)) as executor:
+        return list(executor.map(_scaffold_worker, tasks, chunksize=chunksize))
+
+
+def _init_worker(template_dirs: Sequence[str]) -> None:
+    """Load and compile templates once for this worker process."""
+    loader = get_loader(template_dirs)
+    for name in TEMPLATE_NAMES:
+        loader.get_template(name)
+
+
+def _scaffold_worker(task) -> ScaffoldResult:
+    """Scaffold one spec inside a worker, capturing any error."""
+    spec_path, output_dir, force, template_dirs = task
+    try:
+        skill_dir = scaffold_skill(spec_path, output_dir, get_loader(template_dirs), force)
+        return ScaffoldResult(spec_path, skill_dir, None)
+    except Exception as e:
+        return ScaffoldResult(spec_path, None, f"{type(e).__name__}: {e}")
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _file_sha256(path: Path) -> Optional[str]:
+    """Hash a file's bytes, or return None if it does not exist."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def _read_manifest(path: Path) -> Optional[Dict[str, Any]]:
+    """Load a build manifest, treating a missing or corrupt one as absent."""
+    try:
+        with open(path, 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def _is_up_to_date(skill_dir: Path, manifest: Dict[str, Any], inputs: Dict[str, Any]) -> bool:
+    """True when inputs match the manifest and every recorded output is intact."""
+    if any(manifest.get(key) != value for key, value in inputs.items()):
+        return False
+    outputs = manifest.get("outputs")
+    if not isinstance(outputs, dict) or not outputs:
+        return False
+    return all(
+        _file_sha256(skill_dir / name) == digest for name, digest in outputs.items()
+    )
+
+
+def _write_if_changed(path: Path, fragments: Iterable[str]) -> str:
+    """
+    Stream fragments to path, leaving the existing file untouched if its bytes
+    are identical. Returns the SHA-256 of the content.
+    """
+    digest = hashlib.sha256()
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        for fragment in fragments:
+            f.write(fragment)
+            digest.update(fragment.encode('utf-8'))
+    content_hash = digest.hexdigest()
+    
+    if _file_sha256(path) == content_hash:
+        tmp_path.unlink()
+    else:
+        os.replace(tmp_path, path)
+    return content_hash
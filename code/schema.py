@@ -1,7 +1,12 @@
 """
 JSON Schema for Claude Skills - Master Schema
 Comprehensive validation for world-class Skills that work across all platforms.
+
+Structural validation is compiled directly from SKILL_SPEC_SCHEMA (see
+plugins/validators/schema_compiler.py). Missing properties are checked as
+their "default", and "errorMessage" overrides the generated messages.
 """
+import re
 
 SKILL_SPEC_SCHEMA = {
     "$schema": "http://json-schema.org/draft-07/schema#",
@@ -13,12 +18,14 @@ SKILL_SPEC_SCHEMA = {
         # === LEVEL 1: METADATA (Always loaded, ~100 tokens) ===
         "name": {
             "type": "string",
+            "default": "",
             "minLength": 1,
             "maxLength": 64,
             "description": "Skill name in gerund form (e.g., 'Processing PDFs', 'Analyzing Spreadsheets'). Max 64 chars per Anthropic spec."
         },
         "description": {
             "type": "string",
+            "default": "",
             "minLength": 1,
             "maxLength": 1024,
             "description": "One-line description including WHAT it does and WHEN to use it. Max 1024 chars per Anthropic spec. Active voice, no first/second person."
@@ -27,48 +34,77 @@ SKILL_SPEC_SCHEMA = {
         # === LEVEL 2: INSTRUCTIONS (Loaded when triggered, <5k tokens) ===
         "triggers": {
             "type": "array",
+            "default": [],
             "minItems": 2,
             "items": {"type": "string", "minLength": 1},
             "description": "Phrases that should activate this skill (minimum 2)"
         },
         "inputs": {
             "type": "array",
+            "default": [],
             "minItems": 1,
             "items": {"type": "string"},
             "description": "Expected inputs (files, text, parameters, context)"
         },
         "guardrails": {
             "type": "array",
+            "default": [],
             "minItems": 1,
             "items": {"type": "string"},
             "description": "Rules and constraints Claude must follow. Be specific and actionable."
         },
         "procedure": {
             "type": "array",
+            "default": [],
             "minItems": 1,
             "items": {"type": "string"},
             "description": "Step-by-step process to follow. Each step should be clear and actionable."
         },
         "output_contract": {
             "type": "object",
+            "default": {},
             "required": ["title", "sections"],
+            "errorMessage": {
+                "required": {
+                    "title": "output_contract.title is required and cannot be empty",
+                    "sections": None
+                }
+            },
             "description": "Defines the expected output structure",
             "properties": {
                 "title": {
                     "type": "string", 
                     "minLength": 1,
+                    "errorMessage": {
+                        "minLength": "output_contract.title is required and cannot be empty"
+                    },
                     "description": "Title of the output document/report"
                 },
                 "sections": {
                     "type": "array",
+                    "default": [],
                     "minItems": 1,
+                    "uniqueItemProperty": "heading",
+                    "errorMessage": {
+                        "uniqueItemProperty": "Section headings must be unique"
+                    },
                     "items": {
                         "type": "object",
                         "required": ["heading", "required"],
+                        "errorMessage": {
+                            "type": "Section {index} must be an object",
+                            "required": {
+                                "heading": "Section {index} missing 'heading'",
+                                "required": "Section {index} missing 'required' field"
+                            }
+                        },
                         "properties": {
                             "heading": {
                                 "type": "string", 
                                 "minLength": 1,
+                                "errorMessage": {
+                                    "minLength": "Section {index} missing 'heading'"
+                                },
                                 "description": "Section heading"
                             },
                             "required": {
@@ -88,11 +124,21 @@ SKILL_SPEC_SCHEMA = {
                     "items": {
                         "type": "object",
                         "required": ["name", "columns"],
+                        "errorMessage": {
+                            "type": "Table {index} must be an object",
+                            "required": {"columns": None}
+                        },
                         "properties": {
                             "name": {"type": "string"},
                             "columns": {
                                 "type": "array",
+                                "default": [],
                                 "minItems": 1,
+                                "uniqueItems": True,
+                                "errorMessage": {
+                                    "minItems": "Table {index} must have at least 1 column",
+                                    "uniqueItems": "Table {index} has duplicate column names"
+                                },
                                 "items": {"type": "string", "minLength": 1}
                             }
                         }
@@ -116,6 +162,10 @@ SKILL_SPEC_SCHEMA = {
                 "properties": {
                     "path": {
                         "type": "string",
+                        "pattern": "^[^\\\\]*$",
+                        "errorMessage": {
+                            "pattern": "reference_files[{index}].path must use forward slashes, not backslashes"
+                        },
                         "description": "Relative path using forward slashes only (e.g., 'reference/api-docs.md')"
                     },
                     "purpose": {
@@ -192,6 +242,9 @@ SKILL_SPEC_SCHEMA = {
             "items": {
                 "type": "string",
                 "pattern": "^[A-Za-z0-9_-]+:[A-Za-z0-9_-]+$",
+                "errorMessage": {
+                    "pattern": "mcp_tools[{index}] must use format 'ServerName:tool_name', got: {value}"
+                },
                 "description": "MCP tool in format 'ServerName:tool_name' (e.g., 'BigQuery:run_query')"
             },
             "description": "MCP (Model Context Protocol) tools this skill uses. Must be fully qualified."
@@ -249,6 +302,100 @@ SKILL_SPEC_SCHEMA = {
 }
 
 
+# === BEST PRACTICE KEYWORDS ===
+# Matched case-insensitively as substrings, like `phrase in text.lower()`.
+FIRST_SECOND_PERSON = ["i can", "you can", "this will", "i will", "you will", "we can", "let me"]
+WHEN_INDICATORS = [" when ", " for ", " use ", " helps ", " enables "]
+TIME_SENSITIVE_PATTERNS = [
+    "as of ", "current", "latest", "2024", "2025", "2026", "recent",
+    "now uses", "currently", "at the moment", "today", "this year"
+]
+VALIDATION_KEYWORDS = ["validate", "verify", "check", "ensure", "confirm"]
+NETWORK_KEYWORDS = ["requests", "urllib", "http", "api call", "fetch"]
+
+_KEYWORD_CATEGORIES = {
+    "first_second_person": FIRST_SECOND_PERSON,
+    "when": WHEN_INDICATORS,
+    "time_sensitive": TIME_SENSITIVE_PATTERNS,
+    "validation": VALIDATION_KEYWORDS,
+    "network": NETWORK_KEYWORDS,
+}
+
+
+def _build_keyword_matcher():
+    """
+    Combine every keyword into one regex. The alternation sits in a lookahead
+    so overlapping keywords are all reported, and keeps list order so the
+    first match at a position is the lowest-indexed keyword there.
+    """
+    owners = {}
+    for category, keywords in _KEYWORD_CATEGORIES.items():
+        for index, keyword in enumerate(keywords):
+            owners.setdefault(keyword, []).append((category, index))
+    ordered = sorted(owners, key=lambda k: min(index for _, index in owners[k]))
+    pattern = re.compile("(?=(" + "|".join(re.escape(k) for k in ordered) + "))")
+    return pattern, owners
+
+
+_KEYWORD_PATTERN, _KEYWORD_OWNERS = _build_keyword_matcher()
+
+
+def scan_keywords(text: str) -> dict:
+    """
+    Scan text once for every keyword category.
+    Returns {category: index of the first-listed keyword found}.
+    """
+    hits = {}
+    for match in _KEYWORD_PATTERN.finditer(text.lower()):
+        for category, index in _KEYWORD_OWNERS[match.group(1)]:
+            if index < hits.get(category, len(_KEYWORD_CATEGORIES[category])):
+                hits[category] = index
+    return hits
+
+
+def _scan_spec(spec) -> tuple:
+    """
+    Walk the spec once, scanning every key and string value.
+    Returns (keyword hits by path, categories found anywhere, backslash paths).
+    """
+    hits_by_path = {}
+    found = set()
+    backslash_paths = []
+
+    def record(path, text):
+        hits = scan_keywords(text)
+        if hits:
+            hits_by_path[path] = hits
+            found.update(hits)
+
+    def visit(obj, path):
+        if isinstance(obj, dict):
+            for k, v in obj.items():
+                child = f"{path}.{k}"
+                if isinstance(k, str):
+                    record(child + "#key", k)
+                if isinstance(v, str) and "\\" in v:
+                    backslash_paths.append((child, v))
+                visit(v, child)
+        elif isinstance(obj, list):
+            for i, item in enumerate(obj):
+                visit(item, f"{path}[{i}]")
+        elif isinstance(obj, str):
+            record(path, obj)
+
+    visit(spec, "")
+    return hits_by_path, found, backslash_paths
+
+
+def _hits_under(hits_by_path: dict, prefix: str) -> set:
+    """Categories found at prefix or anywhere below it."""
+    found = set()
+    for path, hits in hits_by_path.items():
+        if path == prefix or path.startswith(prefix + ".") or path.startswith(prefix + "["):
+            found.update(hits)
+    return found
+
+
 def validate_best_practices(spec: dict) -> list:
     """
     Comprehensive best practices validation based on Anthropic's official guidelines.
@@ -256,6 +403,9 @@ def validate_best_practices(spec: dict) -> list:
     """
     warnings = []
     
+    # Single pass over every string in the spec; the checks below use its results
+    hits_by_path, found_categories, backslash_paths = _scan_spec(spec)
+    
     # === NAME VALIDATION ===
     name = spec.get("name", "")
     if name:
@@ -284,9 +434,10 @@ def validate_best_practices(spec: dict) -> list:
     # === DESCRIPTION VALIDATION ===
     description = spec.get("description", "")
     if description:
+        description_hits = hits_by_path.get(".description", {})
+        
         # Check for first/second person
-        first_second_person = ["i can", "you can", "this will", "i will", "you will", "we can", "let me"]
-        if any(phrase in description.lower() for phrase in first_second_person):
+        if "first_second_person" in description_hits:
             warnings.append(
                 f"⚠️  DESCRIPTION: Use active voice without first/second person. "
                 f"Good: 'Processes Excel files and generates reports'. "
@@ -295,8 +446,7 @@ def validate_best_practices(spec: dict) -> list:
             )
         
         # Check for WHAT + WHEN
-        when_indicators = [" when ", " for ", " use ", " helps ", " enables "]
-        if not any(indicator in description.lower() for indicator in when_indicators):
+        if "when" not in description_hits:
             warnings.append(
                 f"⚠️  DESCRIPTION: Include both WHAT it does and WHEN to use it. "
                 f"Example: 'Analyzes spreadsheets to identify patterns (WHAT). "
@@ -304,44 +454,27 @@ def validate_best_practices(spec: dict) -> list:
             )
     
     # === FILE PATHS VALIDATION ===
-    def check_paths_recursive(obj, path=""):
-        """Recursively check for Windows-style backslashes in paths"""
-        if isinstance(obj, dict):
-            for k, v in obj.items():
-                if isinstance(v, str) and "\\" in v:
-                    warnings.append(
-                        f"⚠️  FILE PATHS: Use forward slashes only. "
-                        f"Found backslash in '{path}.{k}': {v}. "
-                        f"Change to: {v.replace(chr(92), '/')}"
-                    )
-                check_paths_recursive(v, f"{path}.{k}")
-        elif isinstance(obj, list):
-            for i, item in enumerate(obj):
-                check_paths_recursive(item, f"{path}[{i}]")
-    
-    check_paths_recursive(spec)
+    for path, value in backslash_paths:
+        warnings.append(
+            f"⚠️  FILE PATHS: Use forward slashes only. "
+            f"Found backslash in '{path}': {value}. "
+            f"Change to: {value.replace(chr(92), '/')}"
+        )
     
     # === TIME-SENSITIVE CONTENT ===
-    time_sensitive_patterns = [
-        "as of ", "current", "latest", "2024", "2025", "2026", "recent",
-        "now uses", "currently", "at the moment", "today", "this year"
-    ]
-    
-    def check_time_sensitive(text, field_name):
-        if text and isinstance(text, str):
-            text_lower = text.lower()
-            for pattern in time_sensitive_patterns:
-                if pattern in text_lower:
-                    warnings.append(
-                        f"⚠️  TIME-SENSITIVE: Potential time-sensitive information in '{field_name}': '{pattern}'. "
-                        f"Consider moving to separate 'Current Configuration' section that can be updated. "
-                        f"See: MASTER_KNOWLEDGE.md - Content Quality"
-                    )
-                    break
+    def check_time_sensitive(path, field_name):
+        index = hits_by_path.get(path, {}).get("time_sensitive")
+        if index is not None:
+            pattern = TIME_SENSITIVE_PATTERNS[index]
+            warnings.append(
+                f"⚠️  TIME-SENSITIVE: Potential time-sensitive information in '{field_name}': '{pattern}'. "
+                f"Consider moving to separate 'Current Configuration' section that can be updated. "
+                f"See: MASTER_KNOWLEDGE.md - Content Quality"
+            )
     
-    check_time_sensitive(spec.get("description"), "description")
+    check_time_sensitive(".description", "description")
     for i, guard in enumerate(spec.get("guardrails", [])):
-        check_time_sensitive(guard, f"guardrails[{i}]")
+        check_time_sensitive(f".guardrails[{i}]", f"guardrails[{i}]")
     
     # === MCP TOOLS VALIDATION ===
     for tool in spec.get("mcp_tools", []):
@@ -353,11 +486,7 @@ def validate_best_practices(spec: dict) -> list:
             )
     
     # === VALIDATION FEEDBACK LOOP ===
-    validation_keywords = ["validate", "verify", "check", "ensure", "confirm"]
-    has_validation_mentions = any(
-        keyword in str(spec).lower() 
-        for keyword in validation_keywords
-    )
+    has_validation_mentions = "validation" in found_categories
     
     if has_validation_mentions and not spec.get("validation", {}).get("feedback_loop"):
         warnings.append(
@@ -423,11 +552,9 @@ def validate_best_practices(spec: dict) -> list:
     if spec.get("code_helper", {}).get("enabled"):
         # Check for network-dependent code
         scripts = spec.get("code_helper", {}).get("scripts", [])
-        network_keywords = ["requests", "urllib", "http", "api call", "fetch"]
         
-        for script in scripts:
-            script_str = str(script).lower()
-            if any(keyword in script_str for keyword in network_keywords):
+        for i, script in enumerate(scripts):
+            if "network" in _hits_under(hits_by_path, f".code_helper.scripts[{i}]"):
                 warnings.append(
                     f"⚠️  NETWORK ACCESS: Script may require network access. "
                     f"Claude Skills run in sandboxed environment with NO network access. "
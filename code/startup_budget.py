@@ -0,0 +1,145 @@
+"""
+Cold-start import budget check for the CLI.
+
+Runs each subcommand under `python -X importtime` and fails when the time
+spent importing modules beyond the interpreter's own startup exceeds the
+command's budget, or when the command imports a module it should not need.
+
+Usage:
+    python3 -m code.startup_budget [--runs N] [--scale X] [--verbose]
+"""
+import argparse
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, FrozenSet, List, NamedTuple, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+EXAMPLE_SPEC = "examples/minimal/skill.spec.json"
+
+# Modules that only one command should pay for
+_SCAFFOLD = {"code.scaffold", "code.plugins.renderers.jinja_renderer"}
+_VALIDATE = {"code.validate", "code.schema"}
+_PACK = {"code.pack", "zipfile"}
+_ALWAYS = {"multiprocessing", "concurrent.futures", "socket", "code.daemon", "code.watch"}
+
+
+class Budget(NamedTuple):
+    """Import-time limit for one CLI invocation."""
+    name: str
+    argv: Tuple[str, ...]
+    budget_ms: float
+    forbidden: FrozenSet[str]
+
+
+# Budgets are about twice a typical run (best of 5 after a warm-up: help
+# ~22 ms, validate ~38, new ~36, pack ~58, analyze ~32), so noise alone does
+# not fail the check. Importing every command module eagerly costs about
+# 70 ms, even for --help; the forbidden lists catch that regardless of timing.
+# {out} is replaced with a scratch directory holding a scaffolded example skill
+BUDGETS = [
+    Budget("help", ("--help",), 45.0,
+           frozenset(_SCAFFOLD | _VALIDATE | _PACK | _ALWAYS)),
+    Budget("validate", ("validate", EXAMPLE_SPEC), 80.0,
+           frozenset(_SCAFFOLD | _PACK | _ALWAYS)),
+    Budget("new", ("new", "--spec", EXAMPLE_SPEC, "--out", "{out}"), 75.0,
+           frozenset(_VALIDATE | _PACK | _ALWAYS)),
+    Budget("pack", ("pack", "--dir", "{out}/summarizing-documents", "--out", "{out}/skill.zip"), 120.0,
+           frozenset(_SCAFFOLD | _VALIDATE | (_ALWAYS - {"concurrent.futures"}))),
+    Budget("analyze", ("analyze", "--dir", "{out}/summarizing-documents"), 65.0,
+           frozenset(_SCAFFOLD | _VALIDATE | _PACK | _ALWAYS)),
+]
+
+
+class Measurement(NamedTuple):
+    """Import cost of one invocation beyond bare interpreter startup."""
+    import_ms: float
+    modules: Dict[str, float]
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """(module, self us, cumulative us) per -X importtime line, names with indentation."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        rows.append((fields[2].rstrip(), int(fields[0]), int(fields[1])))
+    return rows
+
+
+def measure(argv: Tuple[str, ...], baseline: FrozenSet[str]) -> Measurement:
+    """Run the CLI once and sum top-level imports not already done by the interpreter."""
+    command = [sys.executable, "-X", "importtime", "-m", "code.cli", "--no-daemon", *argv]
+    proc = subprocess.run(command, cwd=REPO_ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(argv)} exited with {proc.returncode}")
+    modules = {}
+    total = 0
+    for name, _, cumulative in parse_importtime(proc.stderr):
+        module = name.strip()
+        modules[module] = cumulative / 1000
+        top_level = name.startswith(" ") and not name.startswith("  ")
+        if top_level and module not in baseline:
+            total += cumulative
+    return Measurement(total / 1000, modules)
+
+
+def interpreter_modules() -> FrozenSet[str]:
+    """Modules imported by the bare interpreter, which no command can avoid."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "pass"],
+                          capture_output=True, text=True, check=True)
+    return frozenset(name.strip() for name, _, _ in parse_importtime(proc.stderr))
+
+
+def check(runs: int = 5, scale: float = 1.0, verbose: bool = False) -> List[str]:
+    """Measure every budgeted command (best of runs, after a warm-up) and return the failures."""
+    baseline = interpreter_modules()
+    failures = []
+    with tempfile.TemporaryDirectory() as out:
+        for budget in BUDGETS:
+            argv = tuple(arg.replace("{out}", out) for arg in budget.argv)
+            # Discarded: the first run pays for cold disk caches
+            measure(argv, baseline)
+            best = min((measure(argv, baseline) for _ in range(runs)),
+                       key=lambda m: m.import_ms)
+            limit = budget.budget_ms * scale
+            status = "ok" if best.import_ms <= limit else "OVER"
+            print(f"{budget.name:<9} {best.import_ms:7.1f} ms  (budget {limit:.1f} ms)  {status}")
+            if best.import_ms > limit:
+                failures.append(
+                    f"{budget.name}: imports took {best.import_ms:.1f} ms (budget {limit:.1f} ms)"
+                )
+            unexpected = sorted(budget.forbidden & best.modules.keys())
+            if unexpected:
+                failures.append(f"{budget.name}: imports {', '.join(unexpected)}")
+            if verbose:
+                slowest = sorted(best.modules.items(), key=lambda item: -item[1])[:10]
+                for module, ms in slowest:
+                    print(f"    {ms:7.1f} ms  {module}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Runs per command; the fastest counts")
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="Multiply every budget, e.g. 2 on slow CI machines"
+    )
+    parser.add_argument("--verbose", action="store_true", help="Show the slowest imports")
+    args = parser.parse_args()
+
+    failures = check(args.runs, args.scale, args.verbose)
+    if failures:
+        print("\n✗ Startup budget exceeded:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\n✓ All commands within their startup budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,25 @@ Skill spec validation module.
 Checks structural integrity and Claude Skills best practices.
 """
 import json
-from pathlib import Path
-from typing import List, Dict, Any
-from .schema import validate_best_practices
+import os
+from functools import lru_cache
+from typing import List, Dict, Any, Callable, NamedTuple, Optional, Sequence
+from .plugins.validators.custom import ValidatorTiming, run_custom_validators
+from .plugins.validators.discovery import ADVISORY_RULES, enabled_rules, load_validators
+from .plugins.validators.schema_compiler import compile_schema
+from .schema import SKILL_SPEC_SCHEMA, validate_best_practices
+
+
+class ValidationResult(NamedTuple):
+    """Outcome of validating one spec file."""
+    spec_path: str
+    errors: List[str]
+    warnings: List[str]
+    timings: Sequence[ValidatorTiming] = ()
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors
 
 
 def validate_spec(spec_path: str) -> List[str]:
@@ -14,154 +30,95 @@ def validate_spec(spec_path: str) -> List[str]:
     Returns list of error messages (empty if valid).
     Prints warnings for best practice suggestions.
     """
-    errors = []
-    
+    result = check_spec(spec_path)
+    if result.valid:
+        print_best_practices(result.warnings)
+    return result.errors
+
+
+def check_spec(spec_path: str, rules: Optional[Sequence[str]] = None) -> ValidationResult:
+    """
+    Validate a skill spec file without printing anything.
+    Structurally valid specs are then checked by the validator rules
+    (default: enabled_rules()) and any in-process custom validators; the
+    built-in rules only add warnings. Warnings are only collected for specs
+    without errors.
+    """
     try:
         with open(spec_path, 'r') as f:
             spec = json.load(f)
     except FileNotFoundError:
-        return [f"Spec file not found: {spec_path}"]
+        return ValidationResult(spec_path, [f"Spec file not found: {spec_path}"], [])
     except json.JSONDecodeError as e:
-        return [f"Invalid JSON: {e}"]
-    
-    # Required top-level fields (updated to match Claude requirements)
-    required_fields = ["name", "description", "triggers", "inputs", "guardrails", "procedure", "output_contract"]
-    for field in required_fields:
-        if field not in spec:
-            errors.append(f"Missing required field: {field}")
-    
-    # Name validation (Claude limit: 64 chars)
-    name = spec.get("name", "")
-    if not name:
-        errors.append("Field 'name' cannot be empty")
-    elif len(name) > 64:
-        errors.append(f"Field 'name' must be 64 characters or less (currently {len(name)})")
-    
-    # Description validation (Claude limit: 1024 chars)
-    description = spec.get("description", "")
-    if not description:
-        errors.append("Field 'description' cannot be empty")
-    elif len(description) > 1024:
-        errors.append(f"Field 'description' must be 1024 characters or less (currently {len(description)})")
-    
-    # Triggers validation
-    triggers = spec.get("triggers", [])
-    if not isinstance(triggers, list):
-        errors.append("Field 'triggers' must be an array")
-    elif len(triggers) < 2:
-        errors.append("Field 'triggers' must have at least 2 items")
-    
-    # Inputs validation
-    inputs = spec.get("inputs", [])
-    if not isinstance(inputs, list):
-        errors.append("Field 'inputs' must be an array")
-    elif len(inputs) == 0:
-        errors.append("Field 'inputs' must have at least 1 item")
-    
-    # Guardrails validation
-    guardrails = spec.get("guardrails", [])
-    if not isinstance(guardrails, list):
-        errors.append("Field 'guardrails' must be an array")
-    elif len(guardrails) == 0:
-        errors.append("Field 'guardrails' must have at least 1 item")
-    
-    # Procedure validation
-    procedure = spec.get("procedure", [])
-    if not isinstance(procedure, list):
-        errors.append("Field 'procedure' must be an array")
-    elif len(procedure) == 0:
-        errors.append("Field 'procedure' must have at least 1 item")
-    
-    # Output contract validation
-    output_contract = spec.get("output_contract", {})
-    if not isinstance(output_contract, dict):
-        errors.append("Field 'output_contract' must be an object")
+        return ValidationResult(spec_path, [f"Invalid JSON: {e}"], [])
+    if not isinstance(spec, dict):
+        return ValidationResult(spec_path, ["Spec must be a JSON object"], [])
+    
+    errors = check_structure(spec)
+    if errors:
+        return ValidationResult(spec_path, errors, [])
+    timings: List[ValidatorTiming] = []
+    validators = load_validators(enabled_rules() if rules is None else rules)
+    rule_warnings: List[str] = []
+    errors = run_custom_validators(spec, timings, validators, ADVISORY_RULES, rule_warnings)
+    warnings = [] if errors else validate_best_practices(spec) + rule_warnings
+    return ValidationResult(spec_path, errors, warnings, timings)
+
+
+def validate_many(spec_paths: List[str], jobs: Optional[int] = None,
+                  rules: Optional[Sequence[str]] = None) -> List[ValidationResult]:
+    """
+    Validate many spec files concurrently in a process pool.
+    Returns one ValidationResult per path, in input order.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    rules = enabled_rules() if rules is None else list(rules)
+    tasks = [(str(p), rules) for p in spec_paths]
+    if jobs == 1 or len(tasks) <= 1:
+        return [_check_spec_worker(task) for task in tasks]
+
+    # multiprocessing is slow to import, so only batches pay for it
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = max(1, len(tasks) // (jobs * 8))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(_check_spec_worker, tasks, chunksize=chunksize))
+
+
+def _check_spec_worker(task) -> ValidationResult:
+    """check_spec that reports unexpected exceptions as errors instead of raising."""
+    spec_path, rules = task
+    try:
+        return check_spec(spec_path, rules)
+    except Exception as e:
+        return ValidationResult(spec_path, [f"Validation failed unexpectedly: {type(e).__name__}: {e}"], [])
+
+
+def print_best_practices(warnings: List[str]) -> None:
+    """Print the best-practice report for a structurally valid spec."""
+    print("\n✓ Spec structure is valid!")
+    print("\nChecking best practices...\n")
+    if warnings:
+        print("⚠️  Best Practice Suggestions:")
+        for warning in warnings:
+            print(f"  {warning}")
+        print("\nNote: These are suggestions, not errors. The spec is valid.")
     else:
-        if not output_contract.get("title"):
-            errors.append("output_contract.title is required and cannot be empty")
-        
-        sections = output_contract.get("sections", [])
-        if not isinstance(sections, list):
-            errors.append("output_contract.sections must be an array")
-        elif len(sections) == 0:
-            errors.append("output_contract.sections must have at least 1 item")
-        else:
-            # Check section uniqueness
-            headings = [s.get("heading") for s in sections if isinstance(s, dict)]
-            if len(headings) != len(set(headings)):
-                errors.append("Section headings must be unique")
-            
-            # Validate each section
-            for i, section in enumerate(sections):
-                if not isinstance(section, dict):
-                    errors.append(f"Section {i} must be an object")
-                    continue
-                if not section.get("heading"):
-                    errors.append(f"Section {i} missing 'heading'")
-                if "required" not in section:
-                    errors.append(f"Section {i} missing 'required' field")
-        
-        # Tables validation (optional)
-        tables = output_contract.get("tables", [])
-        if tables and isinstance(tables, list):
-            for i, table in enumerate(tables):
-                if not isinstance(table, dict):
-                    errors.append(f"Table {i} must be an object")
-                    continue
-                columns = table.get("columns", [])
-                if not columns or len(columns) == 0:
-                    errors.append(f"Table {i} must have at least 1 column")
-                elif len(columns) != len(set(columns)):
-                    errors.append(f"Table {i} has duplicate column names")
-    
-    # Code helper validation (optional)
-    if "code_helper" in spec:
-        code_helper = spec["code_helper"]
-        if not isinstance(code_helper, dict):
-            errors.append("Field 'code_helper' must be an object")
-    
-    # MCP tools validation (optional)
-    mcp_tools = spec.get("mcp_tools", [])
-    if mcp_tools:
-        if not isinstance(mcp_tools, list):
-            errors.append("Field 'mcp_tools' must be an array")
-        else:
-            for i, tool in enumerate(mcp_tools):
-                if not isinstance(tool, str):
-                    errors.append(f"mcp_tools[{i}] must be a string")
-                elif ":" not in tool:
-                    errors.append(
-                        f"mcp_tools[{i}] must use format 'ServerName:tool_name', got: {tool}"
-                    )
-    
-    # Reference files validation (optional)
-    ref_files = spec.get("reference_files", [])
-    if ref_files:
-        if not isinstance(ref_files, list):
-            errors.append("Field 'reference_files' must be an array")
-        else:
-            for i, ref in enumerate(ref_files):
-                if not isinstance(ref, dict):
-                    errors.append(f"reference_files[{i}] must be an object")
-                elif "\\" in ref.get("path", ""):
-                    errors.append(
-                        f"reference_files[{i}].path must use forward slashes, not backslashes"
-                    )
-    
-    # If no structural errors, check best practices
-    if not errors:
-        print("\n✓ Spec structure is valid!")
-        print("\nChecking best practices...\n")
-        warnings = validate_best_practices(spec)
-        if warnings:
-            print("⚠️  Best Practice Suggestions:")
-            for warning in warnings:
-                print(f"  {warning}")
-            print("\nNote: These are suggestions, not errors. The spec is valid.")
-        else:
-            print("✓ No best practice issues found!")
-    
-    return errors
+        print("✓ No best practice issues found!")
+
+
+def check_structure(spec: Dict[str, Any]) -> List[str]:
+    """
+    Check a loaded spec against SKILL_SPEC_SCHEMA.
+    Returns list of error messages (empty if valid).
+    """
+    return spec_validator()(spec)
+
+
+@lru_cache(maxsize=None)
+def spec_validator() -> Callable[[Any], List[str]]:
+    """Return the validator compiled from SKILL_SPEC_SCHEMA (built once)."""
+    return compile_schema(SKILL_SPEC_SCHEMA)
 
 
 def validate_rendered_template(template_content: str, spec: Dict[str, Any]) -> List[str]:
@@ -176,7 +133,7 @@ def validate_rendered_template(template_content: str, spec: Dict[str, Any]) -> L
         errors.append("Template contains unresolved placeholders")
     
     # Check SKILL.md length recommendation
-    line_count = len(template_content.split('\n'))
+    line_count = template_content.count('\n') + 1
     if line_count > 500:
         errors.append(
             f"SKILL.md is {line_count} lines (recommended: under 500). "
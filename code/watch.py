@@ -0,0 +1,131 @@
+"""
+Watch mode: validate, scaffold and optionally pack skills again whenever
+their spec or a template they render changes.
+"""
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+
+from .pack import pack_skill
+from .plugins.io.watcher import DEFAULT_DEBOUNCE, next_batch, open_watcher
+from .scaffold import TEMPLATE_NAMES, get_loader, scaffold_skill
+from .validate import check_spec
+
+SPEC_FILE_NAME = "skill.spec.json"
+
+# Templates rendered only for specs with code_helper.enabled
+_CODE_HELPER_TEMPLATES = frozenset({"code_stub.tmpl"})
+
+
+class BuildResult(NamedTuple):
+    """Outcome of rebuilding one spec."""
+    spec_path: str
+    skill_dir: Optional[Path]
+    zip_path: Optional[Path]
+    errors: List[str]
+    warnings: List[str]
+    seconds: float
+
+
+class SkillWatcher:
+    """
+    Rebuild the skills under spec_dir into output_dir as files change.
+
+    Each spec remembers which templates it renders, so a spec change
+    rebuilds only that skill and a template change rebuilds only its
+    dependents, concurrently in a thread pool. Templates stay compiled in
+    the shared loader between rebuilds; a changed template is re-read.
+    """
+
+    def __init__(self, spec_dir: str, output_dir: str,
+                 template_dirs: Optional[Sequence[str]] = None,
+                 jobs: Optional[int] = None, pack: bool = False):
+        self.spec_dir = Path(spec_dir)
+        self.output_dir = output_dir
+        self.loader = get_loader(template_dirs)
+        self.pack = pack
+        self.jobs = jobs or os.cpu_count() or 1
+        # Spec path -> names of the templates its last build rendered
+        self.dependencies: Dict[str, FrozenSet[str]] = {}
+
+    def discover(self) -> List[str]:
+        """Every spec file under spec_dir, sorted."""
+        specs = []
+        for directory, _, filenames in os.walk(self.spec_dir):
+            if SPEC_FILE_NAME in filenames:
+                specs.append(str(Path(directory) / SPEC_FILE_NAME))
+        return sorted(specs)
+
+    def affected(self, changed: Iterable[Path]) -> List[str]:
+        """Specs to rebuild for a batch of changed files."""
+        template_dirs = set(self.loader.search_path)
+        specs = set()
+        for path in changed:
+            if path.name == SPEC_FILE_NAME:
+                if path.is_file():
+                    specs.add(str(path))
+                else:
+                    self.dependencies.pop(str(path), None)
+            elif path.name in TEMPLATE_NAMES and path.parent in template_dirs:
+                self.loader.invalidate(path.name)
+                specs.update(spec for spec, names in self.dependencies.items()
+                             if path.name in names)
+        return sorted(specs)
+
+    def build(self, spec_paths: Sequence[str], executor: ThreadPoolExecutor) -> List[BuildResult]:
+        """Rebuild specs concurrently, in input order."""
+        return list(executor.map(self._build_one, spec_paths))
+
+    def batches(self, debounce: float = DEFAULT_DEBOUNCE,
+                poll: bool = False) -> Iterator[List[BuildResult]]:
+        """
+        Build every spec once, then yield the results of each rebuild
+        triggered by a debounced batch of changes, until interrupted.
+        """
+        roots = [self.spec_dir] + [d for d in self.loader.search_path if d.is_dir()]
+        watcher = open_watcher(roots, poll)
+        try:
+            with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                yield self.build(self.discover(), executor)
+                while True:
+                    changed = next_batch(watcher, debounce)
+                    if watcher.overflowed:
+                        # Events were lost: rebuild everything
+                        watcher.overflowed = False
+                        self.loader.clear()
+                        specs = self.discover()
+                    else:
+                        specs = self.affected(changed)
+                    if specs:
+                        yield self.build(specs, executor)
+        finally:
+            watcher.close()
+
+    def _build_one(self, spec_path: str) -> BuildResult:
+        start = time.perf_counter()
+        validation = check_spec(spec_path)
+        if not validation.valid:
+            self.dependencies[spec_path] = frozenset()
+            return BuildResult(spec_path, None, None, validation.errors, [],
+                               time.perf_counter() - start)
+        try:
+            with open(spec_path, 'r') as f:
+                spec = json.load(f)
+            names = frozenset(TEMPLATE_NAMES)
+            if not spec.get("code_helper", {}).get("enabled"):
+                names -= _CODE_HELPER_TEMPLATES
+            self.dependencies[spec_path] = names
+
+            skill_dir = scaffold_skill(spec_path, self.output_dir, self.loader)
+            zip_path = None
+            if self.pack:
+                zip_path = Path(self.output_dir) / f"{skill_dir.name}.zip"
+                pack_skill(str(skill_dir), str(zip_path), update=zip_path.exists())
+        except Exception as e:
+            return BuildResult(spec_path, None, None, [f"{type(e).__name__}: {e}"], [],
+                               time.perf_counter() - start)
+        return BuildResult(spec_path, skill_dir, zip_path, [], validation.warnings,
+                           time.perf_counter() - start)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark git_log-style calls: one git process per call versus pooled workers.
+
+Usage:
+    python3 benchmark.py [--repos N] [--commits N] [--calls N] [REPO ...]
+
+Without REPO arguments, N throwaway repositories are created in a temp dir.
+"""
+
+import argparse
+import os
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from git_worker import WorkerPool, run_git_command
+
+
+def make_repos(root: Path, count: int, commits: int) -> list:
+    env = dict(os.environ, GIT_AUTHOR_NAME="bench", GIT_AUTHOR_EMAIL="bench@example.com",
+               GIT_COMMITTER_NAME="bench", GIT_COMMITTER_EMAIL="bench@example.com")
+    repos = []
+    for i in range(count):
+        repo = root / f"skill-{i}"
+        repo.mkdir()
+        subprocess.run(["git", "init", "-q", str(repo)], check=True, env=env)
+        for n in range(commits):
+            (repo / "SKILL.md").write_text(f"revision {n}\n")
+            subprocess.run(["git", "-C", str(repo), "add", "SKILL.md"], check=True, env=env)
+            subprocess.run(["git", "-C", str(repo), "commit", "-qm", f"Revision {n}"],
+                           check=True, env=env)
+        repos.append(str(repo))
+    return repos
+
+
+def per_call(repos: list, calls: int, limit: int) -> float:
+    """The previous server behaviour: resolve, check and fork git for every call."""
+    start = time.perf_counter()
+    for i in range(calls):
+        path_obj = Path(repos[i % len(repos)]).expanduser().resolve()
+        if path_obj.exists():
+            run_git_command(str(path_obj), "log", f"--max-count={limit}", "--oneline", "--decorate")
+    return calls / (time.perf_counter() - start)
+
+
+def pooled(repos: list, calls: int, limit: int) -> float:
+    pool = WorkerPool(max_workers=len(repos))
+    try:
+        start = time.perf_counter()
+        for i in range(calls):
+            pool.get(repos[i % len(repos)]).log_oneline(limit)
+        return calls / (time.perf_counter() - start)
+    finally:
+        pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("repos", nargs="*", help="Existing repositories to use")
+    parser.add_argument("--repos", dest="count", type=int, default=8, help="Repositories to create")
+    parser.add_argument("--commits", type=int, default=20, help="Commits per created repository")
+    parser.add_argument("--calls", type=int, default=500, help="Calls per measurement")
+    parser.add_argument("--limit", type=int, default=10, help="git_log limit")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repos = args.repos or make_repos(Path(tmp), args.count, args.commits)
+        before = per_call(repos, args.calls, args.limit)
+        after = pooled(repos, args.calls, args.limit)
+        print(f"{len(repos)} repos, {args.calls} git_log calls (limit {args.limit})")
+        print(f"  git process per call: {before:8.1f} calls/sec")
+        print(f"  pooled workers:       {after:8.1f} calls/sec  ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
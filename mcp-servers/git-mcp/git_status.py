@@ -0,0 +1,288 @@
+"""
+Structured git status from `git status --porcelain=v2 -z --branch`, with a
+cache that lets repeated polling skip git entirely when nothing changed.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+# Arguments for the machine-readable status this module parses
+STATUS_ARGS = ("status", "--porcelain=v2", "-z", "--branch")
+
+# Repositories whose status is cached
+CACHE_SIZE = 256
+
+# Arguments listing the index, for the tracked files to stat
+LS_FILES_ARGS = ("ls-files", "-z", "--stage")
+
+# Working trees with more directories or tracked files than this are not
+# cached (always run git)
+MAX_SCAN_DIRS = 2000
+MAX_TRACKED_FILES = 50000
+
+# Mode of a submodule entry in the index; its contents are not stat'ed, so
+# repositories with submodules are not cached
+GITLINK_MODE = "160000"
+
+# Files modified this close to the signature may change again within the
+# same mtime tick, so results depending on them are not cached
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def parse_porcelain_v2(output: str) -> Dict[str, Any]:
+    """
+    Parse porcelain v2 status output (with -z and --branch) into a dict:
+    branch info, one entry per changed path, and per-kind counts.
+    """
+    branch: Dict[str, Any] = {
+        "oid": None, "head": None, "upstream": None, "ahead": 0, "behind": 0,
+    }
+    files: List[Dict[str, Optional[str]]] = []
+    records = output.split("\0")
+    i = 0
+    while i < len(records):
+        record = records[i]
+        i += 1
+        if not record:
+            continue
+        kind = record[0]
+        if kind == "#":
+            _parse_header(record, branch)
+        elif kind == "1":
+            fields = record.split(" ", 8)
+            files.append(_entry(fields[1], fields[8]))
+        elif kind == "2":
+            fields = record.split(" ", 9)
+            # The original path of a rename or copy is the next record
+            orig_path = records[i] if i < len(records) else None
+            i += 1
+            files.append(_entry(fields[1], fields[9], orig_path))
+        elif kind == "u":
+            fields = record.split(" ", 10)
+            files.append(_entry(fields[1], fields[10], conflicted=True))
+        elif kind == "?":
+            files.append({"path": record[2:], "index": "?", "worktree": "?", "orig_path": None})
+        elif kind == "!":
+            files.append({"path": record[2:], "index": "!", "worktree": "!", "orig_path": None})
+
+    counts = {"staged": 0, "unstaged": 0, "untracked": 0, "conflicted": 0, "ignored": 0}
+    for entry in files:
+        if entry.get("conflicted"):
+            counts["conflicted"] += 1
+        elif entry["index"] == "?":
+            counts["untracked"] += 1
+        elif entry["index"] == "!":
+            counts["ignored"] += 1
+        else:
+            if entry["index"] != ".":
+                counts["staged"] += 1
+            if entry["worktree"] != ".":
+                counts["unstaged"] += 1
+    clean = not (counts["staged"] or counts["unstaged"] or counts["untracked"] or counts["conflicted"])
+    return {"branch": branch, "files": files, "counts": counts, "clean": clean}
+
+
+def _parse_header(record: str, branch: Dict[str, Any]) -> None:
+    key, _, value = record[2:].partition(" ")
+    if key == "branch.oid":
+        branch["oid"] = None if value == "(initial)" else value
+    elif key == "branch.head":
+        branch["head"] = None if value == "(detached)" else value
+    elif key == "branch.upstream":
+        branch["upstream"] = value
+    elif key == "branch.ab":
+        ahead, behind = value.split()
+        branch["ahead"] = int(ahead)
+        branch["behind"] = -int(behind)
+
+
+def _entry(xy: str, path: str, orig_path: Optional[str] = None,
+           conflicted: bool = False) -> Dict[str, Any]:
+    entry = {"path": path, "index": xy[0], "worktree": xy[1], "orig_path": orig_path}
+    if conflicted:
+        entry["conflicted"] = True
+    return entry
+
+
+class TrackedFiles(NamedTuple):
+    """Paths in the index, as listed by `git ls-files --stage`."""
+    paths: Tuple[str, ...]
+    cacheable: bool
+
+
+def parse_ls_files(output: str) -> TrackedFiles:
+    """
+    Parse `git ls-files -z --stage` output. Not cacheable if the index has
+    submodules or more than MAX_TRACKED_FILES paths.
+    """
+    paths = {}
+    cacheable = True
+    for record in output.split("\0"):
+        if not record:
+            continue
+        meta, _, path = record.partition("\t")
+        if meta.split(" ", 1)[0] == GITLINK_MODE:
+            cacheable = False
+        # Unmerged paths are listed once per stage
+        paths[path] = None
+    if len(paths) > MAX_TRACKED_FILES:
+        cacheable = False
+    return TrackedFiles(tuple(paths), cacheable)
+
+
+def index_state(git_dir: str) -> Optional[Tuple[int, int, int]]:
+    """(mtime, ctime, size) of the index, or None if there is none yet."""
+    try:
+        st = os.stat(os.path.join(git_dir, "index"))
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_ctime_ns, st.st_size
+
+
+def tracked_fingerprint(root: str, paths: Tuple[str, ...]) -> Tuple[int, int]:
+    """
+    Hash of the stat data git compares for every tracked file, plus the
+    newest mtime or ctime seen. Rewriting, touching, deleting or changing
+    the mode of a tracked file changes it.
+    """
+    entries = []
+    newest = 0
+    for path in paths:
+        try:
+            st = os.lstat(os.path.join(root, path))
+        except OSError:
+            entries.append(None)
+            continue
+        entries.append((st.st_mtime_ns, st.st_ctime_ns, st.st_size, st.st_ino, st.st_mode))
+        newest = max(newest, st.st_mtime_ns, st.st_ctime_ns)
+    return hash(tuple(entries)), newest
+
+
+def worktree_fingerprint(root: str, limit: int = MAX_SCAN_DIRS) -> Optional[Tuple[int, int]]:
+    """
+    Hash of the mtimes of every directory in a working tree except .git,
+    plus the newest of them. None if the tree has more than limit
+    directories. Creating, deleting or renaming a file, tracked or not,
+    changes the mtime of its directory.
+    """
+    directories = []
+    newest = 0
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            st = os.stat(directory)
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False) and not (
+                            entry.name == ".git" and directory == root):
+                        stack.append(entry.path)
+        except OSError:
+            continue
+        directories.append((directory, st.st_mtime_ns))
+        newest = max(newest, st.st_mtime_ns)
+        if len(directories) > limit:
+            return None
+    return hash(tuple(directories)), newest
+
+
+def metadata_state(git_dir: str, common_dir: str) -> Tuple[Tuple, int]:
+    """
+    (mtime, size) of the index, info/exclude, repository config and global
+    config and ignore files, plus the newest mtime among them. Staging,
+    changing ignore rules or changing settings such as core.excludesFile
+    changes it.
+    """
+    config_home = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    names = (
+        os.path.join(git_dir, "index"), os.path.join(common_dir, "info", "exclude"),
+        os.path.join(common_dir, "config"), os.path.join(git_dir, "config.worktree"),
+        os.path.expanduser("~/.gitconfig"), os.path.join(config_home, "git", "config"),
+        os.path.join(config_home, "git", "ignore"),
+    )
+    state = []
+    newest = 0
+    for name in names:
+        try:
+            st = os.stat(name)
+        except OSError:
+            state.append(None)
+            continue
+        state.append((st.st_mtime_ns, st.st_size))
+        newest = max(newest, st.st_mtime_ns)
+    return tuple(state), newest
+
+
+class StatusCache:
+    """
+    Structured status per repository, valid while its signature is
+    unchanged. The signature combines the refs state (HEAD, branches,
+    remotes), the index, ignore and config files, the stat data of every
+    tracked file and the directory mtimes of the working tree, so any
+    change git status could report changes it. The tracked paths are
+    listed once per index change.
+    """
+
+    def __init__(self, max_entries: int = CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Hashable, Dict[str, Any]]]" = OrderedDict()
+        self._tracked: "OrderedDict[str, Tuple[Optional[Tuple], TrackedFiles]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def signature(path: str, git_dir: str, common_dir: str, refs_state: Tuple,
+                  tracked: TrackedFiles) -> Optional[Hashable]:
+        """
+        Current signature of a repository, or None if it cannot be cached
+        (a huge working tree, submodules, or files modified too recently to
+        trust mtimes).
+        """
+        if not tracked.cacheable:
+            return None
+        metadata, metadata_newest = metadata_state(git_dir, common_dir)
+        fingerprint = worktree_fingerprint(path)
+        if fingerprint is None:
+            return None
+        tree_hash, tree_newest = fingerprint
+        files_hash, files_newest = tracked_fingerprint(path, tracked.paths)
+        if time.time_ns() - max(tree_newest, files_newest, metadata_newest) < RACY_WINDOW_NS:
+            return None
+        return (refs_state, metadata, tree_hash, files_hash)
+
+    def tracked(self, path: str, state: Optional[Tuple]) -> Optional[TrackedFiles]:
+        """The tracked files listed for path, if its index is still in the given state."""
+        with self._lock:
+            entry = self._tracked.get(path)
+            if entry is None or entry[0] != state:
+                return None
+            self._tracked.move_to_end(path)
+            return entry[1]
+
+    def put_tracked(self, path: str, state: Optional[Tuple], tracked: TrackedFiles) -> None:
+        with self._lock:
+            self._tracked[path] = (state, tracked)
+            self._tracked.move_to_end(path)
+            while len(self._tracked) > self.max_entries:
+                self._tracked.popitem(last=False)
+
+    def get(self, path: str, signature: Optional[Hashable]) -> Optional[Dict[str, Any]]:
+        if signature is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != signature:
+                return None
+            self._entries.move_to_end(path)
+            return entry[1]
+
+    def put(self, path: str, signature: Optional[Hashable], status: Dict[str, Any]) -> None:
+        if signature is None:
+            return
+        with self._lock:
+            self._entries[path] = (signature, status)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,516 @@
+"""
+Long-lived per-repository git workers for the git MCP server.
+
+A RepoWorker resolves its repository path once and keeps `git cat-file
+--batch` / `--batch-check` processes open, so object lookups (and git_log,
+which is built on them) cost a pipe round trip instead of a fork/exec.
+Commands with no batch equivalent still run as one-off git processes.
+WorkerPool hands out workers by path and closes idle ones, plus an async
+readers-writer lock per repository so that tool calls reading a repository
+run in parallel while those changing it run one at a time. A worker closed
+while a lookup is in flight keeps its processes until the last lookup ends.
+"""
+
+import asyncio
+import heapq
+import os
+import signal
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+# Default pool limits
+MAX_WORKERS = 32
+IDLE_TIMEOUT = 300.0
+
+# Shortest abbreviated object name git_log prints
+MIN_ABBREV = 7
+
+# Parsed commits kept per worker; commits are immutable, so never stale
+COMMIT_CACHE_SIZE = 4096
+
+
+class ObjectInfo(NamedTuple):
+    """An object as reported by git cat-file."""
+    sha: str
+    type: str
+    size: int
+
+
+class Commit(NamedTuple):
+    """The parts of a commit that git_log needs."""
+    sha: str
+    parents: List[str]
+    timestamp: int
+    subject: str
+
+
+def run_git_command(path: str, *args) -> Tuple[bool, str, str]:
+    """
+    Run a git command in the specified directory.
+    Returns (success, stdout, stderr)
+    """
+    try:
+        result = subprocess.run(
+            ["git", "-C", path, *args],
+            capture_output=True,
+            text=True,
+            check=False
+        )
+        return result.returncode == 0, result.stdout, result.stderr
+    except Exception as e:
+        return False, "", str(e)
+
+
+async def run_git_async(path: str, *args: str, timeout: Optional[float] = None,
+                        env: Optional[Mapping[str, str]] = None) -> Tuple[bool, str, str]:
+    """
+    Run a git command without blocking the event loop.
+    Returns (success, stdout, stderr). The process is killed if it runs
+    longer than timeout seconds or if the calling task is cancelled.
+    """
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            "git", "-C", path, *args,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=env,
+            # Own process group, so a timeout also kills hooks, ssh and helpers
+            start_new_session=True,
+        )
+    except Exception as e:
+        return False, "", str(e)
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        await _kill(proc)
+        return False, "", f"git {args[0]} timed out after {timeout:g}s"
+    except asyncio.CancelledError:
+        await _kill(proc)
+        raise
+    return (proc.returncode == 0,
+            stdout.decode('utf-8', errors='replace'),
+            stderr.decode('utf-8', errors='replace'))
+
+
+async def _kill(proc: asyncio.subprocess.Process) -> None:
+    """Kill git and its children; they may hold its output pipes open."""
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except ProcessLookupError:
+        pass
+    await proc.wait()
+
+
+class RepoLock:
+    """
+    Async readers-writer lock for one repository. Any number of readers
+    may hold it together; a writer holds it alone. Waiting writers block
+    new readers, so a stream of reads cannot starve a commit or push.
+    """
+
+    def __init__(self):
+        self._cond = asyncio.Condition()
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @asynccontextmanager
+    async def read(self) -> AsyncIterator[None]:
+        async with self._cond:
+            await self._cond.wait_for(lambda: not self._writer and not self._writers_waiting)
+            self._readers += 1
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self._readers -= 1
+                self._cond.notify_all()
+
+    @asynccontextmanager
+    async def write(self) -> AsyncIterator[None]:
+        async with self._cond:
+            self._writers_waiting += 1
+            try:
+                await self._cond.wait_for(lambda: not self._writer and not self._readers)
+            finally:
+                self._writers_waiting -= 1
+                # A cancelled writer may have been holding back readers
+                self._cond.notify_all()
+            self._writer = True
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+class _BatchProcess:
+    """One `git cat-file --batch[-check]` process, restarted if it dies."""
+
+    def __init__(self, path: str, mode: str):
+        self.path = path
+        self.mode = mode
+        self.proc: Optional[subprocess.Popen] = None
+
+    def request(self, name: str) -> Tuple[Optional[ObjectInfo], Optional[bytes]]:
+        """Look up one object name; returns (None, None) if it is missing or ambiguous."""
+        if "\n" in name:
+            raise ValueError(f"Invalid object name: {name!r}")
+        proc = self._ensure()
+        try:
+            proc.stdin.write(name.encode('utf-8') + b"\n")
+            proc.stdin.flush()
+            header = proc.stdout.readline()
+        except (BrokenPipeError, OSError):
+            self.close()
+            raise
+        if not header:
+            self.close()
+            raise RuntimeError(f"git cat-file {self.mode} exited unexpectedly")
+        fields = header.decode('utf-8', errors='replace').split()
+        if len(fields) != 3:
+            # "<name> missing" or "<name> ambiguous"
+            return None, None
+        info = ObjectInfo(fields[0], fields[1], int(fields[2]))
+        if self.mode != "--batch":
+            return info, None
+        data = proc.stdout.read(info.size)
+        proc.stdout.read(1)  # trailing newline
+        return info, data
+
+    def close(self) -> None:
+        if self.proc is None:
+            return
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=1)
+        except (OSError, subprocess.TimeoutExpired):
+            self.proc.kill()
+        self.proc = None
+
+    def kill(self) -> None:
+        """Kill the process without waiting, failing a request blocked on its pipes."""
+        proc = self.proc
+        if proc is not None and proc.poll() is None:
+            proc.kill()
+
+    def _ensure(self) -> subprocess.Popen:
+        if self.proc is None or self.proc.poll() is not None:
+            self.proc = subprocess.Popen(
+                ["git", "-C", self.path, "cat-file", self.mode],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            )
+        return self.proc
+
+
+class RepoWorker:
+    """
+    A repository handle: the resolved path plus persistent cat-file
+    processes. Not safe for concurrent use from several threads; the
+    batch pipes are guarded by a lock, one-off commands are not.
+
+    Lookups count as users of the cat-file processes. close() while one is
+    in flight only retires the worker; the last user to finish closes them.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.last_used = time.monotonic()
+        self._lock = threading.Lock()
+        self._users_lock = threading.Lock()
+        self._users = 0
+        self._retired = False
+        self._batch = _BatchProcess(path, "--batch")
+        self._check = _BatchProcess(path, "--batch-check")
+        self._abbrev: Optional[int] = None
+        self._git_dirs: Optional[Tuple[str, str]] = None
+        self._refs_signature: Optional[Tuple] = None
+        self._decorations: Dict[str, List[str]] = {}
+        self._commits: Dict[str, Commit] = {}
+        # Unique prefixes can grow as objects are added; reset with the refs
+        self._abbreviations: Dict[str, str] = {}
+
+    @classmethod
+    def open(cls, path: str) -> "RepoWorker":
+        """Resolve path once; raises FileNotFoundError if it does not exist."""
+        path_obj = Path(path).expanduser().resolve()
+        if not path_obj.exists():
+            raise FileNotFoundError(f"Directory does not exist: {path}")
+        return cls(str(path_obj))
+
+    def run(self, *args: str) -> Tuple[bool, str, str]:
+        """Run a one-off git command. Returns (success, stdout, stderr)."""
+        self.last_used = time.monotonic()
+        return run_git_command(self.path, *args)
+
+    async def run_async(self, *args: str, timeout: Optional[float] = None,
+                        read_only: bool = False) -> Tuple[bool, str, str]:
+        """
+        run_git_async in this repository. read_only commands skip optional
+        locks (e.g. git status refreshing the index), so they never contend
+        with writers for index.lock.
+        """
+        self.last_used = time.monotonic()
+        env = dict(os.environ, GIT_OPTIONAL_LOCKS="0") if read_only else None
+        return await run_git_async(self.path, *args, timeout=timeout, env=env)
+
+    def info(self, name: str) -> Optional[ObjectInfo]:
+        """Type and size of an object (any revision syntax), or None."""
+        with self._use(), self._lock:
+            self.last_used = time.monotonic()
+            return self._check.request(name)[0]
+
+    def read(self, name: str) -> Tuple[Optional[ObjectInfo], Optional[bytes]]:
+        """Type, size and content of an object, or (None, None)."""
+        with self._use(), self._lock:
+            self.last_used = time.monotonic()
+            return self._batch.request(name)
+
+    def log_oneline(self, limit: int) -> Optional[str]:
+        """
+        Equivalent of `git log --max-count=limit --oneline --decorate`,
+        walked through cat-file. Returns None if HEAD does not resolve to a
+        commit (e.g. no commits yet), so callers can fall back to git log.
+        """
+        with self._use():
+            head = self.info("HEAD")
+            if head is None or head.type != "commit":
+                return None
+            decorations = self._load_decorations()
+            lines = []
+            for commit in self._walk(head.sha, limit):
+                abbrev = self._abbreviate(commit.sha)
+                refs = decorations.get(commit.sha)
+                if refs:
+                    lines.append(f"{abbrev} ({', '.join(refs)}) {commit.subject}\n")
+                else:
+                    lines.append(f"{abbrev} {commit.subject}\n")
+            return "".join(lines)
+
+    def close(self) -> None:
+        """Close the cat-file processes now, or when the last in-flight lookup ends."""
+        with self._users_lock:
+            self._retired = True
+            if not self._users:
+                self._close_batches()
+
+    def interrupt(self) -> None:
+        """Kill the cat-file processes, so a lookup stuck on them fails instead of hanging."""
+        self._batch.kill()
+        self._check.kill()
+
+    @contextmanager
+    def _use(self) -> Iterator[None]:
+        with self._users_lock:
+            self._users += 1
+        try:
+            yield
+        finally:
+            with self._users_lock:
+                self._users -= 1
+                # A retired worker's processes, respawned by a late lookup, go with its last user
+                if self._retired and not self._users:
+                    self._close_batches()
+
+    def _close_batches(self) -> None:
+        with self._lock:
+            self._batch.close()
+            self._check.close()
+
+    def _walk(self, start: str, limit: int) -> List[Commit]:
+        """Commits reachable from start, newest commit date first, like git log."""
+        commits = []
+        seen = {start}
+        counter = 0
+        queue = []
+        commit = self._commit(start)
+        heapq.heappush(queue, (-commit.timestamp, counter, commit))
+        while queue and len(commits) < limit:
+            _, _, commit = heapq.heappop(queue)
+            commits.append(commit)
+            for parent in commit.parents:
+                if parent not in seen:
+                    seen.add(parent)
+                    counter += 1
+                    parent_commit = self._commit(parent)
+                    heapq.heappush(queue, (-parent_commit.timestamp, counter, parent_commit))
+        return commits
+
+    def _commit(self, sha: str) -> Commit:
+        commit = self._commits.get(sha)
+        if commit is None:
+            if len(self._commits) >= COMMIT_CACHE_SIZE:
+                self._commits.clear()
+            commit = self._commits[sha] = self._parse_commit(sha)
+        return commit
+
+    def _parse_commit(self, sha: str) -> Commit:
+        info, data = self.read(sha)
+        if info is None or info.type != "commit":
+            raise RuntimeError(f"Not a commit: {sha}")
+        header, _, message = data.partition(b"\n\n")
+        parents = []
+        timestamp = 0
+        for line in header.split(b"\n"):
+            if line.startswith(b"parent "):
+                parents.append(line[7:].decode('ascii'))
+            elif line.startswith(b"committer "):
+                timestamp = int(line.rsplit(b" ", 2)[1])
+        # --oneline joins the lines of the first paragraph
+        paragraph = message.strip(b"\n").split(b"\n\n", 1)[0]
+        subject = " ".join(l.strip() for l in paragraph.decode('utf-8', errors='replace').split("\n"))
+        return Commit(sha, parents, timestamp, subject)
+
+    def _abbreviate(self, sha: str) -> str:
+        """Shortest unambiguous prefix of at least the repo's default length."""
+        abbrev = self._abbreviations.get(sha)
+        if abbrev is not None:
+            return abbrev
+        if self._abbrev is None:
+            ok, stdout, _ = self.run("rev-parse", "--short", sha)
+            self._abbrev = max(MIN_ABBREV, len(stdout.strip())) if ok else MIN_ABBREV
+        length = self._abbrev
+        while length < len(sha) and self.info(sha[:length]) is None:
+            length += 1
+        abbrev = self._abbreviations[sha] = sha[:length]
+        return abbrev
+
+    def _load_decorations(self) -> Dict[str, List[str]]:
+        """Ref names per commit, reloaded only when the refs on disk change."""
+        signature = self.refs_state()
+        if signature and signature == self._refs_signature:
+            return self._decorations
+        ok, stdout, _ = self.run(
+            "for-each-ref", "--format=%(objectname) %(*objectname) %(refname)",
+            "refs/heads", "refs/remotes", "refs/tags"
+        )
+        head_ok, head_ref, _ = self.run("symbolic-ref", "-q", "HEAD")
+        head_ref = head_ref.strip() if head_ok else None
+        head = self.info("HEAD")
+
+        decorations: Dict[str, List[str]] = {}
+        for line in stdout.splitlines() if ok else []:
+            fields = line.split(" ")
+            sha, peeled, ref = fields[0], fields[1], " ".join(fields[2:])
+            if ref.startswith("refs/tags/"):
+                name = "tag: " + ref[len("refs/tags/"):]
+            elif ref.startswith("refs/heads/"):
+                name = ref[len("refs/heads/"):]
+            else:
+                name = ref[len("refs/remotes/"):]
+            if ref == head_ref:
+                continue
+            # git prints the most recently added decoration first
+            decorations.setdefault(peeled or sha, []).insert(0, name)
+        if head is not None:
+            if head_ref is None:
+                decorations.setdefault(head.sha, []).insert(0, "HEAD")
+            else:
+                branch = head_ref[len("refs/heads/"):] if head_ref.startswith("refs/heads/") else head_ref
+                decorations.setdefault(head.sha, []).insert(0, f"HEAD -> {branch}")
+
+        self._refs_signature = signature
+        self._decorations = decorations
+        self._abbreviations = {}
+        return decorations
+
+    def git_dirs(self) -> Optional[Tuple[str, str]]:
+        """(git dir, common dir) of the repository, or None if it is not one yet."""
+        if self._git_dirs is None:
+            ok, stdout, _ = self.run("rev-parse", "--absolute-git-dir", "--git-common-dir")
+            if not ok:
+                return None
+            git_dir, common_dir = stdout.splitlines()[:2]
+            self._git_dirs = (git_dir, os.path.join(self.path, common_dir))
+        return self._git_dirs
+
+    def refs_state(self) -> Tuple:
+        """mtimes of HEAD, packed-refs and every refs directory; () if not a repository."""
+        git_dirs = self.git_dirs()
+        if git_dirs is None:
+            return ()
+        git_dir, common_dir = git_dirs
+        state = []
+        for name in (os.path.join(git_dir, "HEAD"), os.path.join(common_dir, "packed-refs")):
+            try:
+                state.append(os.stat(name).st_mtime_ns)
+            except OSError:
+                state.append(None)
+        for root, _, _ in os.walk(os.path.join(common_dir, "refs")):
+            state.append((root, os.stat(root).st_mtime_ns))
+        return tuple(state)
+
+
+class WorkerPool:
+    """
+    RepoWorkers by path, at most max_workers of them. Workers unused for
+    idle_timeout seconds, or least recently used beyond the limit, are closed.
+    """
+
+    def __init__(self, max_workers: int = MAX_WORKERS, idle_timeout: float = IDLE_TIMEOUT):
+        self.max_workers = max_workers
+        self.idle_timeout = idle_timeout
+        self._workers: "OrderedDict[str, RepoWorker]" = OrderedDict()
+        self._locks: Dict[str, RepoLock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> RepoWorker:
+        """Return the worker for path, opening it on first use."""
+        with self._lock:
+            self._evict_idle()
+            worker = self._workers.get(path)
+            if worker is not None:
+                self._workers.move_to_end(path)
+                worker.last_used = time.monotonic()
+                return worker
+            worker = RepoWorker.open(path)
+            self._workers[path] = worker
+            while len(self._workers) > self.max_workers:
+                _, oldest = self._workers.popitem(last=False)
+                oldest.close()
+            return worker
+
+    def lock(self, worker: RepoWorker) -> RepoLock:
+        """
+        The readers-writer lock of a worker's repository. Locks are keyed by
+        resolved path, so different spellings of a path share one lock, and
+        they outlive worker eviction.
+        """
+        with self._lock:
+            repo_lock = self._locks.get(worker.path)
+            if repo_lock is None:
+                repo_lock = self._locks[worker.path] = RepoLock()
+            return repo_lock
+
+    def discard(self, path: str) -> None:
+        """Close and forget the worker for path (e.g. after git init)."""
+        with self._lock:
+            worker = self._workers.pop(path, None)
+        if worker is not None:
+            worker.close()
+
+    def close(self) -> None:
+        with self._lock:
+            workers = list(self._workers.values())
+            self._workers.clear()
+        for worker in workers:
+            worker.close()
+
+    def _evict_idle(self) -> None:
+        now = time.monotonic()
+        while self._workers:
+            path, worker = next(iter(self._workers.items()))
+            if now - worker.last_used < self.idle_timeout:
+                break
+            del self._workers[path]
+            worker.close()
@@ -2,37 +2,109 @@
 """
 Git MCP Server for Skills-Builder
 Provides git operations that work with absolute filesystem paths
+
+Tools are async: git runs in subprocesses that do not block the event loop,
+with a timeout per call. Read-only tools on one repository run in parallel;
+tools that change a repository wait for each other.
 """
 
+import asyncio
 import os
-import subprocess
+import re
 from pathlib import Path
-from typing import Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 from mcp.server.fastmcp import FastMCP
 
+from git_status import (
+    LS_FILES_ARGS, STATUS_ARGS, StatusCache, TrackedFiles, index_state, parse_ls_files,
+    parse_porcelain_v2,
+)
+from git_worker import RepoWorker, WorkerPool
+
 # Initialize FastMCP server
 mcp = FastMCP("git-mcp")
 
+# Per-repository workers, reused across tool calls
+workers = WorkerPool()
+
+# Structured git_status results, reused while a repository is unchanged
+status_cache = StatusCache()
+
+# Default per-call timeouts in seconds
+READ_TIMEOUT = 30.0
+WRITE_TIMEOUT = 120.0
+NETWORK_TIMEOUT = 600.0
+
+
+def get_worker(path: str) -> Optional[RepoWorker]:
+    """Return the pooled worker for path, or None if the directory does not exist."""
+    try:
+        return workers.get(path)
+    except FileNotFoundError:
+        return None
+
+
+async def git_read(worker: RepoWorker, *args: str,
+                   timeout: float = READ_TIMEOUT) -> Tuple[bool, str, str]:
+    """Run a read-only git command; reads of one repository run in parallel."""
+    async with workers.lock(worker).read():
+        return await worker.run_async(*args, timeout=timeout, read_only=True)
+
+
+async def git_write(worker: RepoWorker, *args: str,
+                    timeout: float = WRITE_TIMEOUT) -> Tuple[bool, str, str]:
+    """Run a git command that changes the repository; writes to one repository are serialized."""
+    async with workers.lock(worker).write():
+        return await worker.run_async(*args, timeout=timeout)
 
-def run_git_command(path: str, *args) -> tuple[bool, str, str]:
+
+async def structured_status(worker: RepoWorker) -> Tuple[bool, Union[Dict[str, Any], str]]:
     """
-    Run a git command in the specified directory.
-    Returns (success, stdout, stderr)
+    Parsed porcelain v2 status, or (False, stderr). Reuses the cached result
+    while HEAD, refs, the index, ignore rules, config, every tracked file
+    and the working tree's directories are unchanged.
     """
-    try:
-        result = subprocess.run(
-            ["git", "-C", path, *args],
-            capture_output=True,
-            text=True,
-            check=False
-        )
-        return result.returncode == 0, result.stdout, result.stderr
-    except Exception as e:
-        return False, "", str(e)
+    signature = None
+    tracked = await tracked_files(worker)
+    if tracked is not None:
+        signature = await asyncio.to_thread(_status_signature, worker, tracked)
+    cached = status_cache.get(worker.path, signature)
+    if cached is not None:
+        return True, {**cached, "cached": True}
+    success, stdout, stderr = await git_read(worker, *STATUS_ARGS)
+    if not success:
+        return False, stderr
+    status = parse_porcelain_v2(stdout)
+    status_cache.put(worker.path, signature, status)
+    return True, {**status, "cached": False}
+
+
+async def tracked_files(worker: RepoWorker) -> Optional[TrackedFiles]:
+    """
+    The files in a repository's index, listed again only when the index
+    changes. None if the repository's status is not cached.
+    """
+    git_dirs = await asyncio.to_thread(worker.git_dirs)
+    # Only the top level of a plain repository is fingerprinted
+    if git_dirs is None or os.path.dirname(git_dirs[0]) != worker.path:
+        return None
+    state = index_state(git_dirs[0])
+    tracked = status_cache.tracked(worker.path, state)
+    if tracked is None:
+        success, stdout, _ = await git_read(worker, *LS_FILES_ARGS)
+        if not success:
+            return None
+        tracked = parse_ls_files(stdout)
+        status_cache.put_tracked(worker.path, state, tracked)
+    return tracked
+
+
+def _status_signature(worker: RepoWorker, tracked: TrackedFiles):
+    return StatusCache.signature(worker.path, *worker.git_dirs(), worker.refs_state(), tracked)
 
 
 @mcp.tool()
-def git_init(path: str) -> str:
+async def git_init(path: str) -> str:
     """
     Initialize a git repository at the specified path.
     
@@ -42,12 +114,14 @@ def git_init(path: str) -> str:
     Returns:
         Success message or error details
     """
-    path_obj = Path(path).expanduser().resolve()
+    worker = get_worker(path)
     
-    if not path_obj.exists():
+    if worker is None:
         return f"❌ Error: Directory does not exist: {path}"
     
-    success, stdout, stderr = run_git_command(str(path_obj), "init")
+    success, stdout, stderr = await git_write(worker, "init")
+    # The worker was opened before the repository existed
+    workers.discard(path)
     
     if success:
         return f"✅ Initialized git repository at {path}"
@@ -56,7 +130,7 @@ def git_init(path: str) -> str:
 
 
 @mcp.tool()
-def git_remote_add(path: str, name: str, url: str) -> str:
+async def git_remote_add(path: str, name: str, url: str) -> str:
     """
     Add a remote repository.
     
@@ -68,12 +142,12 @@ def git_remote_add(path: str, name: str, url: str) -> str:
     Returns:
         Success message or error details
     """
-    path_obj = Path(path).expanduser().resolve()
+    worker = get_worker(path)
     
-    if not path_obj.exists():
+    if worker is None:
         return f"❌ Error: Directory does not exist: {path}"
     
-    success, stdout, stderr = run_git_command(str(path_obj), "remote", "add", name, url)
+    success, stdout, stderr = await git_write(worker, "remote", "add", name, url)
     
     if success:
         return f"✅ Added remote '{name}': {url}"
@@ -85,7 +159,7 @@ def git_remote_add(path: str, name: str, url: str) -> str:
 
 
 @mcp.tool()
-def git_add(path: str, files: str = ".") -> str:
+async def git_add(path: str, files: str = ".") -> str:
     """
     Stage files for commit.
     
@@ -96,12 +170,12 @@ def git_add(path: str, files: str = ".") -> str:
     Returns:
         Success message or error details
     """
-    path_obj = Path(path).expanduser().resolve()
+    worker = get_worker(path)
     
-    if not path_obj.exists():
+    if worker is None:
         return f"❌ Error: Directory does not exist: {path}"
     
-    success, stdout, stderr = run_git_command(str(path_obj), "add", files)
+    success, stdout, stderr = await git_write(worker, "add", files)
     
     if success:
         return f"✅ Staged files: {files}"
@@ -110,7 +184,7 @@ def git_add(path: str, files: str = ".") -> str:
 
 
 @mcp.tool()
-def git_commit(path: str, message: str) -> str:
+async def git_commit(path: str, message: str) -> str:
     """
     Commit staged changes.
     
@@ -121,12 +195,12 @@ def git_commit(path: str, message: str) -> str:
     Returns:
         Success message with commit details or error details
     """
-    path_obj = Path(path).expanduser().resolve()
+    worker = get_worker(path)
     
-    if not path_obj.exists():
+    if worker is None:
         return f"❌ Error: Directory does not exist: {path}"
     
-    success, stdout, stderr = run_git_command(str(path_obj), "commit", "-m", message)
+    success, stdout, stderr = await git_write(worker, "commit", "-m", message)
     
     if success:
         return f"✅ Committed changes\n{stdout}"
@@ -138,7 +212,8 @@ def git_commit(path: str, message: str) -> str:
 
 
 @mcp.tool()
-def git_push(path: str, remote: str = "origin", branch: str = "main", set_upstream: bool = False) -> str:
+async def git_push(path: str, remote: str = "origin", branch: str = "main", set_upstream: bool = False,
+                   timeout: float = NETWORK_TIMEOUT) -> str:
     """
     Push commits to remote repository.
     
@@ -147,13 +222,14 @@ def git_push(path: str, remote: str = "origin", branch: str = "main", set_upstre
         remote: Name of the remote (default: "origin")
         branch: Name of the branch (default: "main")
         set_upstream: Whether to set upstream tracking (default: False)
+        timeout: Seconds before the push is aborted (default: 600)
     
     Returns:
         Success message or error details
     """
-    path_obj = Path(path).expanduser().resolve()
+    worker = get_worker(path)
     
-    if not path_obj.exists():
+    if worker is None:
         return f"❌ Error: Directory does not exist: {path}"
     
     args = ["push"]
@@ -162,7 +238,7 @@ def git_push(path: str, remote: str = "origin", branch: str = "main", set_upstre
     else:
         args.extend([remote, branch])
     
-    success, stdout, stderr = run_git_command(str(path_obj), *args)
+    success, stdout, stderr = await git_write(worker, *args, timeout=timeout)
     
     if success:
         return f"✅ Pushed to {remote}/{branch}\n{stderr}"  # Git outputs progress to stderr
@@ -171,7 +247,8 @@ def git_push(path: str, remote: str = "origin", branch: str = "main", set_upstre
 
 
 @mcp.tool()
-def git_pull(path: str, remote: str = "origin", branch: str = "main") -> str:
+async def git_pull(path: str, remote: str = "origin", branch: str = "main",
+                   timeout: float = NETWORK_TIMEOUT) -> str:
     """
     Pull changes from remote repository.
     
@@ -179,16 +256,17 @@ def git_pull(path: str, remote: str = "origin", branch: str = "main") -> str:
         path: Absolute path to the git repository
         remote: Name of the remote (default: "origin")
         branch: Name of the branch (default: "main")
+        timeout: Seconds before the pull is aborted (default: 600)
     
     Returns:
         Success message or error details
     """
-    path_obj = Path(path).expanduser().resolve()
+    worker = get_worker(path)
     
-    if not path_obj.exists():
+    if worker is None:
         return f"❌ Error: Directory does not exist: {path}"
     
-    success, stdout, stderr = run_git_command(str(path_obj), "pull", remote, branch)
+    success, stdout, stderr = await git_write(worker, "pull", remote, branch, timeout=timeout)
     
     if success:
         return f"✅ Pulled from {remote}/{branch}\n{stdout}"
@@ -197,22 +275,30 @@ def git_pull(path: str, remote: str = "origin", branch: str = "main") -> str:
 
 
 @mcp.tool()
-def git_status(path: str) -> str:
+async def git_status(path: str, format: str = "text") -> Union[str, Dict[str, Any]]:
     """
     Get the status of the git repository.
     
     Args:
         path: Absolute path to the git repository
+        format: "text" for git's own output, or "json" for a structured
+            result (branch, ahead/behind, changed files and counts) that is
+            served from cache while no tracked file, directory, ref, index
+            or ignore/config file has changed
     
     Returns:
         Git status output or error details
     """
-    path_obj = Path(path).expanduser().resolve()
+    worker = get_worker(path)
     
-    if not path_obj.exists():
+    if worker is None:
         return f"❌ Error: Directory does not exist: {path}"
     
-    success, stdout, stderr = run_git_command(str(path_obj), "status")
+    if format == "json":
+        success, status = await structured_status(worker)
+        return status if success else f"❌ Failed to get status\nError: {status}"
+    
+    success, stdout, stderr = await git_read(worker, "status")
     
     if success:
         return stdout
@@ -221,7 +307,7 @@ def git_status(path: str) -> str:
 
 
 @mcp.tool()
-def git_log(path: str, limit: int = 10) -> str:
+async def git_log(path: str, limit: int = 10) -> str:
     """
     Get the commit history.
     
@@ -232,13 +318,28 @@ def git_log(path: str, limit: int = 10) -> str:
     Returns:
         Commit history or error details
     """
-    path_obj = Path(path).expanduser().resolve()
+    worker = get_worker(path)
     
-    if not path_obj.exists():
+    if worker is None:
         return f"❌ Error: Directory does not exist: {path}"
     
-    success, stdout, stderr = run_git_command(
-        str(path_obj), "log", f"--max-count={limit}", "--oneline", "--decorate"
+    async with workers.lock(worker).read():
+        try:
+            # Pipe round trips to the worker's cat-file processes; off the event loop
+            stdout = await asyncio.wait_for(asyncio.to_thread(worker.log_oneline, limit),
+                                            READ_TIMEOUT)
+        except asyncio.TimeoutError:
+            # The thread cannot be cancelled; killing cat-file makes it fail
+            worker.interrupt()
+            return f"❌ Failed to get log\nError: git log timed out after {READ_TIMEOUT:g}s"
+        except (OSError, RuntimeError):
+            stdout = None
+    if stdout is not None:
+        return stdout if stdout else "No commits yet"
+    
+    # No commits yet, or not a repository: let git log report it
+    success, stdout, stderr = await git_read(
+        worker, "log", f"--max-count={limit}", "--oneline", "--decorate"
     )
     
     if success:
@@ -248,7 +349,7 @@ def git_log(path: str, limit: int = 10) -> str:
 
 
 @mcp.tool()
-def git_branch_set_upstream(path: str, remote: str = "origin", branch: str = "main") -> str:
+async def git_branch_set_upstream(path: str, remote: str = "origin", branch: str = "main") -> str:
     """
     Set the upstream tracking branch.
     
@@ -260,14 +361,12 @@ def git_branch_set_upstream(path: str, remote: str = "origin", branch: str = "ma
     Returns:
         Success message or error details
     """
-    path_obj = Path(path).expanduser().resolve()
+    worker = get_worker(path)
     
-    if not path_obj.exists():
+    if worker is None:
         return f"❌ Error: Directory does not exist: {path}"
     
-    success, stdout, stderr = run_git_command(
-        str(path_obj), "branch", "-u", f"{remote}/{branch}"
-    )
+    success, stdout, stderr = await git_write(worker, "branch", "-u", f"{remote}/{branch}")
     
     if success:
         return f"✅ Set upstream to {remote}/{branch}"
@@ -303,23 +402,24 @@ def chmod_executable(path: str, file: str) -> str:
 
 
 @mcp.tool()
-def git_fetch(path: str, remote: str = "origin") -> str:
+async def git_fetch(path: str, remote: str = "origin", timeout: float = NETWORK_TIMEOUT) -> str:
     """
     Fetch changes from remote repository.
     
     Args:
         path: Absolute path to the git repository
         remote: Name of the remote (default: "origin")
+        timeout: Seconds before the fetch is aborted (default: 600)
     
     Returns:
         Success message or error details
     """
-    path_obj = Path(path).expanduser().resolve()
+    worker = get_worker(path)
     
-    if not path_obj.exists():
+    if worker is None:
         return f"❌ Error: Directory does not exist: {path}"
     
-    success, stdout, stderr = run_git_command(str(path_obj), "fetch", remote)
+    success, stdout, stderr = await git_write(worker, "fetch", remote, timeout=timeout)
     
     if success:
         return f"✅ Fetched from {remote}\n{stderr}"  # Git outputs to stderr
@@ -327,5 +427,170 @@ def git_fetch(path: str, remote: str = "origin") -> str:
         return f"❌ Failed to fetch\nError: {stderr}"
 
 
+# ---------------------------------------------------------------------------
+# Bulk operations over many repositories
+# ---------------------------------------------------------------------------
+
+# Repositories processed at once by the *_many tools
+BULK_CONCURRENCY = 8
+
+_COMMIT_LINE = re.compile(r"^\[(?P<branch>\S+)(?: \(root-commit\))? (?P<commit>[0-9a-f]+)\]")
+
+
+def find_repos(paths: Optional[List[str]] = None, root: Optional[str] = None,
+               pattern: str = "*") -> List[str]:
+    """
+    Repositories to operate on: the given paths, plus every git repository
+    matching pattern under root (e.g. root="~/skills", pattern="*-skill").
+    """
+    repos = list(paths or [])
+    if root is not None:
+        for candidate in sorted(Path(root).expanduser().glob(pattern)):
+            if candidate.is_dir() and (candidate / ".git").exists():
+                repos.append(str(candidate))
+    return list(dict.fromkeys(repos))
+
+
+async def run_many(repo_paths: List[str], operation: Callable[[RepoWorker], Awaitable[Dict[str, Any]]],
+                   concurrency: int = BULK_CONCURRENCY) -> Dict[str, Any]:
+    """
+    Run operation on every repository, at most concurrency at a time.
+    Returns {"repos": [one row per repository, in order], "summary": counts}.
+    """
+    limit = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_one(path: str) -> Dict[str, Any]:
+        worker = get_worker(path)
+        if worker is None:
+            return {"path": path, "ok": False, "error": f"Directory does not exist: {path}"}
+        async with limit:
+            try:
+                row = await operation(worker)
+            except Exception as e:
+                row = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        return {"path": path, **row}
+
+    rows = await asyncio.gather(*(run_one(path) for path in repo_paths))
+    failed = sum(1 for row in rows if not row["ok"])
+    return {
+        "repos": rows,
+        "summary": {"total": len(rows), "ok": len(rows) - failed, "failed": failed},
+    }
+
+
+@mcp.tool()
+async def git_status_many(paths: Optional[List[str]] = None, root: Optional[str] = None,
+                          pattern: str = "*", concurrency: int = BULK_CONCURRENCY) -> Dict[str, Any]:
+    """
+    Get the status of many git repositories in one call.
+    
+    Args:
+        paths: Absolute paths of repositories
+        root: Directory to search for repositories (combined with paths)
+        pattern: Glob under root selecting repositories (default: "*")
+        concurrency: Repositories checked at once (default: 8)
+    
+    Returns:
+        One row per repository (branch, upstream, ahead/behind, clean, and
+        staged/unstaged/untracked/conflicted counts) plus a summary
+    """
+    async def status(worker: RepoWorker) -> Dict[str, Any]:
+        success, parsed = await structured_status(worker)
+        if not success:
+            return {"ok": False, "error": parsed.strip()}
+        branch = parsed["branch"]
+        return {
+            "ok": True,
+            "branch": branch["head"],
+            "upstream": branch["upstream"],
+            "ahead": branch["ahead"],
+            "behind": branch["behind"],
+            "clean": parsed["clean"],
+            **parsed["counts"],
+        }
+
+    return await run_many(find_repos(paths, root, pattern), status, concurrency)
+
+
+@mcp.tool()
+async def git_commit_many(message: str, paths: Optional[List[str]] = None,
+                          root: Optional[str] = None, pattern: str = "*",
+                          add_all: bool = True,
+                          concurrency: int = BULK_CONCURRENCY) -> Dict[str, Any]:
+    """
+    Commit in many git repositories with the same message.
+    
+    Args:
+        message: Commit message
+        paths: Absolute paths of repositories
+        root: Directory to search for repositories (combined with paths)
+        pattern: Glob under root selecting repositories (default: "*")
+        add_all: Stage all changes ("git add -A") before committing (default: True)
+        concurrency: Repositories committed at once (default: 8)
+    
+    Returns:
+        One row per repository (committed, branch, commit) plus a summary;
+        repositories with nothing to commit count as ok
+    """
+    async def commit(worker: RepoWorker) -> Dict[str, Any]:
+        async with workers.lock(worker).write():
+            if add_all:
+                success, stdout, stderr = await worker.run_async("add", "-A", timeout=WRITE_TIMEOUT)
+                if not success:
+                    return {"ok": False, "committed": False, "error": stderr.strip()}
+            success, stdout, stderr = await worker.run_async(
+                "commit", "-m", message, timeout=WRITE_TIMEOUT
+            )
+        if success:
+            match = _COMMIT_LINE.match(stdout)
+            return {
+                "ok": True,
+                "committed": True,
+                "branch": match.group("branch") if match else None,
+                "commit": match.group("commit") if match else None,
+            }
+        if "nothing to commit" in stdout or "nothing to commit" in stderr:
+            return {"ok": True, "committed": False}
+        return {"ok": False, "committed": False, "error": (stderr or stdout).strip()}
+
+    return await run_many(find_repos(paths, root, pattern), commit, concurrency)
+
+
+@mcp.tool()
+async def git_push_many(paths: Optional[List[str]] = None, root: Optional[str] = None,
+                        pattern: str = "*", remote: str = "origin",
+                        branch: Optional[str] = None, set_upstream: bool = False,
+                        concurrency: int = BULK_CONCURRENCY,
+                        timeout: float = NETWORK_TIMEOUT) -> Dict[str, Any]:
+    """
+    Push many git repositories.
+    
+    Args:
+        paths: Absolute paths of repositories
+        root: Directory to search for repositories (combined with paths)
+        pattern: Glob under root selecting repositories (default: "*")
+        remote: Name of the remote (default: "origin")
+        branch: Branch to push (default: each repository's current branch)
+        set_upstream: Whether to set upstream tracking (default: False)
+        concurrency: Repositories pushed at once (default: 8)
+        timeout: Seconds before each push is aborted (default: 600)
+    
+    Returns:
+        One row per repository (ok, git's output or error) plus a summary
+    """
+    async def push(worker: RepoWorker) -> Dict[str, Any]:
+        args = ["push"]
+        if set_upstream:
+            args.append("-u")
+        args.extend([remote, branch or "HEAD"])
+        success, stdout, stderr = await git_write(worker, *args, timeout=timeout)
+        # Git outputs progress to stderr
+        if success:
+            return {"ok": True, "output": stderr.strip()}
+        return {"ok": False, "error": stderr.strip()}
+
+    return await run_many(find_repos(paths, root, pattern), push, concurrency)
+
+
 if __name__ == "__main__":
     mcp.run()
@@ -21,4 +21,8 @@ echo "4. Testing packaging..."
 python3 -m code.cli pack --dir dist/test-output/document-summarizer --out dist/test-output.zip
 echo ""
 
+echo "5. Checking CLI startup time budget..."
+python3 -m code.startup_budget
+echo ""
+
 echo "✅ All tests complete!"